@@ -0,0 +1,184 @@
+"""
+Vectorized analytics over the numeric player columns.
+
+The players table is loaded once into a NumPy column store. Derived
+metrics, z-scores, percentile ranks and the normalized vectors used for
+"similar players" lookups are then computed for every player in a few
+array operations instead of row by row. The store is rebuilt lazily when
+the data fingerprint (row count, newest update, highest id) changes.
+"""
+import threading
+import time
+
+import numpy as np
+from sqlalchemy import func, select
+
+from models import db, Player
+
+RAW_FIELDS = ['games', 'at_bat', 'runs', 'hits', 'double_2b', 'third_baseman', 'home_runs', 'rbi',
+              'walks', 'strikeouts', 'stolen_bases', 'caught_stealing', 'batting_average',
+              'on_base_percentage', 'slugging_percentage', 'on_base_plus_slugging']
+
+DERIVED_FIELDS = ['hits_per_game', 'isolated_power', 'strikeout_rate', 'walk_rate',
+                  'stolen_base_pct', 'total_bases', 'runs_created', 'home_run_rate']
+
+# Per-opportunity rates describe a player's profile independent of playing time
+SIMILARITY_FIELDS = ['batting_average', 'on_base_percentage', 'slugging_percentage', 'isolated_power',
+                     'strikeout_rate', 'walk_rate', 'home_run_rate', 'stolen_base_pct', 'hits_per_game']
+
+
+def _ratio(numerator, denominator):
+    """Elementwise ratio with 0 where the denominator is 0"""
+    out = np.zeros_like(numerator, dtype=np.float64)
+    np.divide(numerator, denominator, out=out, where=denominator > 0)
+    return out
+
+
+def derived_metrics(raw):
+    """Compute derived metrics for whole columns; raw maps field name to array"""
+    at_bat = raw['at_bat']
+    plate_appearances = at_bat + raw['walks']
+    singles = raw['hits'] - raw['double_2b'] - raw['third_baseman'] - raw['home_runs']
+    total_bases = singles + 2 * raw['double_2b'] + 3 * raw['third_baseman'] + 4 * raw['home_runs']
+    return {
+        'hits_per_game': _ratio(raw['hits'], raw['games']),
+        'isolated_power': raw['slugging_percentage'] - raw['batting_average'],
+        'strikeout_rate': _ratio(raw['strikeouts'], plate_appearances),
+        'walk_rate': _ratio(raw['walks'], plate_appearances),
+        'stolen_base_pct': _ratio(raw['stolen_bases'], raw['stolen_bases'] + raw['caught_stealing']),
+        'total_bases': total_bases,
+        # Bill James' basic runs created
+        'runs_created': _ratio((raw['hits'] + raw['walks']) * total_bases, plate_appearances),
+        'home_run_rate': _ratio(raw['home_runs'], at_bat),
+    }
+
+
+def percentile_ranks(matrix):
+    """Percentile rank (0-100) of each value within its column; ties share the lower rank"""
+    count = matrix.shape[0]
+    if count < 2:
+        return np.full_like(matrix, 100.0)
+    ranks = np.empty_like(matrix)
+    for column in range(matrix.shape[1]):
+        values = matrix[:, column]
+        ranks[:, column] = np.searchsorted(np.sort(values), values, side='left')
+    return ranks / (count - 1) * 100.0
+
+
+class ColumnStore:
+    """Immutable snapshot of player stats as NumPy columns"""
+
+    def __init__(self, ids, names, positions, raw, fingerprint=None):
+        self.fingerprint = fingerprint
+        self.ids = np.asarray(ids, dtype=np.int64)
+        self.names = list(names)
+        self.positions = list(positions)
+        self.row_of = {int(player_id): row for row, player_id in enumerate(self.ids)}
+
+        raw = {field: np.nan_to_num(np.asarray(raw[field], dtype=np.float64)) for field in RAW_FIELDS}
+        columns = dict(raw)
+        columns.update(derived_metrics(raw))
+        self.fields = RAW_FIELDS + DERIVED_FIELDS
+        self.matrix = np.column_stack([columns[field] for field in self.fields]) if len(self.ids) else \
+            np.empty((0, len(self.fields)))
+
+        mean = self.matrix.mean(axis=0) if len(self.ids) else np.zeros(len(self.fields))
+        std = self.matrix.std(axis=0) if len(self.ids) else np.ones(len(self.fields))
+        std[std == 0] = 1.0
+        self.zscores = (self.matrix - mean) / std
+        self.percentiles = percentile_ranks(self.matrix)
+
+        similarity_columns = [self.fields.index(field) for field in SIMILARITY_FIELDS]
+        self.vectors = np.ascontiguousarray(self.zscores[:, similarity_columns])
+        self.norms = np.einsum('ij,ij->i', self.vectors, self.vectors)
+
+    @classmethod
+    def from_rows(cls, rows, fingerprint=None):
+        """Build from (id, name, position, *RAW_FIELDS) tuples"""
+        rows = list(rows)
+        if not rows:
+            return cls([], [], [], {field: [] for field in RAW_FIELDS}, fingerprint)
+        ids, names, positions, *values = zip(*rows)
+        numeric = np.array(values, dtype=np.float64)
+        return cls(ids, names, positions, dict(zip(RAW_FIELDS, numeric)), fingerprint)
+
+    def __len__(self):
+        return len(self.ids)
+
+    def profile(self, player_id):
+        """Derived metrics, z-scores and percentile ranks for one player"""
+        row = self.row_of[player_id]
+        return {
+            field: {
+                'value': round(float(self.matrix[row, column]), 4),
+                'z_score': round(float(self.zscores[row, column]), 3),
+                'percentile': round(float(self.percentiles[row, column]), 1),
+            }
+            for column, field in enumerate(self.fields)
+        }
+
+    def similar(self, player_id, k=5):
+        """The k nearest players by Euclidean distance over normalized rate stats"""
+        row = self.row_of[player_id]
+        k = max(0, min(k, len(self.ids) - 1))
+        if k == 0:
+            return []
+        # |a - b|^2 = |a|^2 + |b|^2 - 2 a.b, one matrix-vector product for all players
+        distances = self.norms + self.norms[row] - 2.0 * (self.vectors @ self.vectors[row])
+        distances[row] = np.inf
+        nearest = np.argpartition(distances, k)[:k]
+        nearest = nearest[np.argsort(distances[nearest])]
+        return [
+            {
+                'id': int(self.ids[index]),
+                'name': self.names[index],
+                'position': self.positions[index],
+                'distance': round(float(np.sqrt(max(distances[index], 0.0))), 4),
+            }
+            for index in nearest
+        ]
+
+
+def data_fingerprint():
+    """Cheap summary of the players table that changes whenever its data does"""
+    count, latest, max_id = db.session.execute(
+        select(func.count(Player.id), func.max(Player.updated_at), func.max(Player.id))
+        .where(Player.removed_at.is_(None))
+    ).one()
+    return (count, latest.isoformat() if latest else None, max_id)
+
+
+def load_store(fingerprint=None):
+    """Load every active player's numeric columns into a ColumnStore"""
+    rows = db.session.execute(
+        select(Player.id, Player.name, Player.position, *[getattr(Player, field) for field in RAW_FIELDS])
+        .where(Player.removed_at.is_(None))
+        .order_by(Player.id)
+    )
+    return ColumnStore.from_rows(rows, fingerprint)
+
+
+class AnalyticsEngine:
+    """Hands out the current ColumnStore, rebuilding it when the data changes"""
+
+    def __init__(self, check_interval=5.0):
+        self.check_interval = check_interval
+        self._store = None
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+
+    def store(self):
+        """Current store; the fingerprint is re-checked at most every check_interval seconds"""
+        now = time.monotonic()
+        if self._store is not None and now - self._checked_at < self.check_interval:
+            return self._store
+        with self._lock:
+            fingerprint = data_fingerprint()
+            if self._store is None or self._store.fingerprint != fingerprint:
+                self._store = load_store(fingerprint)
+            self._checked_at = now
+            return self._store
+
+    def invalidate(self):
+        """Force a fingerprint check on the next access"""
+        self._checked_at = 0.0
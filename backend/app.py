@@ -1,209 +1,457 @@
-from flask import Flask, request, jsonify
+from flask import Blueprint, Flask, Response, abort, current_app, request, jsonify, stream_with_context
 from flask_cors import CORS
-from models import db, Player
+from datetime import date, datetime, timezone
+from models import EDITABLE_FIELDS, db, DescriptionJob, Player
 from config import Config
-import requests
-import google.generativeai as genai
+from cache import create_cache
+import database
+import description_cache
+import history
+from analytics import AnalyticsEngine
+import leaderboards
+import metrics
+import serialize
+import updates
+from jobs import DescriptionJobRunner
+from llm import Generation, GeminiClient, build_prompt
+from ingest import applied_source_hash, ingest_players, record_applied_source, sync_players
+from source import SourceFetcher, SourceUnavailable
+from queries import (QueryError, get_player_row, list_players, parse_fields, parse_filters, parse_limit,
+                     sort_expressions, stream_players)
+import json
 import os
+import time
 
-def fix_accented_characters(text):
-    """Fix accented characters using Unicode normalization and intelligent character replacement"""
-    if not text:
-        return text
-    
-    import unicodedata
-    
-    # First, try to normalize Unicode characters (handles most accented characters)
-    # NFD = Normalization Form Decomposed (separates base characters from diacritics)
-    normalized = unicodedata.normalize('NFD', text)
-    
-    # Remove all combining characters (diacritics like accents, tildes, etc.)
-    # This converts á to a, é to e, ñ to n, etc.
-    ascii_text = ''.join(char for char in normalized 
-                        if unicodedata.category(char) != 'Mn')
-    
-    # Handle special cases that don't normalize well
-    special_cases = {
-        'ß': 'ss',  # German eszett
-        'æ': 'ae',  # Latin ligature
-        'œ': 'oe',  # Latin ligature
-        'ð': 'd',   # Icelandic eth
-        'þ': 'th',  # Icelandic thorn
-    }
-    
-    for special, replacement in special_cases.items():
-        ascii_text = ascii_text.replace(special, replacement)
-    
-    # Handle corrupted characters from API (replace ? with intelligent guesses)
-    # This is more sophisticated than hardcoding specific names
-    ascii_text = fix_corrupted_characters(ascii_text)
-    
-    return ascii_text
+api = Blueprint('api', __name__)
 
-def fix_corrupted_characters(text):
-    """Intelligently fix corrupted characters (?) based on context"""
-    if '?' not in text:
-        return text
-    
-    # Common patterns for corrupted characters in baseball names
-    # These are based on common Spanish/Latin names in baseball
-    patterns = [
-        # Common Spanish name patterns
-        (r'Beltr\?n+', 'Beltran'),
-        (r'Encarnaci\?n', 'Encarnacion'),
-        (r'B\?ez', 'Baez'),
-        (r'\?lvarez', 'Alvarez'),
-        (r'San\?', 'Sano'),
-        (r'Gonz\?lez', 'Gonzalez'),
-        (r'Rodr\?guez', 'Rodriguez'),
-        (r'Fern\?ndez', 'Fernandez'),
-        (r'Mart\?nez', 'Martinez'),
-        (r'Garc\?a', 'Garcia'),
-        (r'L\?pez', 'Lopez'),
-        (r'P\?rez', 'Perez'),
-        (r'Hern\?ndez', 'Hernandez'),
-        (r'Ram\?rez', 'Ramirez'),
-        (r'Jim\?nez', 'Jimenez'),
-        (r'V\?squez', 'Vasquez'),
-        (r'Castr\?', 'Castro'),
-        (r'Delg\?do', 'Delgado'),
-        (r'Vald\?z', 'Valdez'),
-        (r'Mor\?les', 'Morales'),
-        (r'Flores', 'Flores'),  # This one might not have issues, but just in case
-    ]
-    
-    import re
-    for pattern, replacement in patterns:
-        text = re.sub(pattern, replacement, text, flags=re.IGNORECASE)
-    
-    # If there are still ? characters, try to make educated guesses
-    # based on common letter frequencies in names
-    if '?' in text:
-        # Common letter replacements based on context
-        # This is a fallback for patterns we haven't seen before
-        text = text.replace('?', 'a')  # Most common vowel in Spanish names
-    
-    return text
+class AppServices:
+    """Caches, background workers and clients shared by one app's requests"""
+    
+    def __init__(self, app):
+        # Cache for encoded player list/detail responses, invalidated by every write
+        self.response_cache = create_cache(app.config, app.instance_path)
+        
+        # Seed source fetches: pooled session, retries, conditional requests, on-disk snapshot
+        self.seed_source = SourceFetcher.from_config(app.config, os.path.join(app.instance_path, 'seed'))
+        
+        # Rebuilds leaderboards and summaries shortly after writes
+        self.summary_refresher = leaderboards.SummaryRefresher(app, on_refresh=lambda: self.response_cache.invalidate())
+        
+        # NumPy column store for similarity and percentile queries, rebuilt when data changes
+        self.analytics_engine = AnalyticsEngine()
+        
+        # Decoded stat snapshot blocks; snapshots are append-only, so never invalidated
+        self.stat_history = history.HistoryStore(max_blocks=app.config['HISTORY_CACHE_BLOCKS'])
+        
+        # Background runner for LLM description generation; jobs are persisted
+        # and claimed by any worker, and the Gemini SDK is only imported once
+        # the first client is created
+        self.description_jobs = DescriptionJobRunner(
+            app,
+            client_factory=lambda: GeminiClient(app.config['GEMINI_API_KEY'], transport=app.config['GEMINI_TRANSPORT']),
+            max_workers=app.config['DESCRIPTION_WORKERS'],
+            rate_per_minute=app.config['DESCRIPTION_RATE_PER_MINUTE'],
+            max_retries=app.config['DESCRIPTION_MAX_RETRIES'],
+            cache_max_entries=app.config['DESCRIPTION_CACHE_MAX_ENTRIES'],
+            on_change=lambda: self.response_cache.invalidate(),
+            claim_timeout=app.config['DESCRIPTION_CLAIM_TIMEOUT'],
+        )
+    
+    def players_changed(self, changed_fields=None, wait=False):
+        """
+        Drop cached responses and the column store after a write, and refresh
+        the summaries of the stats changed_fields affect (all when None).
+        wait refreshes before returning instead of on the background timer.
+        """
+        self.response_cache.invalidate()
+        self.analytics_engine.invalidate()
+        stats = leaderboards.affected_stats(changed_fields)
+        if stats is None or stats:
+            if wait:
+                self.summary_refresher.refresh_now(stats)
+            else:
+                self.summary_refresher.schedule(stats)
 
-app = Flask(__name__)
-app.config.from_object(Config)
-app.config['SQLALCHEMY_DATABASE_URI'] = app.config['DATABASE_URL']
-app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
-CORS(app)
+def create_app(config_object=Config):
+    """
+    Build the Flask app.
+    
+    Nothing here connects to the database or imports the Gemini SDK: engines
+    connect on first use, and tables are created by migrate.py at deploy time.
+    """
+    app = Flask(__name__)
+    app.config.from_object(config_object)
+    app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+    CORS(app)
+    
+    # Initialize database: pool settings, optional read replica, fork safety
+    database.configure(app)
+    db.init_app(app)
+    database.dispose_engines_after_fork(app, db)
+    
+    # Request latency, SQL, serialization, LLM and cache metrics (see /metrics)
+    metrics.init_app(app)
+    
+    if not app.config['GEMINI_API_KEY']:
+        print("❌ No Gemini API key found")
+    
+    app.extensions['baseball_stats'] = AppServices(app)
+    # Description workers run in the processes serving requests, after any fork,
+    # and pick up jobs left queued by recycled or crashed workers; without a
+    # Gemini key no job can be submitted or run, so none are started
+    if app.config['GEMINI_API_KEY']:
+        app.before_request(lambda: services(app).description_jobs.start())
+    # Every write invalidates the response cache, so its timestamp tells replica reads when to wait
+    database.track_writes(app, lambda: services(app).response_cache.last_modified())
+    app.register_blueprint(api)
+    return app
+
+def services(app=None):
+    """AppServices of app, by default the one handling the current request"""
+    return (app or current_app).extensions['baseball_stats']
 
-# Initialize database
-db.init_app(app)
+def cached_payload(cache_parts, build, fmt=serialize.JSON, stream=None):
+    """
+    Serve build()'s payload from the response cache, honouring If-None-Match.
+    
+    When stream is given, a cache miss is answered by encoding stream()'s
+    chunks as they are produced instead of building the whole body first.
+    """
+    response_cache = services().response_cache
+    key = response_cache.key((fmt,) + tuple(cache_parts))
+    cached = response_cache.get(key)
+    if cached is None and stream is not None:
+        return streamed_response(key, stream(), fmt)
+    if cached is None:
+        payload = build()
+        with metrics.SERIALIZATION_SECONDS.labels(fmt).time():
+            body = serialize.encode(payload, fmt)
+        cached = response_cache.set(key, body)
+    
+    response = Response(cached.body, mimetype=serialize.MIMETYPES[fmt])
+    response.set_etag(cached.etag)
+    response.last_modified = datetime.fromtimestamp(cached.last_modified, timezone.utc)
+    # Let clients keep the body but revalidate with the ETag on every poll
+    response.cache_control.no_cache = True
+    response.vary.add('Accept')
+    return response.make_conditional(request)
 
-# Initialize Gemini
-api_key = os.environ.get('GEMINI_API_KEY') or app.config.get('GEMINI_API_KEY')
-if api_key:
-    genai.configure(api_key=api_key)
-    print(f"✅ Gemini configured with API key: {api_key[:20]}...")
-else:
-    print("❌ No Gemini API key found")
+def streamed_response(key, chunks, fmt):
+    """Send encoded chunks as they come, caching the body if it stays small enough"""
+    max_bytes = current_app.config['CACHE_MAX_BODY_BYTES']
+    response_cache = services().response_cache
+    
+    def generate():
+        kept, size = [], 0
+        for chunk in chunks:
+            yield chunk
+            if kept is not None:
+                size += len(chunk)
+                if size <= max_bytes:
+                    kept.append(chunk)
+                else:
+                    kept = None
+        if kept is not None:
+            response_cache.set(key, b''.join(kept))
+    
+    response = Response(stream_with_context(generate()), mimetype=serialize.MIMETYPES[fmt])
+    response.cache_control.no_cache = True
+    response.vary.add('Accept')
+    return response
 
-# Create tables
-with app.app_context():
-    db.create_all()
+def job_accepted(job):
+    """202 response pointing at a job's status URL"""
+    status_url = f'/api/descriptions/jobs/{job.id}'
+    response = jsonify({'job_id': job.id, 'status_url': status_url, **job.to_dict()})
+    response.status_code = 202
+    response.headers['Location'] = status_url
+    return response
 
-@app.route('/api/players', methods=['GET'])
+@api.route('/api/players', methods=['GET'])
+@database.replica_reads
 def get_players():
-    """Get all players with optional sorting"""
+    """Get players with optional filtering, name search, sorting, keyset pagination and field projection"""
     sort_by = request.args.get('sort_by', 'hits')
     order = request.args.get('order', 'desc')
     
-    if sort_by not in ['hits', 'home_runs', 'name', 'batting_average', 'hits_per_game']:
+    if sort_by not in sort_expressions():
         sort_by = 'hits'
     
     if order not in ['asc', 'desc']:
         order = 'desc'
     
-    # Get all players first
-    players = Player.query.all()
-    
-    # Convert to dict format
-    players_data = [player.to_dict() for player in players]
-    
-    # Handle hits_per_game sorting (calculated field)
-    if sort_by == 'hits_per_game':
-        players_data.sort(key=lambda x: x['hits_per_game'], reverse=(order == 'desc'))
-    else:
-        # For database fields, sort in the database
-        column = getattr(Player, sort_by)
-        if order == 'desc':
-            players = Player.query.order_by(column.desc()).all()
-        else:
-            players = Player.query.order_by(column.asc()).all()
-        players_data = [player.to_dict() for player in players]
-    
-    return jsonify(players_data)
+    paginate = 'limit' in request.args or 'after' in request.args
+    after = request.args.get('after')
+    
+    try:
+        fields = parse_fields(request.args.get('fields'))
+        filters = parse_filters(request.args)
+        limit = parse_limit(request.args.get('limit')) if paginate else None
+        
+        fmt = serialize.negotiate(request.accept_mimetypes, columnar=True)
+        
+        def build():
+            rows, next_cursor = list_players(sort_by, order, fields=fields, limit=limit,
+                                             after=after, filters=filters)
+            # Plain list for unpaginated requests keeps existing clients working
+            return serialize.shape(rows, fmt, next_cursor, paginated=paginate)
+        
+        def stream():
+            names, batches = stream_players(sort_by, order, fields=fields, filters=filters)
+            return serialize.iter_json_array(names, batches,
+                                             on_encode=metrics.SERIALIZATION_SECONDS.labels(fmt).observe)
+        
+        fields_key = ','.join(fields) if fields else None
+        filters_key = json.dumps(filters, sort_keys=True) if filters else None
+        # Full JSON lists grow with the table, so they are streamed batch by batch
+        return cached_payload(('list', sort_by, order, fields_key, limit, after, filters_key), build, fmt,
+                              stream=stream if not paginate and fmt == serialize.JSON else None)
+    except QueryError as e:
+        return jsonify({'error': str(e)}), 400
 
-@app.route('/api/players/<int:player_id>', methods=['GET'])
+@api.route('/api/players/<int:player_id>', methods=['GET'])
+@database.replica_reads
 def get_player(player_id):
     """Get a specific player by ID"""
-    player = Player.query.get_or_404(player_id)
-    return jsonify(player.to_dict())
+    fmt = serialize.negotiate(request.accept_mimetypes)
+    return cached_payload(('player', player_id), lambda: get_player_row(player_id) or abort(404), fmt)
+
+@api.route('/api/players/<int:player_id>/similar', methods=['GET'])
+def get_similar_players(player_id):
+    """Nearest players by normalized rate stats (?k=5, at most 50)"""
+    try:
+        k = min(max(int(request.args.get('k', 5)), 1), 50)
+    except ValueError:
+        return jsonify({'error': 'k must be an integer'}), 400
+    
+    store = services().analytics_engine.store()
+    if player_id not in store.row_of:
+        return jsonify({'error': 'Player not found'}), 404
+    return jsonify({'id': player_id, 'similar': store.similar(player_id, k)})
+
+@api.route('/api/players/<int:player_id>/analytics', methods=['GET'])
+def get_player_analytics(player_id):
+    """Derived metrics with league z-scores and percentile ranks for a player"""
+    store = services().analytics_engine.store()
+    if player_id not in store.row_of:
+        return jsonify({'error': 'Player not found'}), 404
+    return jsonify({'id': player_id, 'players': len(store), 'metrics': store.profile(player_id)})
+
+def date_arg(name):
+    """?name=YYYY-MM-DD as a date, None when absent; raises ValueError"""
+    value = request.args.get(name)
+    if not value:
+        return None
+    try:
+        return date.fromisoformat(value)
+    except ValueError:
+        raise ValueError(f'{name} must be a date (YYYY-MM-DD)')
+
+@api.route('/api/players/<int:player_id>/history', methods=['GET'])
+@database.replica_reads
+def get_player_history(player_id):
+    """A player's stats in every recorded snapshot (?stats=hits,home_runs&since=2026-04-01&until=2026-06-30)"""
+    stats = request.args.get('stats')
+    fields = stats.split(',') if stats else history.HISTORY_FIELDS
+    unknown = [field for field in fields if field not in history.HISTORY_FIELDS]
+    if unknown:
+        return jsonify({'error': f"Unknown stat: {', '.join(unknown)}"}), 400
+    try:
+        since, until = date_arg('since'), date_arg('until')
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    
+    def build():
+        return services().stat_history.player_history(db.session.connection(), player_id, fields, since, until) \
+            or abort(404)
+    
+    fmt = serialize.negotiate(request.accept_mimetypes)
+    return cached_payload(('history', player_id, ','.join(fields), since, until), build, fmt)
 
-@app.route('/api/players/<int:player_id>', methods=['PUT'])
+@api.route('/api/history/movers', methods=['GET'])
+@database.replica_reads
+def get_history_movers():
+    """Biggest changes in a stat since a date (?since=2026-05-01&stat=home_runs&limit=10&order=desc)"""
+    stat = request.args.get('stat', 'hits')
+    if stat not in history.HISTORY_FIELDS:
+        return jsonify({'error': f'Unknown stat: {stat}'}), 400
+    order = request.args.get('order', 'desc')
+    if order not in ['asc', 'desc']:
+        return jsonify({'error': 'order must be asc or desc'}), 400
+    try:
+        since = date_arg('since')
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    if since is None:
+        return jsonify({'error': 'since is required'}), 400
+    try:
+        limit = min(max(int(request.args.get('limit', history.DEFAULT_MOVERS)), 1), history.MAX_MOVERS)
+    except ValueError:
+        return jsonify({'error': 'limit must be an integer'}), 400
+    
+    def build():
+        movers = services().stat_history.movers(db.session.connection(), stat, since, limit, order)
+        return movers if movers is not None else abort(404)
+    
+    fmt = serialize.negotiate(request.accept_mimetypes)
+    return cached_payload(('movers', stat, since, limit, order), build, fmt)
+
+@api.route('/api/history/snapshots', methods=['GET'])
+@database.replica_reads
+def get_history_snapshots():
+    """Recorded stat snapshots, newest first"""
+    return jsonify({'snapshots': history.list_snapshots(db.session.connection())})
+
+@api.route('/api/players/<int:player_id>', methods=['PUT'])
 def update_player(player_id):
     """Update a player's data"""
     player = Player.query.get_or_404(player_id)
     data = request.get_json()
     
-    # Update fields if provided
-    for field in ['name', 'position', 'games', 'at_bat', 'runs', 'hits', 
-                  'double_2b', 'third_baseman', 'home_runs', 'rbi', 'walks', 
-                  'strikeouts', 'stolen_bases', 'caught_stealing', 'batting_average',
-                  'on_base_percentage', 'slugging_percentage', 'on_base_plus_slugging', 'description']:
+    # Update fields if provided (the database regenerates the derived rate columns)
+    for field in EDITABLE_FIELDS:
         if field in data:
             setattr(player, field, data[field])
     
+    if 'description' in data:
+        player.description_hash = description_cache.cache_key(player)
+    
     db.session.commit()
+    services().players_changed(set(data).intersection(EDITABLE_FIELDS))
     return jsonify(player.to_dict())
 
-@app.route('/api/players/<int:player_id>/description', methods=['GET'])
+@api.route('/api/players', methods=['PATCH'])
+def bulk_update_players():
+    """Apply a list of partial player updates in one transaction"""
+    items = request.get_json(silent=True)
+    try:
+        updated = updates.bulk_update_players(items)
+    except updates.BulkUpdateError as e:
+        db.session.rollback()
+        return jsonify({'error': str(e), 'errors': e.errors}), 400
+    
+    db.session.commit()
+    services().players_changed(updates.changed_fields(items))
+    return jsonify({'updated': len(updated), 'ids': updated})
+
+@api.route('/api/players/<int:player_id>/description', methods=['GET'])
+@database.replica_reads
 def get_player_description(player_id):
-    """Get player's cached description"""
+    """Get player's cached description and whether it predates the current stats"""
     player = Player.query.get_or_404(player_id)
-    return jsonify({'description': player.description})
+    return jsonify({'description': player.description, 'stale': description_cache.is_stale(player)})
 
-@app.route('/api/players/<int:player_id>/description', methods=['POST'])
+@api.route('/api/players/<int:player_id>/description', methods=['POST'])
 def generate_player_description(player_id):
-    """Generate LLM description for a player and save to database"""
+    """
+    Generate an LLM description for a player.
+    
+    Returns 200 immediately when the description cache already holds output
+    for the player's current stats; otherwise queues a job and returns 202.
+    ?force=true skips the cache and always calls the model.
+    """
     player = Player.query.get_or_404(player_id)
+    force = request.args.get('force', 'false').lower() == 'true'
     
-    if not app.config['GEMINI_API_KEY']:
+    if not force and description_cache.apply_cached(player, description_cache.cache_key(player)):
+        db.session.commit()
+        services().response_cache.invalidate()
+        return jsonify({'description': player.description, 'cached': True})
+    
+    if not current_app.config['GEMINI_API_KEY']:
         return jsonify({'error': 'Gemini API key not configured'}), 500
     
-    try:
-        prompt = f"""Write a brief, engaging description of baseball player {player.name}. 
-        Include their position ({player.position}) and key statistics:
-        - Games: {player.games}
-        - Hits: {player.hits}
-        - Home Runs: {player.home_runs}
-        - Batting Average: {player.batting_average}
-        - RBI: {player.rbi}
-        - Runs: {player.runs}
-        - Stolen Bases: {player.stolen_bases}
-        - OPS: {player.on_base_plus_slugging}
-        
-        Make it sound like a sports commentator describing the player. Keep it under 150 words."""
-        
-        model = genai.GenerativeModel('gemini-2.0-flash')
-        response = model.generate_content(prompt)
-        
-        description = response.text.strip()
-        
-        # Save the description to the database
-        player.description = description
+    return job_accepted(services().description_jobs.submit([player_id], force=force))
+
+def sse_event(data, event=None):
+    """Format one Server-Sent Event"""
+    prefix = f'event: {event}\n' if event else ''
+    return f'{prefix}data: {json.dumps(data)}\n\n'
+
+@api.route('/api/players/<int:player_id>/description/stream', methods=['GET'])
+def stream_player_description(player_id):
+    """
+    Stream a freshly generated description as Server-Sent Events.
+    
+    Sends `data: {"text": ...}` per model chunk and a final `event: done`
+    with the full description once it has been saved. A cached description
+    for the current stats is sent as a single chunk unless ?force=true.
+    If the client disconnects, the upstream model call is abandoned and
+    nothing is saved; if the player is deleted meanwhile, an `event: error`
+    is sent instead of `done`.
+    """
+    player = Player.query.get_or_404(player_id)
+    force = request.args.get('force', 'false').lower() == 'true'
+    key = description_cache.cache_key(player)
+    
+    if not force and description_cache.apply_cached(player, key):
         db.session.commit()
+        services().response_cache.invalidate()
+        events = [sse_event({'text': player.description}),
+                  sse_event({'description': player.description, 'cached': True}, event='done')]
+        return Response(events, mimetype='text/event-stream')
+    
+    if not current_app.config['GEMINI_API_KEY']:
+        return jsonify({'error': 'Gemini API key not configured'}), 500
+    
+    prompt = build_prompt(player)
+    jobs = services().description_jobs
+    
+    def generate():
+        jobs.rate_limiter.wait()
+        started = time.perf_counter()
+        chunks = jobs.client_factory().stream(prompt)
+        parts = []
+        try:
+            for chunk in chunks:
+                parts.append(chunk)
+                yield sse_event({'text': chunk})
+        except GeneratorExit:
+            # Client went away: stop the upstream call and save nothing
+            chunks.close()
+            raise
+        except Exception as e:
+            metrics.observe_llm('stream', time.perf_counter() - started, error=e)
+            yield sse_event({'error': f'Failed to generate description: {str(e)}'}, event='error')
+            return
         
-        return jsonify({'description': description})
-        
-    except Exception as e:
-        return jsonify({'error': f'Failed to generate description: {str(e)}'}), 500
+        description = ''.join(parts).strip()
+        metrics.observe_llm('stream', time.perf_counter() - started)
+        latency_ms = int((time.perf_counter() - started) * 1000)
+        current = db.session.get(Player, player_id)
+        if current is None:
+            # Deleted while the model was generating: nothing to save it to
+            yield sse_event({'error': 'Player no longer exists'}, event='error')
+            return
+        description_cache.store(key, Generation(description, None, None), latency_ms,
+                                max_entries=current_app.config['DESCRIPTION_CACHE_MAX_ENTRIES'])
+        current.description = description
+        current.description_hash = key
+        db.session.commit()
+        services().response_cache.invalidate()
+        yield sse_event({'description': description}, event='done')
+    
+    response = Response(stream_with_context(generate()), mimetype='text/event-stream')
+    response.headers['Cache-Control'] = 'no-cache'
+    # Stop nginx from buffering the event stream
+    response.headers['X-Accel-Buffering'] = 'no'
+    return response
 
-@app.route('/api/players/<int:player_id>/description', methods=['PUT'])
+@api.route('/api/descriptions/jobs', methods=['POST'])
+def generate_missing_descriptions():
+    """Queue description generation for every player that lacks one"""
+    if not current_app.config['GEMINI_API_KEY']:
+        return jsonify({'error': 'Gemini API key not configured'}), 500
+    
+    return job_accepted(services().description_jobs.submit_missing())
+
+@api.route('/api/descriptions/jobs/<job_id>', methods=['GET'])
+def get_description_job(job_id):
+    """Report progress of a description generation job"""
+    job = DescriptionJob.query.get_or_404(job_id)
+    return jsonify(job.to_dict())
+
+@api.route('/api/players/<int:player_id>/description', methods=['PUT'])
 def save_player_description(player_id):
     """Save a description for a player"""
     player = Player.query.get_or_404(player_id)
@@ -213,59 +461,110 @@ def save_player_description(player_id):
         return jsonify({'error': 'Description is required'}), 400
     
     player.description = data['description']
+    # A manual edit is written against the current stats
+    player.description_hash = description_cache.cache_key(player)
     db.session.commit()
+    services().response_cache.invalidate()
     
     return jsonify({'description': player.description})
 
-@app.route('/api/seed', methods=['POST'])
+@api.route('/api/seed', methods=['POST'])
 def seed_database():
-    """Seed the database with data from the baseball API"""
+    """
+    Seed the database with data from the baseball API.
+    
+    ?mode=sync upserts only new and changed players instead of replacing the
+    table, and is skipped entirely when the source payload was already
+    applied, unless &remove_missing=true asks to soft-delete players no
+    longer present (ignored when the source failed and the stale snapshot
+    is used). ?offline=true reseeds from the last downloaded snapshot.
+    Every seed or sync that changes players records a stat history snapshot.
+    """
+    mode = request.args.get('mode', 'replace')
+    if mode not in ['replace', 'sync']:
+        return jsonify({'error': 'mode must be replace or sync'}), 400
+    offline = request.args.get('offline', 'false').lower() == 'true'
+    remove_missing = request.args.get('remove_missing', 'false').lower() == 'true'
+    
+    try:
+        applied_sha256 = applied_source_hash(db.session.connection())
+        fetched = services().seed_source.fetch(offline=offline, applied_sha256=applied_sha256)
+    except SourceUnavailable as e:
+        return jsonify({'error': f'Failed to seed database: {str(e)}'}), 503
+    # A stale snapshot may predate players added upstream; never remove by it
+    remove_missing = remove_missing and fetched.status != 'stale'
+    
     try:
-        response = requests.get('https://api.hirefraction.com/api/test/baseball')
-        response.raise_for_status()
-        data = response.json()
+        if mode == 'sync':
+            if not fetched.changed and not remove_missing:
+                return jsonify({'message': 'Source unchanged since the last seed; nothing to sync',
+                                'inserted': 0, 'updated': 0, 'unchanged': 0, 'removed': 0,
+                                'source': fetched.to_dict()})
+            stats = sync_players(db.session.connection(), fetched.records(), remove_missing=remove_missing)
+            changed = bool(stats.inserted or stats.updated or stats.removed)
+            snapshot = history.record_snapshot(db.session.connection(), 'sync') if changed else None
+            record_applied_source(db.session.connection(), fetched.sha256)
+            db.session.commit()
+            if changed:
+                services().players_changed()
+            else:
+                services().response_cache.invalidate()
+            return jsonify({'message': f'Successfully synced {stats.rows} players', **stats.to_dict(),
+                            'source': fetched.to_dict(), 'snapshot': snapshot})
         
-        # Clear existing data
+        # Clear existing data and bulk load in the same transaction
         Player.query.delete()
-        
-        # Add new players
-        for player_data in data:
-            # Fix accented characters in player name and position
-            player_name = fix_accented_characters(player_data.get('Player name', ''))
-            player_position = fix_accented_characters(player_data.get('position', ''))
-            
-            player = Player(
-                name=player_name,
-                position=player_position,
-                games=player_data.get('Games', 0),
-                at_bat=player_data.get('At-bat', 0),
-                runs=player_data.get('Runs', 0),
-                hits=player_data.get('Hits', 0),
-                double_2b=player_data.get('Double (2B)', 0),
-                third_baseman=player_data.get('third baseman', 0),
-                home_runs=player_data.get('home run', 0),
-                rbi=player_data.get('run batted in', 0),
-                walks=player_data.get('a walk', 0),
-                strikeouts=player_data.get('Strikeouts', 0),
-                stolen_bases=player_data.get('stolen base', 0),
-                caught_stealing=0 if player_data.get('Caught stealing') == '--' else player_data.get('Caught stealing', 0),
-                batting_average=player_data.get('AVG'),
-                on_base_percentage=player_data.get('On-base Percentage'),
-                slugging_percentage=player_data.get('Slugging Percentage'),
-                on_base_plus_slugging=player_data.get('On-base Plus Slugging')
-            )
-            db.session.add(player)
-        
+        stats = ingest_players(db.session.connection(), fetched.records())
+        snapshot = history.record_snapshot(db.session.connection(), 'seed')
+        record_applied_source(db.session.connection(), fetched.sha256)
         db.session.commit()
-        return jsonify({'message': f'Successfully seeded {len(data)} players'})
+        services().players_changed()
+        
+        return jsonify({'message': f'Successfully seeded {stats.rows} players', **stats.to_dict(),
+                        'source': fetched.to_dict(), 'snapshot': snapshot})
         
     except Exception as e:
+        db.session.rollback()
         return jsonify({'error': f'Failed to seed database: {str(e)}'}), 500
 
-@app.route('/api/health', methods=['GET'])
+@api.route('/api/leaderboards', methods=['GET'])
+def get_leaderboards():
+    """Top players per stat (?stat=home_runs&limit=10 for a single board)"""
+    stat = request.args.get('stat')
+    if stat and stat not in leaderboards.LEADERBOARD_STATS:
+        return jsonify({'error': f'Unknown stat: {stat}'}), 400
+    
+    try:
+        limit = min(int(request.args.get('limit', leaderboards.LEADERBOARD_SIZE)), leaderboards.LEADERBOARD_SIZE)
+    except ValueError:
+        return jsonify({'error': 'limit must be an integer'}), 400
+    
+    fmt = serialize.negotiate(request.accept_mimetypes)
+    return cached_payload(('leaderboards', stat, limit), lambda: leaderboards.get_leaderboards(stat, limit), fmt)
+
+@api.route('/api/stats/summary', methods=['GET'])
+def get_stats_summary():
+    """League-wide and per-position averages and percentiles (?position=SS to narrow)"""
+    position = request.args.get('position')
+    fmt = serialize.negotiate(request.accept_mimetypes)
+    return cached_payload(('summary', position), lambda: leaderboards.get_summary(position), fmt)
+
+@api.route('/api/health', methods=['GET'])
 def health_check():
-    """Health check endpoint"""
-    return jsonify({'status': 'healthy'})
+    """Health check endpoint; ?deep=true also checks every database and reports pool usage"""
+    if request.args.get('deep', 'false').lower() != 'true':
+        return jsonify({'status': 'healthy'})
+    
+    databases = database.check_engines(db)
+    healthy = all(check['ok'] for check in databases.values())
+    return jsonify({'status': 'healthy' if healthy else 'unhealthy', 'databases': databases}), 200 if healthy else 503
+
+@api.route('/metrics', methods=['GET'])
+def prometheus_metrics():
+    """Prometheus metrics, aggregated across workers when PROMETHEUS_MULTIPROC_DIR is set"""
+    body, content_type = metrics.render()
+    return Response(body, content_type=content_type)
 
 if __name__ == '__main__':
+    app = create_app()
     app.run(debug=app.config['FLASK_DEBUG'], host='0.0.0.0', port=5000)
@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+Benchmark for the NumPy analytics engine.
+
+Builds a ColumnStore from synthetic players (no database needed) and times
+the build plus similar-player and profile queries at each size.
+
+    python benchmarks/bench_analytics.py [--sizes 1000,10000,100000,250000] [--queries 200]
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from analytics import RAW_FIELDS, ColumnStore  # noqa: E402
+
+
+def synthetic_store(size, seed=7):
+    rng = np.random.default_rng(seed)
+    games = rng.integers(1, 163, size)
+    at_bat = games * rng.integers(2, 5, size)
+    hits = (at_bat * rng.uniform(0.18, 0.33, size)).astype(np.int64)
+    doubles = (hits * rng.uniform(0.1, 0.25, size)).astype(np.int64)
+    triples = (hits * rng.uniform(0.0, 0.03, size)).astype(np.int64)
+    home_runs = (hits * rng.uniform(0.0, 0.2, size)).astype(np.int64)
+    walks = (at_bat * rng.uniform(0.04, 0.15, size)).astype(np.int64)
+    average = np.divide(hits, at_bat, out=np.zeros(size), where=at_bat > 0)
+    on_base = np.divide(hits + walks, at_bat + walks, out=np.zeros(size), where=at_bat + walks > 0)
+    total_bases = hits + doubles + 2 * triples + 3 * home_runs
+    slugging = np.divide(total_bases, at_bat, out=np.zeros(size), where=at_bat > 0)
+    raw = {
+        'games': games, 'at_bat': at_bat, 'runs': rng.integers(0, 130, size), 'hits': hits,
+        'double_2b': doubles, 'third_baseman': triples, 'home_runs': home_runs,
+        'rbi': rng.integers(0, 140, size), 'walks': walks, 'strikeouts': (at_bat * rng.uniform(0.1, 0.35, size)),
+        'stolen_bases': rng.integers(0, 50, size), 'caught_stealing': rng.integers(0, 12, size),
+        'batting_average': average, 'on_base_percentage': on_base, 'slugging_percentage': slugging,
+        'on_base_plus_slugging': on_base + slugging,
+    }
+    assert set(raw) == set(RAW_FIELDS)
+    ids = np.arange(1, size + 1)
+    return ColumnStore(ids, [f'Player {i}' for i in ids], ['SS'] * size, raw)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--sizes', default='1000,10000,100000,250000')
+    parser.add_argument('--queries', type=int, default=200)
+    args = parser.parse_args()
+
+    print(f"{'players':>9} {'build ms':>10} {'similar ms':>11} {'profile ms':>11}")
+    for size in (int(value) for value in args.sizes.split(',')):
+        started = time.perf_counter()
+        store = synthetic_store(size)
+        build_ms = (time.perf_counter() - started) * 1000
+
+        rng = np.random.default_rng(size)
+        targets = [int(player_id) for player_id in rng.choice(store.ids, args.queries)]
+
+        started = time.perf_counter()
+        for player_id in targets:
+            store.similar(player_id, k=10)
+        similar_ms = (time.perf_counter() - started) * 1000 / len(targets)
+
+        started = time.perf_counter()
+        for player_id in targets:
+            store.profile(player_id)
+        profile_ms = (time.perf_counter() - started) * 1000 / len(targets)
+
+        print(f"{size:>9} {build_ms:>10.1f} {similar_ms:>11.3f} {profile_ms:>11.3f}")
+
+
+if __name__ == '__main__':
+    main()
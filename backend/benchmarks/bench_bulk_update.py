@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Benchmark for bulk player updates and batch reads.
+
+Seeds a throwaway SQLite database, then times N single-player PUTs against
+one PATCH /api/players carrying the same N updates, and N single-player
+GETs against one GET /api/players?ids=... through the Flask test client.
+
+    python benchmarks/bench_bulk_update.py [--players 2000] [--batch 500]
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+DATABASE_FILE = os.path.join(tempfile.mkdtemp(), 'bench_bulk_update.db')
+os.environ['DATABASE_URL'] = f'sqlite:///{DATABASE_FILE}'
+
+from app import create_app, services  # noqa: E402
+from migrate import upgrade_database  # noqa: E402
+from models import Player, db  # noqa: E402
+
+app = create_app()
+
+
+def seed(count, rng):
+    with app.app_context():
+        upgrade_database(db.engine)
+        db.session.add_all(
+            Player(name=f'Player {i}', position=rng.choice(['C', '1B', 'SS', 'CF']), games=rng.randint(1, 162),
+                   at_bat=rng.randint(100, 600), hits=rng.randint(20, 200), walks=rng.randint(0, 90),
+                   batting_average=round(rng.uniform(0.18, 0.33), 3), slugging_percentage=round(rng.uniform(0.3, 0.6), 3))
+            for i in range(count)
+        )
+        db.session.commit()
+
+
+def timed(label, run, count):
+    services(app).response_cache.invalidate()
+    started = time.perf_counter()
+    run()
+    elapsed = time.perf_counter() - started
+    print(f"{label:<28} {elapsed * 1000:>9.1f} ms {count / elapsed:>10.0f} rows/s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--players', type=int, default=2000)
+    parser.add_argument('--batch', type=int, default=500)
+    args = parser.parse_args()
+
+    rng = random.Random(13)
+    seed(args.players, rng)
+    # Keep background refreshes from competing with the timed requests
+    services(app).summary_refresher.schedule = lambda: None
+    services(app).analytics_engine.invalidate = lambda: None
+
+    client = app.test_client()
+    ids = rng.sample(range(1, args.players + 1), args.batch)
+    edits = [{'id': player_id, 'hits': rng.randint(20, 200), 'games': rng.randint(1, 162)} for player_id in ids]
+
+    def per_row_updates():
+        for edit in edits:
+            assert client.put(f"/api/players/{edit['id']}", json=edit).status_code == 200
+
+    def bulk_update():
+        assert client.patch('/api/players', json=edits).status_code == 200
+
+    def per_row_reads():
+        for player_id in ids:
+            assert client.get(f'/api/players/{player_id}').status_code == 200
+
+    def batch_read():
+        response = client.get(f"/api/players?ids={','.join(map(str, ids))}")
+        assert response.status_code == 200 and len(response.get_json()) == len(ids)
+
+    print(f"{args.batch} of {args.players} players")
+    timed('PUT /api/players/<id> x N', per_row_updates, len(edits))
+    timed('PATCH /api/players', bulk_update, len(edits))
+    timed('GET /api/players/<id> x N', per_row_reads, len(ids))
+    timed('GET /api/players?ids=', batch_read, len(ids))
+
+    os.remove(DATABASE_FILE)
+
+
+if __name__ == '__main__':
+    main()
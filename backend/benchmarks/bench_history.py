@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+Benchmark for the stat history store.
+
+Loads synthetic players into a throwaway SQLite database and records one
+snapshot per simulated day, moving every player's counting stats a little
+between snapshots. Reports the time to record a snapshot, the stored size
+against raw 8-byte values, and the latency of player history (cold and
+cached) and movers queries.
+
+    python benchmarks/bench_history.py [--players 20000] [--snapshots 200] [--queries 50]
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import date, datetime, timedelta
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+DATABASE_FILE = os.path.join(tempfile.mkdtemp(), 'bench_history.db')
+os.environ['DATABASE_URL'] = f'sqlite:///{DATABASE_FILE}'
+
+import history  # noqa: E402
+from app import create_app  # noqa: E402
+from datasets import load_players  # noqa: E402
+from migrate import upgrade_database  # noqa: E402
+from models import Player, db  # noqa: E402
+
+# One simulated day: every player plays, and most add a few hits, walks and strikeouts
+PLAY_DAY = (
+    "UPDATE players SET games = games + 1, at_bat = at_bat + 4, "
+    "hits = hits + (id * :day) % 3, walks = walks + (id + :day) % 2, "
+    "strikeouts = strikeouts + (id * 7 + :day) % 2, home_runs = home_runs + ((id + :day) % 9 = 0), "
+    "batting_average = round((hits + (id * :day) % 3) * 1.0 / (at_bat + 4), 3)"
+)
+
+
+def timed_ms(run):
+    started = time.perf_counter()
+    result = run()
+    return (time.perf_counter() - started) * 1000, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--players', type=int, default=20000)
+    parser.add_argument('--snapshots', type=int, default=200)
+    parser.add_argument('--queries', type=int, default=50)
+    args = parser.parse_args()
+
+    app = create_app()
+    first_day = datetime(2026, 4, 1, 6)
+    with app.app_context():
+        upgrade_database(db.engine)
+        load_players(db.engine, args.players)
+
+        record_ms = []
+        for day in range(args.snapshots):
+            with db.engine.begin() as connection:
+                if day:
+                    connection.exec_driver_sql(PLAY_DAY.replace(':day', str(day)))
+                elapsed, _ = timed_ms(lambda: history.record_snapshot(connection, 'sync',
+                                                                      taken_at=first_day + timedelta(days=day)))
+                record_ms.append(elapsed)
+
+        with db.engine.connect() as connection:
+            snapshots = history.list_snapshots(connection)
+        stored = sum(snapshot['stored_bytes'] for snapshot in snapshots)
+        raw = args.players * len(history.HISTORY_FIELDS) * 8 * args.snapshots
+        keyframes = sum(snapshot['keyframe'] for snapshot in snapshots)
+
+        print(f"{args.players} players x {args.snapshots} snapshots ({keyframes} keyframes)")
+        print(f"record snapshot            {sum(record_ms) / len(record_ms):>9.1f} ms avg {max(record_ms):>9.1f} ms max")
+        print(f"stored                     {stored / 1e6:>9.2f} MB    {raw / stored:>9.1f}x smaller than raw int64")
+
+        rng = random.Random(22)
+        player_ids = [player_id for (player_id,) in db.session.query(Player.id)]
+        targets = rng.sample(player_ids, min(args.queries, len(player_ids)))
+        store = history.HistoryStore(max_blocks=app.config['HISTORY_CACHE_BLOCKS'])
+        with db.engine.connect() as connection:
+            cold = [timed_ms(lambda: history.HistoryStore().player_history(connection, player_id))[0]
+                    for player_id in targets]
+            warm = []
+            for player_id in targets:
+                # The first read decodes and caches the player's block in every snapshot
+                store.player_history(connection, player_id, ['hits', 'home_runs', 'batting_average'])
+                warm.append(timed_ms(lambda: store.player_history(connection, player_id,
+                                                                  ['hits', 'home_runs', 'batting_average']))[0])
+            since = date(2026, 4, 1) + timedelta(days=args.snapshots // 2)
+            movers = [timed_ms(lambda: store.movers(connection, stat, since))[0]
+                      for stat in ['hits', 'home_runs', 'batting_average']]
+
+        print(f"player history, all stats  {sum(cold) / len(cold):>9.1f} ms (cold cache)")
+        print(f"player history, 3 stats    {sum(warm) / len(warm):>9.1f} ms (cached blocks)")
+        print(f"movers since a date        {sum(movers) / len(movers):>9.1f} ms")
+
+    os.remove(DATABASE_FILE)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+Benchmark for the player list serialization path.
+
+Seeds a throwaway SQLite database and times encoding the full player list
+three ways: ORM objects through to_dict() and the stdlib encoder (the old
+path), Core row tuples through serialize.encode, and the streamed,
+batch-by-batch JSON array.
+
+    python benchmarks/bench_serialize.py [--sizes 1000,10000,50000]
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+DATABASE_FILE = os.path.join(tempfile.mkdtemp(), 'bench_serialize.db')
+os.environ['DATABASE_URL'] = f'sqlite:///{DATABASE_FILE}'
+
+import serialize  # noqa: E402
+from app import create_app  # noqa: E402
+from migrate import upgrade_database  # noqa: E402
+from models import Player, db  # noqa: E402
+from queries import list_players, stream_players  # noqa: E402
+
+app = create_app()
+
+
+def seed(count):
+    with app.app_context():
+        upgrade_database(db.engine)
+        db.session.query(Player).delete()
+        db.session.add_all(
+            Player(name=f'Player {i}', position='SS', games=100 + i % 60, at_bat=400 + i % 200,
+                   hits=100 + i % 90, walks=i % 80, batting_average=0.25, slugging_percentage=0.4)
+            for i in range(count)
+        )
+        db.session.commit()
+
+
+def orm_path():
+    players = Player.query.filter(Player.removed_at.is_(None)).order_by(Player.hits.desc(), Player.id.desc())
+    return json.dumps([player.to_dict() for player in players]).encode('utf-8')
+
+
+def core_path():
+    rows, _ = list_players('hits', 'desc')
+    return serialize.encode(serialize.shape(rows, serialize.JSON))
+
+
+def streamed_path():
+    fields, batches = stream_players('hits', 'desc')
+    return sum(len(chunk) for chunk in serialize.iter_json_array(fields, batches))
+
+
+def timed(run):
+    with app.app_context():
+        started = time.perf_counter()
+        run()
+        return (time.perf_counter() - started) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--sizes', default='1000,10000,50000')
+    args = parser.parse_args()
+
+    encoder = 'orjson' if serialize.orjson is not None else 'json'
+    print(f"encoder: {encoder}")
+    print(f"{'players':>9} {'ORM ms':>9} {'Core ms':>9} {'stream ms':>10}")
+    for size in (int(value) for value in args.sizes.split(',')):
+        seed(size)
+        print(f"{size:>9} {timed(orm_path):>9.1f} {timed(core_path):>9.1f} {timed(streamed_path):>10.1f}")
+
+    os.remove(DATABASE_FILE)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""
+Check the PostgreSQL COPY path of the seed ingestion without a server.
+
+Runs ingest.copy_rows on synthetic seed rows against a fake psycopg2
+cursor that captures the COPY statement and its CSV payload, then parses
+the payload back the way PostgreSQL reads CSV: only an unquoted field equal
+to the statement's NULL marker is NULL, any other field (empty or not) is a
+value. Exits with status 1 if the statement does not list every insert
+column, a row has the wrong number of fields, or a NULL does not come back
+as NULL (and a value as that value).
+
+    python benchmarks/check_copy_rows.py [--players 500]
+"""
+import argparse
+import os
+import re
+import sys
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from datasets import synthetic_records  # noqa: E402
+from ingest import INSERT_COLUMNS, copy_rows, keyed_rows, player_row  # noqa: E402
+
+
+def read_csv_like_postgres(payload, null):
+    """Split a CSV payload into rows of values, None where PostgreSQL would read NULL"""
+    rows, fields, field, quoted, in_quotes = [], [], [], False, False
+    position = 0
+    while position < len(payload):
+        char = payload[position]
+        if in_quotes:
+            if char == '"' and payload[position + 1:position + 2] == '"':
+                field.append('"')
+                position += 1
+            elif char == '"':
+                in_quotes = False
+            else:
+                field.append(char)
+        elif char == '"':
+            in_quotes = quoted = True
+        elif char in ',\r\n':
+            value = ''.join(field)
+            fields.append(None if not quoted and value == null else value)
+            field, quoted = [], False
+            if char != ',':
+                if payload[position:position + 2] == '\r\n':
+                    position += 1
+                rows.append(fields)
+                fields = []
+        else:
+            field.append(char)
+        position += 1
+    return rows
+
+
+class FakeCursor:
+    """Records copy_expert() calls the way psycopg2 would receive them"""
+
+    def __init__(self, calls):
+        self.calls = calls
+
+    def copy_expert(self, sql, file):
+        self.calls.append((sql, file.read()))
+
+    def close(self):
+        pass
+
+
+def fake_connection(calls):
+    return SimpleNamespace(connection=SimpleNamespace(cursor=lambda: FakeCursor(calls)))
+
+
+def check(rows):
+    """Problems found in the COPY issued for rows"""
+    calls = []
+    copy_rows(fake_connection(calls), rows)
+    if len(calls) != 1:
+        return [f'expected one COPY, got {len(calls)}']
+    sql, payload = calls[0]
+    problems = []
+    match = re.match(r"COPY players \(([^)]*)\) FROM STDIN WITH \(FORMAT csv(?:, NULL '([^']*)')?\)$", sql)
+    if match is None or [column.strip() for column in match.group(1).split(',')] != INSERT_COLUMNS:
+        return [f'COPY does not list the insert columns: {sql}']
+    # Without a NULL option PostgreSQL's CSV NULL is an unquoted empty field
+    lines = read_csv_like_postgres(payload, match.group(2) or '')
+    if len(lines) != len(rows):
+        problems.append(f'{len(lines)} CSV rows for {len(rows)} players')
+    for number, (row, fields) in enumerate(zip(rows, lines), start=1):
+        if len(fields) != len(INSERT_COLUMNS):
+            problems.append(f'row {number}: {len(fields)} fields for {len(INSERT_COLUMNS)} columns')
+            continue
+        for column, field in zip(INSERT_COLUMNS, fields):
+            expected = None if row[column] is None else str(row[column])
+            if field != expected:
+                problems.append(f'row {number}: {column} reads back as {field!r}, expected {expected!r}')
+    return problems
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--players', type=int, default=500)
+    args = parser.parse_args()
+
+    rows = list(keyed_rows(synthetic_records(args.players)))
+    # NULL and empty-string stats, and names needing quotes, must survive too
+    sparse = player_row({'Player name': 'O"Neil, Paul', 'position': '', 'AVG': None})
+    sparse['source_key'] = 'o"neil, paul'
+    rows.append(sparse)
+    try:
+        problems = check(rows)
+    except Exception as e:
+        problems = [f'copy_rows raised {type(e).__name__}: {e}']
+
+    for problem in problems[:20]:
+        print(f"❌ {problem}")
+    if problems:
+        sys.exit(1)
+    print(f"✅ COPY of {len(rows)} players lists all {len(INSERT_COLUMNS)} insert columns and keeps NULLs")
+
+
+if __name__ == '__main__':
+    main()
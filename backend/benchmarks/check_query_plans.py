@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+"""
+Check that the player list queries are served by indexes.
+
+Migrates a throwaway SQLite database (or the one given with --database-url),
+loads synthetic players, runs ANALYZE and EXPLAINs the list queries built
+by queries.player_query. Every query must use an index rather than scan the
+players table; sorted pages must also be read in index order, with no
+separate sort step, and keyset pages must seek to the cursor with an index
+bound on the sort column rather than walk the index from its start. Exits
+with status 1 if any plan fails.
+
+    python benchmarks/check_query_plans.py [--players 20000] [--database-url postgresql://localhost/baseball_plans]
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+# Keyset page whose cursor is already among the NULL sort keys
+NULL_TAIL = 'null tail'
+
+# (description, sort_by, order, filters, keyset page, must avoid a sort step)
+CASES = [
+    ('first page by hits', 'hits', 'desc', None, False, True),
+    ('first page by home_runs', 'home_runs', 'desc', None, False, True),
+    ('first page by batting_average', 'batting_average', 'desc', None, False, True),
+    ('first page by hits_per_game', 'hits_per_game', 'desc', None, False, True),
+    ('first page by isolated_power', 'isolated_power', 'desc', None, False, True),
+    ('first page by strikeout_rate', 'strikeout_rate', 'desc', None, False, True),
+    ('first page by walk_rate', 'walk_rate', 'desc', None, False, True),
+    ('first page by stolen_base_pct', 'stolen_base_pct', 'desc', None, False, True),
+    ('first page by name', 'name', 'asc', None, False, True),
+    ('keyset page by hits', 'hits', 'desc', None, True, True),
+    ('keyset page by batting_average', 'batting_average', 'desc', None, True, True),
+    ('keyset page by name', 'name', 'asc', None, True, True),
+    ('keyset page in the NULL tail', 'stolen_base_pct', 'desc', None, NULL_TAIL, True),
+    ('position filter', 'hits', 'desc', {'position': ['SS']}, False, False),
+    ('range filter on the sort column', 'home_runs', 'desc', {'min': {'home_runs': 30.0}}, False, False),
+]
+
+
+def sqlite_plan(connection, sql, sort_by):
+    rows = connection.exec_driver_sql(f'EXPLAIN QUERY PLAN {sql}').all()
+    details = [row[-1] for row in rows]
+    full_scan = any(detail.startswith('SCAN players') and 'INDEX' not in detail for detail in details)
+    sorted_separately = any('TEMP B-TREE FOR ORDER BY' in detail for detail in details)
+    # e.g. "SEARCH players USING INDEX ix_players_hits_id (hits<?)"; a bare SCAN walks the whole index
+    seeks = any(detail.startswith('SEARCH players USING') and f'({sort_by}' in detail for detail in details)
+    return details, full_scan, sorted_separately, seeks
+
+
+def postgres_plan(connection, sql, sort_by):
+    plan = connection.exec_driver_sql(f'EXPLAIN (FORMAT JSON) {sql}').scalar()
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    nodes = []
+
+    def walk(node):
+        nodes.append(node)
+        for child in node.get('Plans', []):
+            walk(child)
+
+    walk(plan[0]['Plan'])
+    details = [f"{node['Node Type']} {node.get('Index Name') or node.get('Relation Name') or ''}".strip()
+               for node in nodes]
+    full_scan = any(node['Node Type'] == 'Seq Scan' and node.get('Relation Name') == 'players' for node in nodes)
+    sorted_separately = any(node['Node Type'] in ('Sort', 'Incremental Sort') for node in nodes)
+    seeks = any(sort_by in node.get('Index Cond', '') for node in nodes)
+    return details, full_scan, sorted_separately, seeks
+
+
+def cursor_for(sort_by, order, players):
+    """Cursor pointing a third of the way into the list"""
+    from queries import list_players
+
+    _, cursor = list_players(sort_by, order, fields=['id'], limit=max(1, players // 3))
+    return cursor
+
+
+def check(connection, players):
+    from queries import encode_cursor, player_query
+
+    explain = postgres_plan if connection.dialect.name == 'postgresql' else sqlite_plan
+    failures = 0
+    for description, sort_by, order, filters, keyset, ordered in CASES:
+        after = None
+        if keyset == NULL_TAIL:
+            after = encode_cursor(None, players + 1)
+        elif keyset:
+            after = cursor_for(sort_by, order, players)
+        query, _ = player_query(sort_by, order, after=after, filters=filters)
+        sql = str(query.limit(51).compile(connection, compile_kwargs={'literal_binds': True}))
+        details, full_scan, sorted_separately, seeks = explain(connection, sql, sort_by)
+
+        problems = []
+        if full_scan:
+            problems.append('full table scan')
+        if ordered and sorted_separately:
+            problems.append('separate sort step')
+        if keyset and not seeks:
+            problems.append('no index seek to the cursor')
+        failures += bool(problems)
+        print(f"{'❌' if problems else '✅'} {description:<34} {' | '.join(details)}"
+              + (f"  <- {', '.join(problems)}" if problems else ''))
+    return failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--players', type=int, default=20000)
+    parser.add_argument('--database-url', help='Database to check (default: temporary SQLite); its players are replaced')
+    args = parser.parse_args()
+
+    database_file = None
+    if args.database_url:
+        os.environ['DATABASE_URL'] = args.database_url
+    else:
+        database_file = os.path.join(tempfile.mkdtemp(), 'query_plans.db')
+        os.environ['DATABASE_URL'] = f'sqlite:///{database_file}'
+
+    from app import create_app
+    from datasets import load_players
+    from migrate import upgrade_database
+    from models import db
+
+    app = create_app()
+    with app.app_context():
+        upgrade_database(db.engine)
+        load_players(db.engine, args.players)
+        with db.engine.begin() as connection:
+            connection.exec_driver_sql('ANALYZE')
+        with db.engine.connect() as connection:
+            failures = check(connection, args.players)
+
+    if database_file:
+        os.remove(database_file)
+    if failures:
+        print(f"\n❌ {failures} of {len(CASES)} queries are not served by an index")
+        sys.exit(1)
+    print(f"\n✅ All {len(CASES)} list queries use index scans")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+Startup-time budget for the API.
+
+Imports app and calls create_app() in fresh interpreters under
+`python -X importtime`, with DATABASE_URL pointing at a database that does
+not exist, so the check also shows that startup never connects. Prints the
+slowest imports of the fastest run and exits with status 1 if that run
+exceeds --budget-ms, or if a module meant to load lazily on first use was
+imported at startup.
+
+    python benchmarks/check_startup.py [--budget-ms 1000] [--runs 5] [--top 15]
+"""
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+
+BACKEND_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+
+# Imported only when first needed: on the first LLM call and the first seed fetch
+LAZY_MODULES = ['google.generativeai', 'grpc', 'requests']
+
+STARTUP = (
+    "import time\n"
+    "started = time.perf_counter()\n"
+    "import app\n"
+    "app.create_app()\n"
+    "print((time.perf_counter() - started) * 1000)\n"
+)
+
+
+def measure():
+    """One cold start: (milliseconds, [(cumulative_us, module), ...])"""
+    missing = os.path.join(tempfile.gettempdir(), 'no-such-dir', 'startup.db')
+    env = dict(os.environ, DATABASE_URL=f'sqlite:///{missing}', GEMINI_API_KEY='startup-check')
+    env.pop('PROMETHEUS_MULTIPROC_DIR', None)
+    completed = subprocess.run([sys.executable, '-X', 'importtime', '-c', STARTUP], cwd=BACKEND_DIR, env=env,
+                               capture_output=True, text=True, check=True)
+    imports = []
+    for line in completed.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        imports.append((int(cumulative), name.strip()))
+    return float(completed.stdout.strip().splitlines()[-1]), imports
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--budget-ms', type=float, default=1000)
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--top', type=int, default=15)
+    args = parser.parse_args()
+
+    runs = [measure() for _ in range(args.runs)]
+    elapsed, imports = min(runs, key=lambda run: run[0])
+
+    print(f"{'cumulative ms':>13}  module")
+    for cumulative, name in sorted(imports, reverse=True)[:args.top]:
+        print(f"{cumulative / 1000:>13.1f}  {name}")
+
+    failed = False
+    lazy = sorted({name for _, name in imports for module in LAZY_MODULES
+                   if name == module or name.startswith(module + '.')})
+    if lazy:
+        failed = True
+        print(f"\n❌ Imported at startup instead of on first use: {', '.join(lazy)}")
+
+    print(f"\nimport app + create_app(): {elapsed:.0f} ms (best of {args.runs}, budget {args.budget_ms:.0f} ms)")
+    if elapsed > args.budget_ms:
+        failed = True
+        print("❌ Startup is over budget")
+    if failed:
+        sys.exit(1)
+    print("✅ Startup within budget")
+
+
+if __name__ == '__main__':
+    main()
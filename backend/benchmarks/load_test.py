@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+Load test comparing gunicorn worker modes.
+
+Seeds a throwaway SQLite database, starts run_production.py once per
+WORKER_CLASS, drives it with concurrent keep-alive clients for a fixed
+duration, and reports requests/sec and p50/p99 latency for each mode.
+
+    python benchmarks/load_test.py [--modes sync,gthread,gevent] [--concurrency 32] [--duration 10]
+"""
+import argparse
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+
+import requests
+
+BACKEND_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, BACKEND_DIR)
+
+from loadgen import percentile, run_load  # noqa: E402
+
+DATABASE_FILE = os.path.join(tempfile.mkdtemp(), 'load_test.db')
+os.environ['DATABASE_URL'] = f'sqlite:///{DATABASE_FILE}'
+
+# Mix of read traffic: the cached list, paginated and filtered pages, single players
+PATHS = [
+    '/api/players',
+    '/api/players?limit=50&sort_by=home_runs',
+    '/api/players?position=SS&min_games=50&limit=25',
+    '/api/players/{id}',
+    '/api/players/{id}',
+    '/api/leaderboards?stat=hits&limit=10',
+]
+
+
+def seed(count):
+    from app import create_app
+    from migrate import upgrade_database
+    from models import Player, db
+
+    rng = random.Random(16)
+    app = create_app()
+    with app.app_context():
+        upgrade_database(db.engine)
+        db.session.add_all(
+            Player(name=f'Player {i}', position=rng.choice(['C', '1B', 'SS', 'CF']), games=rng.randint(1, 162),
+                   at_bat=rng.randint(100, 600), hits=rng.randint(20, 200), home_runs=rng.randint(0, 50),
+                   batting_average=round(rng.uniform(0.18, 0.33), 3), slugging_percentage=round(rng.uniform(0.3, 0.6), 3))
+            for i in range(count)
+        )
+        db.session.commit()
+
+
+def start_server(mode, port, workers):
+    env = dict(os.environ, WORKER_CLASS=mode, PORT=str(port), HOST='127.0.0.1', FLASK_DEBUG='false')
+    if workers:
+        env['WEB_CONCURRENCY'] = str(workers)
+    server = subprocess.Popen([sys.executable, 'run_production.py'], cwd=BACKEND_DIR, env=env,
+                              stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        try:
+            if requests.get(f'http://127.0.0.1:{port}/api/health', timeout=1).ok:
+                return server
+        except requests.RequestException:
+            time.sleep(0.2)
+    server.kill()
+    raise RuntimeError(f'{mode} server did not start')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--modes', default='sync,gthread,gevent')
+    parser.add_argument('--concurrency', type=int, default=32)
+    parser.add_argument('--duration', type=float, default=10)
+    parser.add_argument('--players', type=int, default=2000)
+    parser.add_argument('--workers', type=int, help='WEB_CONCURRENCY for every mode (default: derived from CPUs)')
+    parser.add_argument('--port', type=int, default=5055)
+    args = parser.parse_args()
+
+    seed(args.players)
+    print(f"{args.concurrency} clients for {args.duration:g}s against {args.players} players")
+    print(f"{'mode':<8} {'requests':>9} {'errors':>7} {'req/s':>8} {'p50 ms':>8} {'p99 ms':>8}")
+    for mode in args.modes.split(','):
+        server = start_server(mode, args.port, args.workers)
+        try:
+            completed, errors, latencies = run_load(f'http://127.0.0.1:{args.port}', PATHS, args.players,
+                                                    args.concurrency, args.duration)
+        finally:
+            server.terminate()
+            server.wait()
+        print(f"{mode:<8} {completed:>9} {errors:>7} {completed / args.duration:>8.0f} "
+              f"{percentile(latencies, 0.5):>8.1f} {percentile(latencies, 0.99):>8.1f}")
+
+    os.remove(DATABASE_FILE)
+
+
+if __name__ == '__main__':
+    main()
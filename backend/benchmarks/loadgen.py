@@ -0,0 +1,53 @@
+"""
+Closed-loop HTTP load generator shared by the load-test scripts.
+
+Each client thread keeps one keep-alive session and issues requests back to
+back until the deadline; latencies from all clients are merged at the end.
+"""
+import random
+import threading
+import time
+
+import requests
+
+
+def run_load(base_url, paths, players, concurrency, duration, method='GET'):
+    """
+    Drive base_url with concurrency clients for duration seconds.
+
+    paths are picked at random and may contain {id}, filled with a player id
+    in 1..players. Returns (requests completed, errors, sorted latencies in ms).
+    """
+    latencies, errors = [], []
+    lock = threading.Lock()
+    stop_at = time.monotonic() + duration
+
+    def client(seed):
+        rng = random.Random(seed)
+        session = requests.Session()
+        own_latencies, own_errors = [], 0
+        while time.monotonic() < stop_at:
+            path = rng.choice(paths).format(id=rng.randint(1, players))
+            started = time.perf_counter()
+            try:
+                if not session.request(method, base_url + path, timeout=30).ok:
+                    own_errors += 1
+            except requests.RequestException:
+                own_errors += 1
+            own_latencies.append((time.perf_counter() - started) * 1000)
+        with lock:
+            latencies.extend(own_latencies)
+            errors.append(own_errors)
+
+    threads = [threading.Thread(target=client, args=(index,)) for index in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return len(latencies), sum(errors), sorted(latencies)
+
+
+def percentile(sorted_values, fraction):
+    if not sorted_values:
+        return float('nan')
+    return sorted_values[min(int(fraction * len(sorted_values)), len(sorted_values) - 1)]
@@ -0,0 +1,272 @@
+#!/usr/bin/env python3
+"""
+Benchmark suite with machine-readable results and a stored baseline.
+
+For each dataset size, synthetic players are loaded into a throwaway
+SQLite file (or the database given with --database-url), then the suite
+measures:
+- seed ingestion and a no-change incremental sync (rows/s)
+- name normalization with a cold and a warm cache (names/s)
+- the full player list: ORM + to_dict() + json vs Core rows + serialize (ms)
+- list queries: first sorted page, filtered page, name search (ms)
+- HTTP: an in-process threaded server with a fake Gemini client, driven by
+  the load generator for read traffic and streamed descriptions (req/s, p50, p99)
+
+Results are written as JSON. When a baseline exists every metric is compared
+against it, and the exit status is 1 if any regressed by more than --tolerance.
+
+    python benchmarks/suite.py [--sizes 1000,10000,100000,1000000] [--output results.json]
+                               [--baseline benchmarks/baseline.json] [--save-baseline]
+"""
+import argparse
+import json
+import logging
+import os
+import platform
+import sys
+import tempfile
+import threading
+import time
+
+BENCHMARKS_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(BENCHMARKS_DIR, '..'))
+
+DEFAULT_BASELINE = os.path.join(BENCHMARKS_DIR, 'baseline.json')
+
+READ_PATHS = [
+    '/api/players?limit=50&sort_by=home_runs',
+    '/api/players?position=SS&min_games=50&limit=25',
+    '/api/players?q=gonz&limit=25',
+    '/api/players/{id}',
+    '/api/players/{id}',
+]
+DESCRIBE_PATHS = ['/api/players/{id}/description/stream?force=true']
+
+
+class FakeGemini:
+    """Stands in for GeminiClient with a fixed latency and no network"""
+
+    def __init__(self, latency=0.2, chunks=5):
+        self.latency = latency
+        self.chunks = chunks
+
+    def generate(self, prompt):
+        from llm import Generation
+        time.sleep(self.latency)
+        return Generation(text='A steady, productive hitter. ' * 4, prompt_tokens=len(prompt.split()),
+                          output_tokens=24)
+
+    def stream(self, prompt):
+        for index in range(self.chunks):
+            time.sleep(self.latency / self.chunks)
+            yield f'Part {index} of a generated description. '
+
+
+class Results:
+    """Named measurements with their unit and which direction is better"""
+
+    def __init__(self):
+        self.metrics = {}
+
+    def add(self, name, value, unit, better='lower'):
+        self.metrics[name] = {'value': round(value, 3), 'unit': unit, 'better': better}
+        print(f"  {name:<44} {value:>12.1f} {unit}")
+
+
+def best_ms(run, repeat=3):
+    """Fastest of repeat runs, in milliseconds"""
+    best = float('inf')
+    for _ in range(repeat):
+        started = time.perf_counter()
+        run()
+        best = min(best, (time.perf_counter() - started) * 1000)
+    return best
+
+
+def bench_ingest(results, size, engine):
+    from datasets import load_players, synthetic_records
+    from ingest import sync_players
+
+    stats = load_players(engine, size)
+    results.add(f'ingest[{size}].rows_per_sec', stats.rows_per_sec, 'rows/s', better='higher')
+    with engine.begin() as connection:
+        sync = sync_players(connection, synthetic_records(size))
+    results.add(f'sync_unchanged[{size}].rows_per_sec', sync.rows / sync.seconds if sync.seconds else 0,
+                'rows/s', better='higher')
+
+
+def bench_normalize(results, size):
+    import normalize
+    from datasets import synthetic_records
+
+    names = [record['Player name'] for record in synthetic_records(size)]
+
+    def run():
+        for name in names:
+            normalize.fix_accented_characters(name)
+
+    normalize._fix_accented.cache_clear()
+    started = time.perf_counter()
+    run()
+    cold = time.perf_counter() - started
+    results.add(f'normalize_cold[{size}].names_per_sec', size / cold, 'names/s', better='higher')
+    results.add(f'normalize_warm[{size}].names_per_sec', size / (best_ms(run) / 1000), 'names/s', better='higher')
+
+
+def bench_serialization(results, size):
+    import serialize
+    from models import Player
+    from queries import list_players
+
+    def orm_path():
+        json.dumps([player.to_dict() for player in Player.query.order_by(Player.hits.desc()).all()])
+
+    def core_path():
+        rows, _ = list_players('hits', 'desc')
+        serialize.encode(serialize.shape(rows, serialize.JSON))
+
+    results.add(f'list_orm_to_dict[{size}].ms', best_ms(orm_path), 'ms')
+    results.add(f'list_core_serialize[{size}].ms', best_ms(core_path), 'ms')
+
+
+def bench_queries(results, size):
+    from queries import list_players
+
+    cases = {
+        'first_page': dict(limit=50),
+        'filtered_page': dict(limit=50, filters={'position': ['SS'], 'min': {'games': 100.0}}),
+        'name_search': dict(limit=50, filters={'q': 'gonz'}),
+    }
+    for name, kwargs in cases.items():
+        results.add(f'query_{name}[{size}].ms', best_ms(lambda: list_players('home_runs', 'desc', **kwargs), 5), 'ms')
+
+
+def bench_http(results, size, args, app):
+    from werkzeug.serving import make_server
+
+    from app import services
+    from jobs import RateLimiter
+    from loadgen import percentile, run_load
+
+    fake = FakeGemini(latency=args.llm_latency)
+    app.config['GEMINI_API_KEY'] = 'fake'
+    services(app).description_jobs.client_factory = lambda: fake
+    services(app).description_jobs.rate_limiter = RateLimiter(0)
+
+    # Per-request access lines would drown the results
+    logging.getLogger('werkzeug').setLevel(logging.ERROR)
+    server = make_server('127.0.0.1', args.port, app, threaded=True)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        for scenario, paths in (('read', READ_PATHS), ('describe', DESCRIBE_PATHS)):
+            completed, errors, latencies = run_load(f'http://127.0.0.1:{args.port}', paths, size,
+                                                    args.concurrency, args.http_duration)
+            results.add(f'http_{scenario}[{size}].requests_per_sec', completed / args.http_duration, 'req/s',
+                        better='higher')
+            results.add(f'http_{scenario}[{size}].p50_ms', percentile(latencies, 0.5), 'ms')
+            results.add(f'http_{scenario}[{size}].p99_ms', percentile(latencies, 0.99), 'ms')
+            if errors:
+                print(f"  ⚠️  {errors} failed {scenario} requests")
+    finally:
+        server.shutdown()
+
+
+def compare(metrics, baseline, tolerance):
+    """Print the change of every metric against the baseline; returns the regressed names"""
+    regressions = []
+    print(f"\n{'metric':<44} {'baseline':>12} {'current':>12} {'change':>8}")
+    for name, metric in metrics.items():
+        base = baseline.get(name)
+        if base is None or not base['value']:
+            continue
+        change = (metric['value'] - base['value']) / base['value']
+        worse = -change if metric['better'] == 'higher' else change
+        flag = ''
+        if worse > tolerance:
+            regressions.append(name)
+            flag = '  ❌ regression'
+        print(f"{name:<44} {base['value']:>12.1f} {metric['value']:>12.1f} {change:>+8.0%}{flag}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--sizes', default='1000,10000')
+    parser.add_argument('--database-url', help='e.g. postgresql://localhost/baseball_bench (default: temporary SQLite)')
+    parser.add_argument('--output', default='benchmark-results.json')
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE)
+    parser.add_argument('--save-baseline', action='store_true', help='Store these results as the new baseline')
+    parser.add_argument('--tolerance', type=float, default=0.2, help='Allowed relative slowdown (default 0.2)')
+    parser.add_argument('--no-http', action='store_true')
+    parser.add_argument('--http-duration', type=float, default=5)
+    parser.add_argument('--concurrency', type=int, default=16)
+    parser.add_argument('--llm-latency', type=float, default=0.2, help='Fake Gemini latency in seconds')
+    parser.add_argument('--port', type=int, default=5066)
+    args = parser.parse_args()
+
+    database_file = None
+    if args.database_url:
+        os.environ['DATABASE_URL'] = args.database_url
+    else:
+        database_file = os.path.join(tempfile.mkdtemp(), 'benchmark.db')
+        os.environ['DATABASE_URL'] = f'sqlite:///{database_file}'
+
+    from app import create_app, services
+    from migrate import upgrade_database
+    from models import db
+
+    results = Results()
+    app = create_app()
+    with app.app_context():
+        upgrade_database(db.engine)
+    for size in (int(value) for value in args.sizes.split(',')):
+        print(f"📊 {size} players")
+        with app.app_context():
+            bench_ingest(results, size, db.engine)
+            services(app).response_cache.invalidate()
+            services(app).analytics_engine.invalidate()
+            bench_normalize(results, size)
+            bench_serialization(results, size)
+            bench_queries(results, size)
+        if not args.no_http:
+            bench_http(results, size, args, app)
+
+    report = {
+        'meta': {
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'database': app.config['DATABASE_URL'].split(':', 1)[0],
+            'sizes': args.sizes,
+            'created_at': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        },
+        'metrics': results.metrics,
+    }
+    with open(args.output, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"\n✅ Results written to {args.output}")
+
+    status = 0
+    if args.save_baseline:
+        with open(args.baseline, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"✅ Baseline saved to {args.baseline}")
+    elif os.path.exists(args.baseline):
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        regressions = compare(results.metrics, baseline['metrics'], args.tolerance)
+        if regressions:
+            print(f"\n❌ {len(regressions)} metrics regressed by more than {args.tolerance:.0%}")
+            status = 1
+        else:
+            print("\n✅ No regressions against the baseline")
+    else:
+        print(f"ℹ️  No baseline at {args.baseline}; run with --save-baseline to create one")
+
+    if database_file:
+        os.remove(database_file)
+    sys.exit(status)
+
+
+if __name__ == '__main__':
+    main()
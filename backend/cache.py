@@ -0,0 +1,231 @@
+"""
+Response cache for the read-only player endpoints.
+
+Entries hold pre-encoded JSON bodies keyed on the request parameters and a
+data version counter. Write endpoints call invalidate(), which bumps the
+version so every older entry is simply never read again and ages out.
+
+Two backends are available: an in-process LRU with TTL (default) and a
+shared Redis backend when CACHE_URL is set, so all gunicorn workers see the
+same entries. The local backend keeps its entries per worker but its version
+counter in a file under the instance dir, so an invalidation in one worker
+retires the entries of every worker on the host.
+"""
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+
+try:
+    import fcntl
+except ImportError:  # Windows: single-process dev server only
+    fcntl = None
+
+from metrics import record_cache
+
+VERSION_KEY = 'players:version'
+MODIFIED_KEY = 'players:modified'
+
+
+class CounterFile:
+    """Counters kept in a small JSON file, updated under an exclusive file lock"""
+
+    def __init__(self, path):
+        self.path = path
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._lock = threading.Lock()
+
+    def _locked(self, operation):
+        with self._lock, open(self.path, 'a+') as handle:
+            if fcntl is not None:
+                fcntl.flock(handle, fcntl.LOCK_EX)
+            try:
+                handle.seek(0)
+                text = handle.read()
+                counters = json.loads(text) if text else {}
+                result, changed = operation(counters)
+                if changed:
+                    handle.seek(0)
+                    handle.truncate()
+                    handle.write(json.dumps(counters))
+                    handle.flush()
+                return result
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(handle, fcntl.LOCK_UN)
+
+    def get(self, key):
+        return self._locked(lambda counters: (counters.get(key), False))
+
+    def set(self, key, value):
+        def write(counters):
+            counters[key] = value
+            return value, True
+        return self._locked(write)
+
+    def incr(self, key):
+        def increment(counters):
+            counters[key] = counters.get(key, 0) + 1
+            return counters[key], True
+        return self._locked(increment)
+
+
+class LocalCacheBackend:
+    """
+    Thread-safe in-process LRU cache with per-entry TTL.
+
+    With counter_path the version counters live in a file shared by every
+    worker on the host; without it they are per process, which is only
+    correct for a single worker.
+    """
+
+    def __init__(self, max_entries=1024, counter_path=None):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._counters = {}
+        self._counter_file = CounterFile(counter_path) if counter_path else None
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            value, expires_at = entry
+            if expires_at is not None and expires_at < time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key, value, ttl=None):
+        expires_at = time.monotonic() + ttl if ttl else None
+        with self._lock:
+            self._entries[key] = (value, expires_at)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def get_counter(self, key):
+        if self._counter_file is not None:
+            return self._counter_file.get(key)
+        with self._lock:
+            return self._counters.get(key)
+
+    def set_counter(self, key, value):
+        if self._counter_file is not None:
+            self._counter_file.set(key, value)
+            return
+        with self._lock:
+            self._counters[key] = value
+
+    def incr(self, key):
+        if self._counter_file is not None:
+            return self._counter_file.incr(key)
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + 1
+            return self._counters[key]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+class RedisCacheBackend:
+    """Shared cache backend on Redis (or any server speaking its protocol)"""
+
+    def __init__(self, url, prefix='baseball:'):
+        import redis
+
+        self.client = redis.Redis.from_url(url)
+        self.prefix = prefix
+
+    def get(self, key):
+        return self.client.get(self.prefix + key)
+
+    def set(self, key, value, ttl=None):
+        self.client.set(self.prefix + key, value, ex=ttl or None)
+
+    def get_counter(self, key):
+        value = self.client.get(self.prefix + key)
+        return None if value is None else float(value)
+
+    def set_counter(self, key, value):
+        self.client.set(self.prefix + key, value)
+
+    def incr(self, key):
+        return self.client.incr(self.prefix + key)
+
+    def clear(self):
+        for key in self.client.scan_iter(match=self.prefix + '*'):
+            self.client.delete(key)
+
+
+class CachedResponse:
+    """A cached, pre-encoded JSON body with its validators"""
+
+    def __init__(self, body, etag, last_modified):
+        self.body = body
+        self.etag = etag
+        self.last_modified = last_modified
+
+
+class ResponseCache:
+    """Versioned cache of encoded JSON responses"""
+
+    def __init__(self, backend, ttl=60):
+        self.backend = backend
+        self.ttl = ttl
+        if self.backend.get_counter(MODIFIED_KEY) is None:
+            self.backend.set_counter(MODIFIED_KEY, time.time())
+
+    def version(self):
+        return int(self.backend.get_counter(VERSION_KEY) or 0)
+
+    def last_modified(self):
+        """Unix time of the most recent invalidation"""
+        return float(self.backend.get_counter(MODIFIED_KEY) or 0)
+
+    def key(self, parts):
+        """
+        Build the cache key for the request parts at the current data version.
+
+        Compute it once per request, before reading the database, so a
+        response built from pre-write data is never stored under a newer
+        version.
+        """
+        return f"players:v{self.version()}:" + '|'.join(str(part) for part in parts)
+
+    def get(self, key):
+        """Return the CachedResponse stored under key, or None on a miss"""
+        packed = self.backend.get(key)
+        record_cache('response', packed is not None)
+        if packed is None:
+            return None
+        etag, body = packed.split(b'\n', 1)
+        return CachedResponse(body, etag.decode('ascii'), self.last_modified())
+
+    def set(self, key, body):
+        """Store an encoded body and return it as a CachedResponse"""
+        etag = hashlib.sha1(body).hexdigest()[:20]
+        self.backend.set(key, etag.encode('ascii') + b'\n' + body, ttl=self.ttl)
+        return CachedResponse(body, etag, self.last_modified())
+
+    def invalidate(self):
+        """Mark all cached responses stale after a write"""
+        self.backend.set_counter(MODIFIED_KEY, time.time())
+        self.backend.incr(VERSION_KEY)
+
+
+def create_cache(config, instance_path):
+    """Build the ResponseCache described by the app config"""
+    ttl = int(config.get('CACHE_TTL', 60))
+    if config.get('CACHE_URL'):
+        backend = RedisCacheBackend(config['CACHE_URL'])
+    else:
+        counter_path = config.get('CACHE_VERSION_FILE') or os.path.join(instance_path, 'cache_version.json')
+        backend = LocalCacheBackend(max_entries=int(config.get('CACHE_MAX_ENTRIES', 1024)),
+                                    counter_path=counter_path)
+    return ResponseCache(backend, ttl=ttl)
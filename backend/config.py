@@ -6,6 +6,45 @@ load_dotenv()
 class Config:
     SECRET_KEY = os.environ.get('SECRET_KEY') or 'dev-secret-key'
     DATABASE_URL = os.environ.get('DATABASE_URL') or 'postgresql://localhost:5432/baseball_db'
+    # Optional read replica for read-only endpoints
+    DATABASE_REPLICA_URL = os.environ.get('DATABASE_REPLICA_URL')
+    # Seconds after a write during which replica-routed reads use the primary
+    DB_REPLICA_LAG_WINDOW = float(os.environ.get('DB_REPLICA_LAG_WINDOW', 5))
+    # Connection pool, per engine and per worker process
+    DB_POOL_SIZE = int(os.environ.get('DB_POOL_SIZE', 5))
+    DB_MAX_OVERFLOW = int(os.environ.get('DB_MAX_OVERFLOW', 5))
+    DB_POOL_TIMEOUT = int(os.environ.get('DB_POOL_TIMEOUT', 10))
+    DB_POOL_RECYCLE = int(os.environ.get('DB_POOL_RECYCLE', 1800))
+    DB_POOL_PRE_PING = os.environ.get('DB_POOL_PRE_PING', 'true').lower() == 'true'
     GEMINI_API_KEY = os.environ.get('GEMINI_API_KEY')
+    # 'rest' sends Gemini calls through requests (cooperative under gevent); default is gRPC
+    GEMINI_TRANSPORT = os.environ.get('GEMINI_TRANSPORT')
     FLASK_ENV = os.environ.get('FLASK_ENV', 'development')
     FLASK_DEBUG = os.environ.get('FLASK_DEBUG', 'True').lower() == 'true'
+    # Response cache: in-process LRU by default, shared Redis when CACHE_URL is set
+    CACHE_URL = os.environ.get('CACHE_URL')
+    CACHE_TTL = int(os.environ.get('CACHE_TTL', 60))
+    CACHE_MAX_ENTRIES = int(os.environ.get('CACHE_MAX_ENTRIES', 1024))
+    # Invalidation counter shared by the local caches of all workers on a host (default: <instance>/cache_version.json)
+    CACHE_VERSION_FILE = os.environ.get('CACHE_VERSION_FILE')
+    # Streamed list responses larger than this are sent but not cached
+    CACHE_MAX_BODY_BYTES = int(os.environ.get('CACHE_MAX_BODY_BYTES', 8 * 1024 * 1024))
+    # Seed source: timeouts, retries and the on-disk snapshot (default: <instance>/seed)
+    SEED_SOURCE_URL = os.environ.get('SEED_SOURCE_URL', 'https://api.hirefraction.com/api/test/baseball')
+    SEED_SNAPSHOT_DIR = os.environ.get('SEED_SNAPSHOT_DIR')
+    SEED_CONNECT_TIMEOUT = float(os.environ.get('SEED_CONNECT_TIMEOUT', 5))
+    SEED_READ_TIMEOUT = float(os.environ.get('SEED_READ_TIMEOUT', 20))
+    SEED_RETRIES = int(os.environ.get('SEED_RETRIES', 3))
+    # Seconds a whole fetch (retries and Retry-After waits included) may take; keep under GUNICORN_TIMEOUT (0 disables)
+    SEED_FETCH_DEADLINE = float(os.environ.get('SEED_FETCH_DEADLINE', 25))
+    # Log requests slower than this many milliseconds with their SQL (0 disables)
+    SLOW_REQUEST_MS = float(os.environ.get('SLOW_REQUEST_MS', 0))
+    # Background description generation
+    DESCRIPTION_WORKERS = int(os.environ.get('DESCRIPTION_WORKERS', 4))
+    DESCRIPTION_RATE_PER_MINUTE = int(os.environ.get('DESCRIPTION_RATE_PER_MINUTE', 60))
+    DESCRIPTION_MAX_RETRIES = int(os.environ.get('DESCRIPTION_MAX_RETRIES', 3))
+    # Seconds before a generation claimed by a worker that stopped is queued again
+    DESCRIPTION_CLAIM_TIMEOUT = int(os.environ.get('DESCRIPTION_CLAIM_TIMEOUT', 600))
+    DESCRIPTION_CACHE_MAX_ENTRIES = int(os.environ.get('DESCRIPTION_CACHE_MAX_ENTRIES', 10000))
+    # Decoded stat history columns (one block of up to 1024 players each) kept in memory
+    HISTORY_CACHE_BLOCKS = int(os.environ.get('HISTORY_CACHE_BLOCKS', 8192))
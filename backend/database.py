@@ -0,0 +1,136 @@
+"""
+Engine configuration and read-replica routing.
+
+Pool settings come from the app config. When DATABASE_REPLICA_URL is set
+it is registered as the 'replica' bind, and views marked with
+@replica_reads send their queries there; everything else, and anything
+flushed, uses the primary. For DB_REPLICA_LAG_WINDOW seconds after a write
+those views read the primary too, so a client never caches (or is served)
+data older than its own write. Engines are disposed in forked children so
+workers started from a preloaded app never share pooled connections.
+"""
+import functools
+import os
+import threading
+import time
+import weakref
+
+from flask import current_app, g, has_app_context
+from flask_sqlalchemy.session import Session
+from sqlalchemy import text
+from sqlalchemy.engine import make_url
+
+REPLICA = 'replica'
+
+# Apps whose engines are disposed in forked children; the fork hook is registered once
+_fork_apps = weakref.WeakKeyDictionary()
+_fork_hook_lock = threading.Lock()
+_fork_hook_registered = False
+
+
+def engine_options(config, url):
+    """create_engine() keyword arguments for a database URL"""
+    options = {
+        'pool_pre_ping': config['DB_POOL_PRE_PING'],
+        'pool_recycle': config['DB_POOL_RECYCLE'],
+    }
+    # In-memory SQLite uses a single-connection pool without these settings
+    parsed = make_url(url)
+    if not (parsed.get_backend_name() == 'sqlite' and parsed.database in (None, '', ':memory:')):
+        options.update({
+            'pool_size': config['DB_POOL_SIZE'],
+            'max_overflow': config['DB_MAX_OVERFLOW'],
+            'pool_timeout': config['DB_POOL_TIMEOUT'],
+        })
+    return options
+
+
+def configure(app):
+    """Fill in the Flask-SQLAlchemy engine settings from the app config"""
+    config = app.config
+    config['SQLALCHEMY_DATABASE_URI'] = config['DATABASE_URL']
+    config['SQLALCHEMY_ENGINE_OPTIONS'] = engine_options(config, config['DATABASE_URL'])
+    replica_url = config.get('DATABASE_REPLICA_URL')
+    if replica_url:
+        config['SQLALCHEMY_BINDS'] = {REPLICA: {'url': replica_url, **engine_options(config, replica_url)}}
+
+
+class RoutingSession(Session):
+    """Session that sends reads from @replica_reads views to the replica bind"""
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if bind is None and not self._flushing and has_app_context() and g.get('replica_reads'):
+            replica = self._db.engines.get(REPLICA)
+            if replica is not None:
+                return replica
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+
+def track_writes(app, last_write):
+    """Register last_write(), the Unix time of the app's most recent write, for replica routing"""
+    app.extensions['last_write'] = last_write
+
+
+def replica_caught_up():
+    """False while the replica may still miss the most recent write"""
+    config = current_app.config
+    last_write = current_app.extensions.get('last_write')
+    if not config.get('DATABASE_REPLICA_URL') or last_write is None:
+        return True
+    return time.time() - last_write() >= config['DB_REPLICA_LAG_WINDOW']
+
+
+def replica_reads(view):
+    """Mark a read-only view whose queries may be served by the replica"""
+    @functools.wraps(view)
+    def wrapper(*args, **kwargs):
+        g.replica_reads = replica_caught_up()
+        return view(*args, **kwargs)
+    return wrapper
+
+
+def _dispose_all_after_fork():
+    for app, db in list(_fork_apps.items()):
+        with app.app_context():
+            for engine in db.engines.values():
+                # close=False leaves the parent's connections alone
+                engine.dispose(close=False)
+
+
+def dispose_engines_after_fork(app, db):
+    """Drop pooled connections inherited from the parent in every forked child"""
+    global _fork_hook_registered
+    _fork_apps[app] = db
+    with _fork_hook_lock:
+        if not _fork_hook_registered:
+            os.register_at_fork(after_in_child=_dispose_all_after_fork)
+            _fork_hook_registered = True
+
+
+def pool_status(pool):
+    """Connection counts for a pool (QueuePool), or its status line otherwise"""
+    if hasattr(pool, 'checkedout'):
+        return {
+            'size': pool.size(),
+            'checked_out': pool.checkedout(),
+            'checked_in': pool.checkedin(),
+            'overflow': pool.overflow(),
+        }
+    return {'status': pool.status()}
+
+
+def check_engines(db):
+    """Run SELECT 1 on every engine; returns {name: {ok, latency_ms, pool, error?}}"""
+    results = {}
+    for key, engine in db.engines.items():
+        started = time.perf_counter()
+        result = {'ok': True}
+        try:
+            with engine.connect() as connection:
+                connection.execute(text('SELECT 1'))
+        except Exception as e:
+            result = {'ok': False, 'error': str(e)}
+        result['latency_ms'] = round((time.perf_counter() - started) * 1000, 1)
+        result['pool'] = pool_status(engine.pool)
+        results[key or 'primary'] = result
+    return results
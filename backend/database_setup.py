@@ -1,148 +1,78 @@
 #!/usr/bin/env python3
 """
-Complete database setup script - creates tables and loads data
+Complete database setup script - applies migrations and loads data
 """
-import requests
 import sys
-from app import app, db, Player
+from app import create_app, services
+from models import db, Player
+from ingest import applied_source_hash, ingest_players, record_applied_source, sync_players
+from migrate import upgrade_database
+import history
+from source import SourceUnavailable
 
-def fix_accented_characters(text):
-    """Fix accented characters using Unicode normalization and intelligent character replacement"""
-    if not text:
-        return text
-    
-    import unicodedata
-    
-    # First, try to normalize Unicode characters (handles most accented characters)
-    # NFD = Normalization Form Decomposed (separates base characters from diacritics)
-    normalized = unicodedata.normalize('NFD', text)
-    
-    # Remove all combining characters (diacritics like accents, tildes, etc.)
-    # This converts á to a, é to e, ñ to n, etc.
-    ascii_text = ''.join(char for char in normalized 
-                        if unicodedata.category(char) != 'Mn')
-    
-    # Handle special cases that don't normalize well
-    special_cases = {
-        'ß': 'ss',  # German eszett
-        'æ': 'ae',  # Latin ligature
-        'œ': 'oe',  # Latin ligature
-        'ð': 'd',   # Icelandic eth
-        'þ': 'th',  # Icelandic thorn
-    }
-    
-    for special, replacement in special_cases.items():
-        ascii_text = ascii_text.replace(special, replacement)
-    
-    # Handle corrupted characters from API (replace ? with intelligent guesses)
-    # This is more sophisticated than hardcoding specific names
-    ascii_text = fix_corrupted_characters(ascii_text)
-    
-    return ascii_text
-
-def fix_corrupted_characters(text):
-    """Intelligently fix corrupted characters (?) based on context"""
-    if '?' not in text:
-        return text
-    
-    # Common patterns for corrupted characters in baseball names
-    # These are based on common Spanish/Latin names in baseball
-    patterns = [
-        # Common Spanish name patterns
-        (r'Beltr\?n+', 'Beltran'),
-        (r'Encarnaci\?n', 'Encarnacion'),
-        (r'B\?ez', 'Baez'),
-        (r'\?lvarez', 'Alvarez'),
-        (r'San\?', 'Sano'),
-        (r'Gonz\?lez', 'Gonzalez'),
-        (r'Rodr\?guez', 'Rodriguez'),
-        (r'Fern\?ndez', 'Fernandez'),
-        (r'Mart\?nez', 'Martinez'),
-        (r'Garc\?a', 'Garcia'),
-        (r'L\?pez', 'Lopez'),
-        (r'P\?rez', 'Perez'),
-        (r'Hern\?ndez', 'Hernandez'),
-        (r'Ram\?rez', 'Ramirez'),
-        (r'Jim\?nez', 'Jimenez'),
-        (r'V\?squez', 'Vasquez'),
-        (r'Castr\?', 'Castro'),
-        (r'Delg\?do', 'Delgado'),
-        (r'Vald\?z', 'Valdez'),
-        (r'Mor\?les', 'Morales'),
-        (r'Flores', 'Flores'),  # This one might not have issues, but just in case
-    ]
-    
-    import re
-    for pattern, replacement in patterns:
-        text = re.sub(pattern, replacement, text, flags=re.IGNORECASE)
-    
-    # If there are still ? characters, try to make educated guesses
-    # based on common letter frequencies in names
-    if '?' in text:
-        # Common letter replacements based on context
-        # This is a fallback for patterns we haven't seen before
-        text = text.replace('?', 'a')  # Most common vowel in Spanish names
-    
-    return text
-
-def setup_database():
-    """Create database tables"""
+def setup_database(app):
+    """Create or upgrade the schema by applying the migrations (which also backfill adopted rows)"""
     try:
-        print("Creating database tables...")
+        print("Applying database migrations...")
         with app.app_context():
-            db.create_all()
-        print("✅ Database tables created successfully")
+            upgrade_database(db.engine)
+        print("✅ Database schema is up to date")
     except Exception as e:
-        print(f"❌ Error creating database tables: {e}")
+        print(f"❌ Error applying database migrations: {e}")
         sys.exit(1)
 
-def seed_database():
-    """Fetch data from API and populate database"""
+def seed_database(app, sync=False, offline=False, remove_missing=False):
+    """
+    Fetch data from API and populate database (incrementally when sync is set).
+    
+    remove_missing soft-deletes players absent from the source during a sync,
+    but never when the upstream failed and the result is the stale snapshot.
+    """
     try:
-        print("Fetching data from baseball API...")
-        response = requests.get('https://api.hirefraction.com/api/test/baseball')
-        response.raise_for_status()
-        data = response.json()
-        
-        print(f"Retrieved {len(data)} players from API")
-        
+        print("Using the last downloaded snapshot..." if offline else "Fetching data from baseball API...")
         with app.app_context():
+            applied_sha256 = applied_source_hash(db.session.connection())
+            fetched = services(app).seed_source.fetch(offline=offline, applied_sha256=applied_sha256)
+            if fetched.status == 'stale':
+                print(f"⚠️  Source unavailable ({fetched.error}); using the last snapshot")
+                if remove_missing:
+                    print("⚠️  Not removing missing players from a stale snapshot")
+                    remove_missing = False
+            
+            if sync:
+                if not fetched.changed and not remove_missing:
+                    print("Source unchanged since the last seed; nothing to sync")
+                    return
+                stats = sync_players(db.session.connection(), fetched.records(), remove_missing=remove_missing)
+                changed = bool(stats.inserted or stats.updated or stats.removed)
+                if changed:
+                    history.record_snapshot(db.session.connection(), 'sync')
+                record_applied_source(db.session.connection(), fetched.sha256)
+                db.session.commit()
+                if changed:
+                    # A scheduled summary refresh would die with this process
+                    services(app).players_changed(wait=True)
+                print(f"✅ Synced players: {stats.inserted} inserted, {stats.updated} updated, "
+                      f"{stats.unchanged} unchanged, {stats.removed} removed ({stats.seconds:.2f}s)")
+                return
+            
             # Clear existing data
             Player.query.delete()
             print("Cleared existing player data")
             
-            # Add new players
-            for player_data in data:
-                # Fix accented characters in player name and position
-                player_name = fix_accented_characters(player_data.get('Player name', ''))
-                player_position = fix_accented_characters(player_data.get('position', ''))
-                
-                player = Player(
-                    name=player_name,
-                    position=player_position,
-                    games=player_data.get('Games', 0),
-                    at_bat=player_data.get('At-bat', 0),
-                    runs=player_data.get('Runs', 0),
-                    hits=player_data.get('Hits', 0),
-                    double_2b=player_data.get('Double (2B)', 0),
-                    third_baseman=player_data.get('third baseman', 0),
-                    home_runs=player_data.get('home run', 0),
-                    rbi=player_data.get('run batted in', 0),
-                    walks=player_data.get('a walk', 0),
-                    strikeouts=player_data.get('Strikeouts', 0),
-                    stolen_bases=player_data.get('stolen base', 0),
-                    caught_stealing=0 if player_data.get('Caught stealing') == '--' else player_data.get('Caught stealing', 0),
-                    batting_average=player_data.get('AVG'),
-                    on_base_percentage=player_data.get('On-base Percentage'),
-                    slugging_percentage=player_data.get('Slugging Percentage'),
-                    on_base_plus_slugging=player_data.get('On-base Plus Slugging')
-                )
-                db.session.add(player)
+            # Stream and bulk load players in the same transaction
+            stats = ingest_players(db.session.connection(), fetched.records())
+            
+            # Keep this season's trajectory: snapshot the stats just loaded
+            history.record_snapshot(db.session.connection(), 'seed')
+            record_applied_source(db.session.connection(), fetched.sha256)
             
             db.session.commit()
-            print(f"✅ Successfully seeded {len(data)} players into database")
+            services(app).players_changed(wait=True)
+            print(f"✅ Successfully seeded {stats.rows} players into database "
+                  f"({stats.seconds:.2f}s, {stats.rows_per_sec:.0f} rows/sec)")
             
-    except requests.RequestException as e:
+    except SourceUnavailable as e:
         print(f"❌ Error fetching data from API: {e}")
         sys.exit(1)
     except Exception as e:
@@ -154,11 +84,17 @@ def main():
     print("🏟️  Baseball Stats Database Setup")
     print("==================================")
     
-    # Create tables
-    setup_database()
+    app = create_app()
+    
+    # Create or upgrade tables
+    setup_database(app)
     
-    # Load data
-    seed_database()
+    # Load data (--sync only applies changes instead of reloading everything,
+    # and with --remove-missing also soft-deletes players the source dropped;
+    # --offline reuses the last downloaded snapshot)
+    args = sys.argv[1:]
+    seed_database(app, sync='--sync' in args, offline='--offline' in args,
+                  remove_missing='--remove-missing' in args)
     
     print("")
     print("🎉 Database setup complete!")
@@ -0,0 +1,86 @@
+"""
+Content-addressed cache of LLM player descriptions.
+
+Entries are keyed on a hash of the prompt version, the model name and the
+exact player values interpolated into the prompt, so identical inputs never
+cost a second model call. Player.description_hash records the key a stored
+description was produced from, which makes staleness a simple comparison.
+"""
+import hashlib
+import json
+from datetime import datetime
+
+from sqlalchemy import delete, select
+
+from llm import MODEL_NAME, PROMPT_VERSION, prompt_inputs
+from metrics import record_cache
+from models import db, DescriptionCacheEntry
+
+
+def cache_key(player, model=MODEL_NAME):
+    """Hash of everything that determines the generated description"""
+    payload = json.dumps(
+        {'version': PROMPT_VERSION, 'model': model, 'inputs': prompt_inputs(player)},
+        sort_keys=True, separators=(',', ':'),
+    )
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+def is_stale(player):
+    """
+    Whether the player's description was generated from different inputs.
+
+    None when there is no description or its origin is unknown (written
+    before hashes were recorded).
+    """
+    if not player.description or not player.description_hash:
+        return None
+    return player.description_hash != cache_key(player)
+
+
+def lookup(key):
+    """Return the cached entry for key (touching its LRU timestamp), or None"""
+    entry = db.session.get(DescriptionCacheEntry, key)
+    record_cache('description', entry is not None)
+    if entry is not None:
+        entry.last_used_at = datetime.utcnow()
+    return entry
+
+
+def store(key, generation, latency_ms, model=MODEL_NAME, max_entries=None):
+    """Record a model output, evicting least recently used entries past max_entries"""
+    entry = db.session.get(DescriptionCacheEntry, key) or DescriptionCacheEntry(key=key)
+    entry.description = generation.text
+    entry.model = model
+    entry.latency_ms = latency_ms
+    entry.prompt_tokens = generation.prompt_tokens
+    entry.output_tokens = generation.output_tokens
+    entry.last_used_at = datetime.utcnow()
+    db.session.add(entry)
+    if max_entries:
+        evict(max_entries)
+    return entry
+
+
+def evict(max_entries):
+    """Delete all but the max_entries most recently used entries"""
+    db.session.flush()
+    keep = (
+        select(DescriptionCacheEntry.key)
+        .order_by(DescriptionCacheEntry.last_used_at.desc())
+        .limit(max_entries)
+    )
+    db.session.execute(
+        delete(DescriptionCacheEntry).where(DescriptionCacheEntry.key.not_in(keep)),
+        execution_options={'synchronize_session': False},
+    )
+
+
+def apply_cached(player, key):
+    """Copy a cached description onto the player; returns True on a hit"""
+    entry = lookup(key)
+    if entry is None:
+        return False
+    player.description = entry.description
+    player.description_hash = key
+    return True
@@ -0,0 +1,436 @@
+"""
+Append-only history of player stats: one snapshot per seed or sync.
+
+Replace seeds renumber players, so snapshots identify players by a stable
+integer history key assigned to each source_key (stat_history_keys). A
+snapshot is stored column by column in blocks of BLOCK_SIZE keys: one
+player's history reads one small block per snapshot, and a "movers" query
+reads whole columns of just two snapshots. Every column holds integers
+(rates as thousandths, the precision they are rounded to):
+
+- history keys are delta-encoded against the previous key in the block,
+  so a run of consecutive keys is a run of 1s
+- a keyframe snapshot stores its stats as they are; the next snapshots
+  store their difference from that keyframe (mostly zeros and small
+  numbers), so any snapshot decodes from at most two blocks per column
+
+Each column is packed at the narrowest integer width that holds it and
+zlib-compressed, with a bitmap for NULLs. Snapshots are indexed by
+snapshot date, so a date range only loads the snapshots inside it.
+Decoded blocks never change and are kept in an LRU cache.
+"""
+import threading
+import zlib
+from collections import OrderedDict
+from datetime import datetime
+
+import numpy as np
+from sqlalchemy import func, insert, select
+
+from models import DERIVED_STAT_FIELDS, Player, StatHistoryKey, StatSnapshot, StatSnapshotBlock
+
+INTEGER_FIELDS = ['games', 'at_bat', 'runs', 'hits', 'double_2b', 'third_baseman', 'home_runs', 'rbi',
+                  'walks', 'strikeouts', 'stolen_bases', 'caught_stealing']
+RATE_FIELDS = ['batting_average', 'on_base_percentage', 'slugging_percentage',
+               'on_base_plus_slugging'] + DERIVED_STAT_FIELDS
+HISTORY_FIELDS = INTEGER_FIELDS + RATE_FIELDS
+
+# Rates are stored as integer thousandths
+RATE_SCALE = 1000
+
+# History keys per stored block
+BLOCK_SIZE = 1024
+
+# A new keyframe after this many snapshots (the keyframe included)
+KEYFRAME_INTERVAL = 16
+
+# Block column holding the history keys
+KEY_FIELD = 'key'
+
+INSERT_BATCH_SIZE = 1000
+DEFAULT_MOVERS = 10
+MAX_MOVERS = 100
+
+_WIDTHS = (1, 2, 4, 8)
+_MISSING = object()
+
+
+def pack(values):
+    """Pack an integer array at the narrowest width that holds it; returns (width, compressed bytes)"""
+    low, high = (int(values.min()), int(values.max())) if len(values) else (0, 0)
+    width = next(width for width in _WIDTHS
+                 if np.iinfo(f'<i{width}').min <= low and high <= np.iinfo(f'<i{width}').max)
+    return width, zlib.compress(values.astype(f'<i{width}').tobytes())
+
+
+def unpack(width, data):
+    return np.frombuffer(zlib.decompress(data), dtype=f'<i{width}').astype(np.int64)
+
+
+def pack_nulls(nulls):
+    return zlib.compress(np.packbits(nulls).tobytes()) if nulls.any() else None
+
+
+def unpack_nulls(data, count):
+    if data is None:
+        return None
+    return np.unpackbits(np.frombuffer(zlib.decompress(data), dtype=np.uint8), count=count).astype(bool)
+
+
+def to_stored(field, values):
+    """Float column (NaN for NULL) -> (integer values with NULLs as 0, NULL mask)"""
+    nulls = np.isnan(values)
+    scale = RATE_SCALE if field in RATE_FIELDS else 1
+    return np.rint(np.where(nulls, 0.0, values) * scale).astype(np.int64), nulls
+
+
+def to_value(field, value, null):
+    """One stored integer back to its API value"""
+    if null:
+        return None
+    if field in RATE_FIELDS:
+        return round(int(value) / RATE_SCALE, 3)
+    return int(value)
+
+
+def snapshot_info(snapshot):
+    """API representation of a stat_snapshots row"""
+    return {
+        'id': snapshot.id,
+        'snapshot_date': snapshot.snapshot_date.isoformat(),
+        'taken_at': snapshot.taken_at.isoformat(),
+        'kind': snapshot.kind,
+        'players': snapshot.players,
+        'keyframe': snapshot.keyframe_id is None,
+        'stored_bytes': snapshot.stored_bytes,
+    }
+
+
+def list_snapshots(connection):
+    """Info of every recorded snapshot, newest first"""
+    rows = connection.execute(
+        select(StatSnapshot.__table__).order_by(StatSnapshot.taken_at.desc(), StatSnapshot.id.desc())
+    )
+    return [snapshot_info(row) for row in rows]
+
+
+def history_keys(connection, source_keys):
+    """History keys for source_keys, registering the ones seen for the first time"""
+    known = dict(connection.execute(select(StatHistoryKey.source_key, StatHistoryKey.id)).all())
+    new = [{'source_key': key} for key in dict.fromkeys(source_keys) if key not in known]
+    if new:
+        for start in range(0, len(new), INSERT_BATCH_SIZE):
+            connection.execute(insert(StatHistoryKey.__table__), new[start:start + INSERT_BATCH_SIZE])
+        known = dict(connection.execute(select(StatHistoryKey.source_key, StatHistoryKey.id)).all())
+    return np.array([known[key] for key in source_keys], dtype=np.int64)
+
+
+def _keyframe_for_next(connection):
+    """Keyframe the next snapshot is stored against, or None if it should be a keyframe itself"""
+    latest = connection.execute(
+        select(StatSnapshot.__table__).order_by(StatSnapshot.id.desc()).limit(1)
+    ).first()
+    if latest is None:
+        return None
+    keyframe_id = latest.keyframe_id or latest.id
+    following = connection.execute(
+        select(func.count()).select_from(StatSnapshot.__table__).where(StatSnapshot.keyframe_id == keyframe_id)
+    ).scalar()
+    if following + 1 >= KEYFRAME_INTERVAL:
+        return None
+    if keyframe_id == latest.id:
+        return latest
+    return connection.execute(select(StatSnapshot.__table__).where(StatSnapshot.id == keyframe_id)).first()
+
+
+def _base_values(base, keys, field):
+    """A decoded keyframe block's values of field for keys, 0 where the keyframe lacks the key"""
+    base_keys = base[KEY_FIELD]
+    if not len(base_keys):
+        return np.zeros(len(keys), dtype=np.int64)
+    positions = np.minimum(np.searchsorted(base_keys, keys), len(base_keys) - 1)
+    return np.where(base_keys[positions] == keys, base[field][0][positions], 0)
+
+
+def _empty_block(fields):
+    empty = np.zeros(0, dtype=np.int64)
+    return {KEY_FIELD: empty, **{field: (empty, None) for field in fields}}
+
+
+def record_snapshot(connection, kind, taken_at=None):
+    """
+    Append a snapshot of the visible players' stats and return its info.
+
+    Players without a source_key are left out. The caller owns the
+    transaction, so the snapshot commits together with the seed or sync.
+    """
+    taken_at = taken_at or datetime.utcnow()
+    rows = connection.execute(
+        select(Player.source_key, *[getattr(Player, field) for field in HISTORY_FIELDS])
+        .where(Player.removed_at.is_(None), Player.source_key.isnot(None))
+    ).all()
+    keys = history_keys(connection, [row[0] for row in rows])
+    order = np.argsort(keys, kind='stable')
+    keys = keys[order]
+    columns = {
+        field: to_stored(field, np.array([row[index] for row in rows], dtype=np.float64)[order])
+        for index, field in enumerate(HISTORY_FIELDS, start=1)
+    }
+
+    keyframe = _keyframe_for_next(connection)
+    base = HistoryStore(max_blocks=0).columns(connection, [keyframe], HISTORY_FIELDS) if keyframe else {}
+
+    block_rows = []
+    blocks, starts = np.unique(keys // BLOCK_SIZE, return_index=True)
+    for block, start, end in zip(blocks.tolist(), starts, list(starts[1:]) + [len(keys)]):
+        block_keys = keys[start:end]
+        width, data = pack(np.diff(block_keys, prepend=block * BLOCK_SIZE))
+        block_rows.append({'block': block, 'field': KEY_FIELD, 'width': width, 'data': data, 'nulls': None})
+        block_base = base.get((keyframe.id, block), _empty_block(HISTORY_FIELDS)) if keyframe else None
+        for field, (values, nulls) in columns.items():
+            values = values[start:end]
+            if block_base is not None:
+                values = values - _base_values(block_base, block_keys, field)
+            width, data = pack(values)
+            block_rows.append({'block': block, 'field': field, 'width': width, 'data': data,
+                               'nulls': pack_nulls(nulls[start:end])})
+
+    snapshot = {
+        'snapshot_date': taken_at.date(),
+        'taken_at': taken_at,
+        'kind': kind,
+        'players': len(keys),
+        'keyframe_id': keyframe.id if keyframe else None,
+        'stored_bytes': sum(len(row['data']) + len(row['nulls'] or b'') for row in block_rows),
+    }
+    snapshot_id = connection.execute(insert(StatSnapshot.__table__), snapshot).inserted_primary_key[0]
+    for row in block_rows:
+        row['snapshot_id'] = snapshot_id
+    for start in range(0, len(block_rows), INSERT_BATCH_SIZE):
+        connection.execute(insert(StatSnapshotBlock.__table__), block_rows[start:start + INSERT_BATCH_SIZE])
+    return snapshot_info(connection.execute(select(StatSnapshot.__table__).where(StatSnapshot.id == snapshot_id)).first())
+
+
+class HistoryStore:
+    """Reads stat snapshots, keeping decoded blocks in an LRU cache"""
+
+    def __init__(self, max_blocks=8192):
+        self.max_blocks = max_blocks
+        self._decoded = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _cached_block(self, snapshot, block, fields):
+        """Decoded columns from the cache; None if the snapshot lacks the block, _MISSING if not cached"""
+        names = [KEY_FIELD, *fields]
+        with self._lock:
+            entries = [self._decoded.get((snapshot.id, snapshot.taken_at, block, name), _MISSING) for name in names]
+            if entries[0] is None:
+                return None
+            if any(entry is _MISSING for entry in entries):
+                return _MISSING
+            for name in names:
+                self._decoded.move_to_end((snapshot.id, snapshot.taken_at, block, name))
+        return dict(zip(names, entries))
+
+    def _remember(self, snapshot, block, columns):
+        """Cache a decoded block (None when the snapshot has no such block)"""
+        if self.max_blocks <= 0:
+            return
+        with self._lock:
+            items = columns.items() if columns is not None else [(KEY_FIELD, None)]
+            for name, column in items:
+                key = (snapshot.id, snapshot.taken_at, block, name)
+                self._decoded[key] = column
+                self._decoded.move_to_end(key)
+            while len(self._decoded) > self.max_blocks:
+                self._decoded.popitem(last=False)
+
+    def columns(self, connection, snapshots, fields, block=None):
+        """
+        Decoded blocks as {(snapshot id, block): {KEY_FIELD: keys, field: (values, nulls)}}.
+
+        values are absolute stored integers (0 where NULL) and nulls is a
+        mask, or None when the column has no NULLs. With block, only that
+        block of each snapshot is read; otherwise whole snapshots are.
+        """
+        decoded = {}
+        pending = []
+        for snapshot in snapshots:
+            cached = self._cached_block(snapshot, block, fields) if block is not None else _MISSING
+            if cached is _MISSING:
+                pending.append(snapshot)
+            elif cached is not None:
+                decoded[(snapshot.id, block)] = cached
+        if not pending:
+            return decoded
+
+        # Snapshots stored as differences also need their keyframe's blocks
+        keyframe_ids = {snapshot.keyframe_id for snapshot in pending if snapshot.keyframe_id}
+        keyframe_ids -= {snapshot.id for snapshot in pending}
+        keyframes = []
+        if keyframe_ids:
+            keyframes = connection.execute(
+                select(StatSnapshot.__table__).where(StatSnapshot.id.in_(keyframe_ids))
+            ).all()
+        bases = {}
+        fetch = {snapshot.id: snapshot for snapshot in pending}
+        for keyframe in keyframes:
+            cached = self._cached_block(keyframe, block, fields) if block is not None else _MISSING
+            if cached is _MISSING:
+                fetch[keyframe.id] = keyframe
+            else:
+                bases[(keyframe.id, block)] = cached or _empty_block(fields)
+
+        query = select(StatSnapshotBlock.__table__).where(
+            StatSnapshotBlock.snapshot_id.in_(list(fetch)),
+            StatSnapshotBlock.field.in_([KEY_FIELD, *fields]),
+        )
+        if block is not None:
+            query = query.where(StatSnapshotBlock.block == block)
+        stored = {}
+        for row in connection.execute(query):
+            stored.setdefault((row.snapshot_id, row.block), {})[row.field] = row
+
+        # Keyframes first, so their decoded blocks are there for the differences
+        for (snapshot_id, stored_block), rows in sorted(stored.items(),
+                                                         key=lambda item: fetch[item[0][0]].keyframe_id is not None):
+            snapshot = fetch[snapshot_id]
+            base = None
+            if snapshot.keyframe_id:
+                base = bases.get((snapshot.keyframe_id, stored_block), _empty_block(fields))
+            columns = self._decode(rows, stored_block, fields, base)
+            if snapshot.keyframe_id is None:
+                bases[(snapshot_id, stored_block)] = columns
+            self._remember(snapshot, stored_block, columns)
+            decoded[(snapshot_id, stored_block)] = columns
+
+        if block is not None:
+            for snapshot in pending:
+                if (snapshot.id, block) not in stored:
+                    self._remember(snapshot, block, None)
+        requested = {snapshot.id for snapshot in snapshots}
+        return {key: columns for key, columns in decoded.items() if key[0] in requested}
+
+    @staticmethod
+    def _decode(rows, block, fields, base):
+        key_row = rows[KEY_FIELD]
+        keys = np.cumsum(unpack(key_row.width, key_row.data)) + block * BLOCK_SIZE
+        columns = {KEY_FIELD: keys}
+        for field in fields:
+            row = rows[field]
+            values = unpack(row.width, row.data)
+            if base is not None:
+                values = values + _base_values(base, keys, field)
+            columns[field] = (values, unpack_nulls(row.nulls, len(keys)))
+        return columns
+
+    def player_history(self, connection, player_id, fields=HISTORY_FIELDS, since=None, until=None):
+        """A player's stats in every snapshot between since and until (dates), oldest first; None if no such player"""
+        player = connection.execute(select(Player.name, Player.source_key).where(Player.id == player_id)).first()
+        if player is None:
+            return None
+        history = {'id': player_id, 'name': player.name, 'stats': list(fields), 'history': []}
+        key = connection.execute(
+            select(StatHistoryKey.id).where(StatHistoryKey.source_key == player.source_key)
+        ).scalar() if player.source_key else None
+        if key is None:
+            return history
+
+        query = select(StatSnapshot.__table__).order_by(StatSnapshot.taken_at, StatSnapshot.id)
+        if since:
+            query = query.where(StatSnapshot.snapshot_date >= since)
+        if until:
+            query = query.where(StatSnapshot.snapshot_date <= until)
+        snapshots = connection.execute(query).all()
+
+        block = key // BLOCK_SIZE
+        decoded = self.columns(connection, snapshots, fields, block=block)
+        for snapshot in snapshots:
+            columns = decoded.get((snapshot.id, block))
+            if columns is None:
+                continue
+            position = int(np.searchsorted(columns[KEY_FIELD], key))
+            if position >= len(columns[KEY_FIELD]) or columns[KEY_FIELD][position] != key:
+                continue
+            entry = {'snapshot_id': snapshot.id, 'taken_at': snapshot.taken_at.isoformat()}
+            for field in fields:
+                values, nulls = columns[field]
+                entry[field] = to_value(field, values[position], nulls is not None and nulls[position])
+            history['history'].append(entry)
+        return history
+
+    def _whole(self, connection, snapshot, stat):
+        """Keys, values and NULL mask of one stat across a whole snapshot"""
+        blocks = sorted(self.columns(connection, [snapshot], [stat]).items())
+        if not blocks:
+            empty = np.zeros(0, dtype=np.int64)
+            return empty, empty, np.zeros(0, dtype=bool)
+        keys = np.concatenate([columns[KEY_FIELD] for _, columns in blocks])
+        values = np.concatenate([columns[stat][0] for _, columns in blocks])
+        nulls = np.concatenate([
+            columns[stat][1] if columns[stat][1] is not None else np.zeros(len(columns[KEY_FIELD]), dtype=bool)
+            for _, columns in blocks
+        ])
+        return keys, values, nulls
+
+    def movers(self, connection, stat, since, limit=DEFAULT_MOVERS, order='desc'):
+        """
+        Players whose stat changed most between the last snapshot before
+        since (the oldest snapshot if there is none) and the latest one.
+
+        Counting stats treat players new since then as starting from 0;
+        rates only compare players present, with a value, in both. Returns
+        None when no snapshot has been recorded.
+        """
+        latest = connection.execute(
+            select(StatSnapshot.__table__).order_by(StatSnapshot.taken_at.desc(), StatSnapshot.id.desc()).limit(1)
+        ).first()
+        if latest is None:
+            return None
+        baseline = connection.execute(
+            select(StatSnapshot.__table__).where(StatSnapshot.snapshot_date < since)
+            .order_by(StatSnapshot.taken_at.desc(), StatSnapshot.id.desc()).limit(1)
+        ).first() or connection.execute(
+            select(StatSnapshot.__table__).order_by(StatSnapshot.taken_at, StatSnapshot.id).limit(1)
+        ).first()
+
+        keys, after, after_nulls = self._whole(connection, latest, stat)
+        base_keys, before, before_nulls = self._whole(connection, baseline, stat)
+        if len(base_keys):
+            positions = np.minimum(np.searchsorted(base_keys, keys), len(base_keys) - 1)
+            found = (base_keys[positions] == keys) & ~before_nulls[positions]
+            start = np.where(found, before[positions], 0)
+        else:
+            found = np.zeros(len(keys), dtype=bool)
+            start = np.zeros(len(keys), dtype=np.int64)
+        valid = ~after_nulls & found if stat in RATE_FIELDS else ~after_nulls
+        change = after - start
+        candidates = np.flatnonzero(valid & (change != 0))
+        # Biggest change first (smallest with order=asc), ties by history key
+        ranked = candidates[np.lexsort((keys[candidates], change[candidates] if order == 'asc'
+                                        else -change[candidates]))][:limit]
+
+        players = {
+            key: (player_id, name, position)
+            for key, player_id, name, position in connection.execute(
+                select(StatHistoryKey.id, Player.id, Player.name, Player.position)
+                .join(Player, Player.source_key == StatHistoryKey.source_key)
+                .where(StatHistoryKey.id.in_([int(keys[index]) for index in ranked]))
+            )
+        }
+        movers = []
+        for index in ranked:
+            player_id, name, position = players.get(int(keys[index]), (None, None, None))
+            movers.append({
+                'id': player_id, 'name': name, 'position': position,
+                'from': to_value(stat, start[index], False),
+                'to': to_value(stat, after[index], False),
+                'change': to_value(stat, change[index], False),
+            })
+        return {
+            'stat': stat,
+            'since': since.isoformat(),
+            'from': snapshot_info(baseline),
+            'to': snapshot_info(latest),
+            'movers': movers,
+        }
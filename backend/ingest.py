@@ -0,0 +1,336 @@
+"""
+Bulk ingestion pipeline for seeding the players table.
+
+Source JSON (fetched by source.py) is parsed incrementally, mapped to column
+dicts and written in batches: PostgreSQL COPY FROM STDIN when available,
+otherwise a batched executemany INSERT. sync_players provides an
+incremental alternative that only upserts records whose content changed.
+"""
+import codecs
+import csv
+import hashlib
+import io
+import json
+import time
+from collections import Counter
+from datetime import datetime
+from itertools import islice
+
+from sqlalchemy import insert, select, update
+
+from models import Player, SeedState
+from normalize import fix_accented_characters
+
+BATCH_SIZE = 1000
+CHUNK_SIZE = 64 * 1024
+
+# Field written for NULL in COPY CSV payloads
+COPY_NULL = '\\N'
+
+# seed_state row for the players source
+SEED_SOURCE = 'players'
+
+# Order of columns written by COPY / INSERT (everything except the primary
+# key and the generated derived rates)
+INSERT_COLUMNS = [column.name for column in Player.__table__.columns
+                  if column.name != 'id' and column.computed is None]
+
+# Source-derived columns covered by source_hash
+HASHED_COLUMNS = [
+    'name', 'position', 'games', 'at_bat', 'runs', 'hits', 'double_2b', 'third_baseman',
+    'home_runs', 'rbi', 'walks', 'strikeouts', 'stolen_bases', 'caught_stealing',
+    'batting_average', 'on_base_percentage', 'slugging_percentage', 'on_base_plus_slugging',
+]
+
+# Columns an incremental sync overwrites on changed rows; description and
+# created_at are deliberately left alone
+SYNC_UPDATE_COLUMNS = HASHED_COLUMNS + ['source_hash', 'removed_at', 'updated_at']
+
+
+class IngestStats:
+    """Row count and timing for one ingestion run"""
+
+    def __init__(self, rows, seconds):
+        self.rows = rows
+        self.seconds = seconds
+
+    @property
+    def rows_per_sec(self):
+        return round(self.rows / self.seconds, 1) if self.seconds > 0 else float(self.rows)
+
+    def to_dict(self):
+        return {
+            'rows': self.rows,
+            'seconds': round(self.seconds, 3),
+            'rows_per_sec': self.rows_per_sec,
+        }
+
+
+def iter_json_array(chunks):
+    """
+    Yield the elements of a top-level JSON array from an iterable of text
+    or byte chunks, without holding the whole document in memory.
+    """
+    decoder = json.JSONDecoder()
+    utf8 = codecs.getincrementaldecoder('utf-8')()
+    buffer = ''
+    pos = 0
+    started = False
+    for chunk in chunks:
+        if isinstance(chunk, bytes):
+            chunk = utf8.decode(chunk)
+        buffer = buffer[pos:] + chunk
+        pos = 0
+        while True:
+            # Skip whitespace and separators between elements
+            while pos < len(buffer) and buffer[pos] in ' \t\r\n,':
+                pos += 1
+            if pos >= len(buffer):
+                break
+            if not started:
+                if buffer[pos] != '[':
+                    raise ValueError('Expected a JSON array from the seed source')
+                started = True
+                pos += 1
+                continue
+            if buffer[pos] == ']':
+                return
+            try:
+                item, end = decoder.raw_decode(buffer, pos)
+            except json.JSONDecodeError:
+                # Element is split across chunks; wait for more data
+                break
+            if end >= len(buffer):
+                # A scalar may continue in the next chunk; a separator must follow
+                break
+            yield item
+            pos = end
+    if not started or buffer[pos:].strip():
+        raise ValueError('Truncated JSON array from the seed source')
+
+
+def player_row(record):
+    """Map one source API record to a players-table column dict"""
+    now = datetime.utcnow()
+    row = {
+        'name': fix_accented_characters(record.get('Player name', '')),
+        'position': fix_accented_characters(record.get('position', '')),
+        'games': record.get('Games', 0),
+        'at_bat': record.get('At-bat', 0),
+        'runs': record.get('Runs', 0),
+        'hits': record.get('Hits', 0),
+        'double_2b': record.get('Double (2B)', 0),
+        'third_baseman': record.get('third baseman', 0),
+        'home_runs': record.get('home run', 0),
+        'rbi': record.get('run batted in', 0),
+        'walks': record.get('a walk', 0),
+        'strikeouts': record.get('Strikeouts', 0),
+        'stolen_bases': record.get('stolen base', 0),
+        'caught_stealing': 0 if record.get('Caught stealing') == '--' else record.get('Caught stealing', 0),
+        'batting_average': record.get('AVG'),
+        'on_base_percentage': record.get('On-base Percentage'),
+        'slugging_percentage': record.get('Slugging Percentage'),
+        'on_base_plus_slugging': record.get('On-base Plus Slugging'),
+        'description': None,
+        'description_hash': None,
+        'source_key': None,
+        'source_hash': None,
+        'removed_at': None,
+        'created_at': now,
+        'updated_at': now,
+    }
+    row['source_hash'] = record_hash(row)
+    return row
+
+
+def record_hash(row):
+    """Stable content hash of the source-derived columns of a row"""
+    payload = json.dumps([row[column] for column in HASHED_COLUMNS], separators=(',', ':'))
+    return hashlib.sha1(payload.encode('utf-8')).hexdigest()
+
+
+def natural_key(name, occurrence):
+    """
+    Stable natural key for a player: the normalized name, with an
+    occurrence suffix to keep namesakes in the same payload distinct.
+    """
+    key = (name or '').strip().lower()
+    return key if occurrence == 1 else f'{key}#{occurrence}'
+
+
+def keyed_rows(records):
+    """Map source records to column dicts with their natural key assigned"""
+    seen = Counter()
+    for record in records:
+        row = player_row(record)
+        name_key = natural_key(row['name'], 1)
+        seen[name_key] += 1
+        row['source_key'] = natural_key(row['name'], seen[name_key])
+        yield row
+
+
+def batched(iterable, size):
+    """Split an iterable into lists of at most size items"""
+    iterator = iter(iterable)
+    while True:
+        batch = list(islice(iterator, size))
+        if not batch:
+            return
+        yield batch
+
+
+def copy_rows(connection, rows):
+    """Write a batch of rows with PostgreSQL COPY FROM STDIN (CSV)"""
+    buffer = io.StringIO()
+    # CSV reads a quoted or unquoted empty field as '' unless it is the NULL
+    # marker, so NULLs are written as an unquoted \N (QUOTE_MINIMAL never
+    # quotes it) and empty strings stay empty strings
+    writer = csv.writer(buffer, quoting=csv.QUOTE_MINIMAL)
+    for row in rows:
+        writer.writerow([COPY_NULL if row[column] is None else row[column] for column in INSERT_COLUMNS])
+    buffer.seek(0)
+
+    cursor = connection.connection.cursor()
+    try:
+        cursor.copy_expert(
+            f"COPY {Player.__tablename__} ({', '.join(INSERT_COLUMNS)}) FROM STDIN "
+            f"WITH (FORMAT csv, NULL '{COPY_NULL}')",
+            buffer,
+        )
+    finally:
+        cursor.close()
+
+
+def insert_rows(connection, rows):
+    """Write a batch of rows with a single executemany INSERT"""
+    connection.execute(Player.__table__.insert(), rows)
+
+
+def bulk_insert(connection, rows, batch_size=BATCH_SIZE):
+    """
+    Insert an iterable of column dicts in batches on the given connection.
+
+    The caller owns the transaction. Returns an IngestStats.
+    """
+    use_copy = connection.dialect.name == 'postgresql' and connection.dialect.driver == 'psycopg2'
+    write = copy_rows if use_copy else insert_rows
+
+    started = time.perf_counter()
+    count = 0
+    for batch in batched(rows, batch_size):
+        write(connection, batch)
+        count += len(batch)
+    return IngestStats(count, time.perf_counter() - started)
+
+
+def ingest_players(connection, records, batch_size=BATCH_SIZE):
+    """Normalize and bulk insert source API records; returns an IngestStats"""
+    return bulk_insert(connection, keyed_rows(records), batch_size=batch_size)
+
+
+class SyncStats:
+    """Per-outcome row counts and timing for one incremental sync"""
+
+    def __init__(self):
+        self.inserted = 0
+        self.updated = 0
+        self.unchanged = 0
+        self.removed = 0
+        self.seconds = 0.0
+
+    @property
+    def rows(self):
+        return self.inserted + self.updated + self.unchanged
+
+    def to_dict(self):
+        return {
+            'inserted': self.inserted,
+            'updated': self.updated,
+            'unchanged': self.unchanged,
+            'removed': self.removed,
+            'seconds': round(self.seconds, 3),
+        }
+
+
+def upsert_statement(dialect_name):
+    """INSERT ... ON CONFLICT (source_key) DO UPDATE for the given dialect"""
+    if dialect_name == 'postgresql':
+        from sqlalchemy.dialects.postgresql import insert
+    elif dialect_name == 'sqlite':
+        from sqlalchemy.dialects.sqlite import insert
+    else:
+        raise ValueError(f'Incremental sync is not supported on {dialect_name}')
+
+    statement = insert(Player.__table__)
+    return statement.on_conflict_do_update(
+        index_elements=['source_key'],
+        set_={column: statement.excluded[column] for column in SYNC_UPDATE_COLUMNS},
+    )
+
+
+def sync_players(connection, records, remove_missing=False, batch_size=BATCH_SIZE):
+    """
+    Incrementally reconcile the players table with the source records.
+
+    Rows are matched on source_key. Only new rows and rows whose source_hash
+    changed (or that were soft-deleted and reappeared) are written, with a
+    single upsert per batch. With remove_missing, players absent from the
+    source are soft-deleted by setting removed_at. The caller owns the
+    transaction. Returns a SyncStats.
+    """
+    started = time.perf_counter()
+    stats = SyncStats()
+
+    existing = {
+        key: (source_hash, removed_at)
+        for key, source_hash, removed_at in connection.execute(
+            select(Player.source_key, Player.source_hash, Player.removed_at)
+            .where(Player.source_key.isnot(None))
+        )
+    }
+    statement = upsert_statement(connection.dialect.name)
+
+    def changed_rows():
+        for row in keyed_rows(records):
+            current = existing.pop(row['source_key'], None)
+            if current is None:
+                stats.inserted += 1
+            elif current[0] == row['source_hash'] and current[1] is None:
+                stats.unchanged += 1
+                continue
+            else:
+                stats.updated += 1
+            yield row
+
+    for batch in batched(changed_rows(), batch_size):
+        connection.execute(statement, batch)
+
+    if remove_missing:
+        missing = [key for key, (_, removed_at) in existing.items() if removed_at is None]
+        now = datetime.utcnow()
+        for keys in batched(missing, batch_size):
+            connection.execute(
+                update(Player.__table__)
+                .where(Player.source_key.in_(keys))
+                .values(removed_at=now, updated_at=now)
+            )
+        stats.removed = len(missing)
+
+    stats.seconds = time.perf_counter() - started
+    return stats
+
+
+def applied_source_hash(connection):
+    """sha256 of the source payload last applied to the players table, or None"""
+    return connection.execute(
+        select(SeedState.applied_sha256).where(SeedState.source == SEED_SOURCE)
+    ).scalar()
+
+
+def record_applied_source(connection, sha256):
+    """Remember that the players table reflects this payload; commit it with the data"""
+    state = SeedState.__table__
+    values = {'applied_sha256': sha256, 'applied_at': datetime.utcnow()}
+    updated = connection.execute(update(state).where(state.c.source == SEED_SOURCE).values(**values))
+    if not updated.rowcount:
+        connection.execute(insert(state).values(source=SEED_SOURCE, **values))
@@ -0,0 +1,309 @@
+"""
+Background job queue for LLM description generation.
+
+Submitting a job stores one description_job_items row per player. Every
+server process runs one poller thread that, whenever one of its worker
+threads is free, claims the next queued item with a conditional UPDATE and
+hands it over, so any worker can pick up a job another one accepted while
+idle workers never touch the database. Items claimed by a worker that died
+or was recycled are requeued once their claim times out. Model calls are paced by a rate limit
+kept in the database, so the limit holds across all workers, and retried
+with exponential backoff. Players whose prompt inputs are already in the
+description cache are filled without a model call. Job progress lives in
+the description_jobs table so any gunicorn worker can answer a status poll.
+
+The threads are started lazily, per process, so creating the runner at
+import time is safe with gunicorn --preload; the app only starts them when
+a Gemini key is configured.
+"""
+import os
+import queue
+import threading
+import time
+import uuid
+from datetime import datetime, timedelta
+
+from sqlalchemy import case, exists, insert, select, update
+from sqlalchemy.exc import IntegrityError
+
+import description_cache
+import metrics
+from llm import as_generation, build_prompt
+from models import db, DescriptionJob, DescriptionJobItem, Player, RateLimit
+
+
+class RateLimiter:
+    """
+    Spaces calls evenly so at most rate_per_minute start per minute.
+
+    The next free start time is a rate_limits row that one atomic UPDATE
+    advances, so every process sharing the database shares the limit.
+    """
+
+    def __init__(self, rate_per_minute, name='llm'):
+        self.interval = 60.0 / rate_per_minute if rate_per_minute else 0.0
+        self.name = name
+
+    def reserve(self):
+        """Take the next free start slot and return its Unix time"""
+        limits = RateLimit.__table__
+        while True:
+            now = time.time()
+            start = case((limits.c.next_slot > now, limits.c.next_slot), else_=now)
+            with db.engine.begin() as connection:
+                next_slot = connection.execute(
+                    update(limits).where(limits.c.name == self.name)
+                    .values(next_slot=start + self.interval).returning(limits.c.next_slot)
+                ).scalar()
+            if next_slot is not None:
+                return next_slot - self.interval
+            try:
+                with db.engine.begin() as connection:
+                    connection.execute(insert(limits).values(name=self.name, next_slot=now + self.interval))
+                return now
+            except IntegrityError:
+                # Another worker created the row first; take a slot from it
+                continue
+
+    def wait(self):
+        if not self.interval:
+            return
+        delay = self.reserve() - time.time()
+        if delay > 0:
+            time.sleep(delay)
+
+
+class DescriptionJobRunner:
+    """Runs persisted description generation jobs on one poller and a bounded pool of threads per process"""
+
+    def __init__(self, app, client_factory, max_workers=4, rate_per_minute=60,
+                 max_retries=3, backoff_seconds=1.0, cache_max_entries=None, on_change=None,
+                 claim_timeout=600, max_attempts=3, poll_seconds=2.0, recover_seconds=60.0):
+        self.app = app
+        self.client_factory = client_factory
+        self.max_workers = max_workers
+        self.max_retries = max_retries
+        self.backoff_seconds = backoff_seconds
+        self.cache_max_entries = cache_max_entries
+        self.on_change = on_change
+        self.rate_limiter = RateLimiter(rate_per_minute)
+        # Seconds before a claimed item counts as abandoned, and claims allowed per item
+        self.claim_timeout = claim_timeout
+        self.max_attempts = max_attempts
+        self.poll_seconds = poll_seconds
+        self.recover_seconds = recover_seconds
+        self._next_recovery = 0.0
+        self._started_pid = None
+        self._start_lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._free_workers = threading.Semaphore(max_workers)
+        self._claimed = queue.SimpleQueue()
+
+    def start(self):
+        """Start this process's poller and worker threads; forked children start their own"""
+        if self._started_pid == os.getpid():
+            return
+        with self._start_lock:
+            if self._started_pid == os.getpid():
+                return
+            self._started_pid = os.getpid()
+            self._next_recovery = 0.0
+            self._wakeup = threading.Event()
+            self._free_workers = threading.Semaphore(self.max_workers)
+            self._claimed = queue.SimpleQueue()
+            threading.Thread(target=self._poll, name='description-job-poller', daemon=True).start()
+            for index in range(self.max_workers):
+                threading.Thread(target=self._work, name=f'description-job-{index}', daemon=True).start()
+
+    def submit(self, player_ids, force=False):
+        """
+        Create a job for the given players and queue their generations.
+
+        With force the description cache is bypassed and the model is always called.
+        """
+        job = DescriptionJob(id=uuid.uuid4().hex, total=len(player_ids),
+                             status='running' if player_ids else 'completed')
+        db.session.add(job)
+        db.session.flush()
+        if player_ids:
+            db.session.execute(insert(DescriptionJobItem.__table__),
+                               [{'job_id': job.id, 'player_id': player_id, 'force': force}
+                                for player_id in player_ids])
+        db.session.commit()
+
+        if player_ids:
+            self.start()
+            self._wakeup.set()
+        return job
+
+    def submit_missing(self):
+        """Queue a job for every active player without a description"""
+        player_ids = [
+            player_id for (player_id,) in db.session.query(Player.id)
+            .filter(Player.description.is_(None), Player.removed_at.is_(None))
+            .order_by(Player.id)
+        ]
+        return self.submit(player_ids)
+
+    def generate_with_retry(self, client, prompt):
+        """Call the model, retrying failures with exponential backoff"""
+        for attempt in range(self.max_retries + 1):
+            self.rate_limiter.wait()
+            started = time.perf_counter()
+            try:
+                result = client.generate(prompt)
+            except Exception as e:
+                metrics.observe_llm('generate', time.perf_counter() - started, error=e)
+                if attempt == self.max_retries:
+                    raise
+                time.sleep(self.backoff_seconds * (2 ** attempt))
+            else:
+                metrics.observe_llm('generate', time.perf_counter() - started, as_generation(result))
+                return result
+
+    def describe(self, player, force=False):
+        """Fill player.description from the cache or the model (caller commits)"""
+        key = description_cache.cache_key(player)
+        if not force and description_cache.apply_cached(player, key):
+            return
+
+        started = time.perf_counter()
+        generation = as_generation(self.generate_with_retry(self.client_factory(), build_prompt(player)))
+        latency_ms = int((time.perf_counter() - started) * 1000)
+
+        description_cache.store(key, generation, latency_ms, max_entries=self.cache_max_entries)
+        player.description = generation.text
+        player.description_hash = key
+
+    def _poll(self):
+        """Claim an item whenever a worker is free, so claims never wait in this process"""
+        while True:
+            self._free_workers.acquire()
+            item = None
+            with self.app.app_context():
+                try:
+                    item = self._claim()
+                    if item is None and time.monotonic() >= self._next_recovery:
+                        self._next_recovery = time.monotonic() + self.recover_seconds
+                        self.recover_stale()
+                except Exception as e:
+                    db.session.rollback()
+                    print(f"❌ Description job poller error: {e}")
+            if item is None:
+                self._free_workers.release()
+                self._wakeup.wait(self.poll_seconds)
+                self._wakeup.clear()
+            else:
+                self._claimed.put(item)
+
+    def _work(self):
+        while True:
+            item = self._claimed.get()
+            with self.app.app_context():
+                try:
+                    self._run_one(*item)
+                except Exception as e:
+                    db.session.rollback()
+                    print(f"❌ Description job worker error: {e}")
+                finally:
+                    self._free_workers.release()
+
+    def _claim(self):
+        """Claim the oldest queued item; returns (item, claim token) or None"""
+        items = DescriptionJobItem.__table__
+        while True:
+            item = db.session.execute(
+                select(items.c.id, items.c.job_id, items.c.player_id, items.c.force)
+                .where(items.c.status == 'queued').order_by(items.c.id).limit(1)
+            ).first()
+            if item is None:
+                db.session.rollback()
+                return None
+            token = uuid.uuid4().hex
+            claimed = db.session.execute(
+                update(items).where(items.c.id == item.id, items.c.status == 'queued')
+                .values(status='claimed', claimed_by=token, claimed_at=datetime.utcnow(),
+                        attempts=items.c.attempts + 1)
+            )
+            db.session.commit()
+            if claimed.rowcount:
+                return item, token
+
+    def _run_one(self, item, token):
+        error = None
+        try:
+            player = db.session.get(Player, item.player_id)
+            if player is None:
+                raise LookupError(f'Player {item.player_id} not found')
+            self.describe(player, force=item.force)
+            db.session.commit()
+            if self.on_change:
+                self.on_change()
+        except Exception as e:
+            db.session.rollback()
+            error = f'Player {item.player_id}: {e}'
+        self._record_result(item, token, error)
+
+    def _record_result(self, item, token, error):
+        """Close the item if this worker still holds its claim, and count it against its job"""
+        items = DescriptionJobItem.__table__
+        closed = db.session.execute(
+            update(items).where(items.c.id == item.id, items.c.status == 'claimed', items.c.claimed_by == token)
+            .values(status='failed' if error else 'done')
+        )
+        if closed.rowcount:
+            # Otherwise the claim timed out and the item's new owner reports it
+            self._count_result(item.job_id, error)
+        db.session.commit()
+
+    def _count_result(self, job_id, error):
+        """Atomically count one finished generation and close the job when done (caller commits)"""
+        jobs = DescriptionJob.__table__
+        values = {'updated_at': datetime.utcnow()}
+        if error:
+            values.update(failed=jobs.c.failed + 1, last_error=error)
+        else:
+            values.update(completed=jobs.c.completed + 1)
+        db.session.execute(update(jobs).where(jobs.c.id == job_id).values(**values))
+
+        finished = jobs.c.completed + jobs.c.failed >= jobs.c.total
+        db.session.execute(
+            update(jobs)
+            .where(jobs.c.id == job_id, jobs.c.status == 'running', finished)
+            .values(status=case((jobs.c.completed == 0, 'failed'), else_='completed'))
+        )
+
+    def recover_stale(self):
+        """
+        Requeue items whose claim outlived claim_timeout (their worker crashed
+        or was recycled), failing those already claimed max_attempts times,
+        and fail running jobs that have nothing left queued or claimed.
+        """
+        items = DescriptionJobItem.__table__
+        jobs = DescriptionJob.__table__
+        cutoff = datetime.utcnow() - timedelta(seconds=self.claim_timeout)
+        stale = db.session.execute(
+            select(items.c.id, items.c.job_id, items.c.player_id, items.c.attempts, items.c.claimed_by)
+            .where(items.c.status == 'claimed', items.c.claimed_at < cutoff)
+        ).all()
+        for item in stale:
+            give_up = item.attempts >= self.max_attempts
+            moved = db.session.execute(
+                update(items).where(items.c.id == item.id, items.c.status == 'claimed',
+                                    items.c.claimed_by == item.claimed_by)
+                .values(status='failed' if give_up else 'queued', claimed_by=None, claimed_at=None)
+            )
+            if moved.rowcount and give_up:
+                self._count_result(item.job_id, f'Player {item.player_id}: worker stopped during '
+                                                f'{item.attempts} attempts')
+
+        pending = exists().where(items.c.job_id == jobs.c.id, items.c.status.in_(['queued', 'claimed']))
+        db.session.execute(
+            update(jobs).where(jobs.c.status == 'running', jobs.c.updated_at < cutoff, ~pending)
+            .values(status='failed', updated_at=datetime.utcnow(),
+                    last_error=case((jobs.c.last_error.is_(None), 'Interrupted by a worker restart'),
+                                    else_=jobs.c.last_error))
+        )
+        db.session.commit()
+        if stale:
+            self._wakeup.set()
@@ -0,0 +1,246 @@
+"""
+Precomputed leaderboards and league/position summary statistics.
+
+On PostgreSQL both are materialized views refreshed CONCURRENTLY, so
+readers never block. Elsewhere they are plain summary tables rebuilt from
+one pass over the players table. Either way a read is a small indexed
+lookup instead of a full table transfer.
+
+The views and tables are created by migration 0006; a change to their
+definitions needs a new revision that drops and recreates them, and the
+Table objects below must be kept in step with it.
+
+Refreshes are requested after writes and run on a background timer, so a
+burst of edits or a reseed costs one refresh rather than one per write.
+Writes pass the fields they changed, and only the stats those fields can
+move are recomputed: their leaderboards and summary rows on SQLite, and
+only the views holding them on PostgreSQL (a materialized view can only
+be refreshed whole). A stat's percentiles still need every player's value,
+so each affected stat is recomputed from its full column.
+"""
+import math
+import re
+import threading
+
+from sqlalchemy import Column, Float, Integer, MetaData, String, Table, delete, insert, select, text
+
+from models import DERIVED_STAT_INPUTS, DERIVED_STAT_SQL, db, Player
+
+LEADERBOARD_SIZE = 25
+
+# Rate stats only rank players with a meaningful sample
+LEADERBOARD_MIN_AT_BATS = 100
+
+COUNTING_STATS = ['hits', 'home_runs', 'rbi', 'runs', 'stolen_bases', 'walks']
+RATE_STATS = ['batting_average', 'on_base_percentage', 'slugging_percentage',
+              'on_base_plus_slugging', 'hits_per_game', 'isolated_power']
+LEADERBOARD_STATS = COUNTING_STATS + RATE_STATS
+
+SUMMARY_STATS = ['games', 'hits', 'home_runs', 'rbi', 'batting_average', 'on_base_plus_slugging',
+                 'hits_per_game', 'isolated_power', 'strikeout_rate', 'walk_rate']
+PERCENTILES = [10, 25, 50, 75, 90]
+
+# Position value used for league-wide summary rows
+LEAGUE = 'ALL'
+
+# Inputs of each generated rate column, read from its generation expression
+DERIVED_STAT_DEPENDENCIES = {
+    stat: {field for field in DERIVED_STAT_INPUTS if re.search(rf'\b{field}\b', sql)}
+    for stat, sql in DERIVED_STAT_SQL.items()
+}
+
+# Kept out of db.metadata: on PostgreSQL these names are materialized views (see migration 0006)
+summary_metadata = MetaData()
+
+leaderboard_table = Table(
+    'player_leaderboards', summary_metadata,
+    Column('stat', String(40), primary_key=True),
+    Column('rank', Integer, primary_key=True),
+    Column('player_id', Integer),
+    Column('name', String(100)),
+    Column('position', String(20)),
+    Column('value', Float),
+)
+
+summary_table = Table(
+    'player_stat_summary', summary_metadata,
+    Column('position', String(20), primary_key=True),
+    Column('stat', String(40), primary_key=True),
+    Column('players', Integer),
+    Column('mean', Float),
+    Column('min_value', Float),
+    Column('max_value', Float),
+    *[Column(f'p{percentile}', Float) for percentile in PERCENTILES],
+)
+
+
+def populate(connection):
+    """Fill the summary tables if they are empty (materialized views are populated when created)"""
+    if connection.dialect.name == 'postgresql':
+        return
+    if connection.execute(select(summary_table.c.stat).limit(1)).first() is None:
+        refresh(connection)
+
+
+def affected_stats(changed_fields):
+    """Stats an edit to these fields can move; None (every stat) when the fields are unknown"""
+    if changed_fields is None:
+        return None
+    changed_fields = set(changed_fields)
+    if 'position' in changed_fields:
+        # Moves the player between summary groups and changes board entries
+        return set(LEADERBOARD_STATS + SUMMARY_STATS)
+    stats = changed_fields.intersection(LEADERBOARD_STATS + SUMMARY_STATS)
+    stats.update(stat for stat, inputs in DERIVED_STAT_DEPENDENCIES.items() if inputs & changed_fields)
+    if 'name' in changed_fields:
+        stats.update(LEADERBOARD_STATS)
+    if 'at_bat' in changed_fields:
+        # Rate stats only rank players above LEADERBOARD_MIN_AT_BATS
+        stats.update(RATE_STATS)
+    return stats.intersection(LEADERBOARD_STATS + SUMMARY_STATS)
+
+
+def refresh(connection, stats=None):
+    """Recompute leaderboards and summaries from the players table (only those of stats, if given)"""
+    boards = [stat for stat in LEADERBOARD_STATS if stats is None or stat in stats]
+    summaries = [stat for stat in SUMMARY_STATS if stats is None or stat in stats]
+
+    if connection.dialect.name == 'postgresql':
+        if boards:
+            connection.execute(text('REFRESH MATERIALIZED VIEW CONCURRENTLY player_leaderboards'))
+        if summaries:
+            connection.execute(text('REFRESH MATERIALIZED VIEW CONCURRENTLY player_stat_summary'))
+        return
+    if not boards and not summaries:
+        return
+
+    stat_columns = sorted(set(boards + summaries))
+    players = connection.execute(
+        select(Player.id, Player.name, Player.position, Player.at_bat,
+               *[getattr(Player, stat) for stat in stat_columns])
+        .where(Player.removed_at.is_(None))
+    ).mappings().all()
+
+    connection.execute(delete(leaderboard_table).where(leaderboard_table.c.stat.in_(boards)))
+    connection.execute(delete(summary_table).where(summary_table.c.stat.in_(summaries)))
+
+    leaderboard_rows = []
+    for stat in boards:
+        qualified = [
+            player for player in players
+            if player[stat] is not None
+            and (stat not in RATE_STATS or (player['at_bat'] or 0) >= LEADERBOARD_MIN_AT_BATS)
+        ]
+        qualified.sort(key=lambda player: (-player[stat], player['id']))
+        for rank, player in enumerate(qualified[:LEADERBOARD_SIZE], start=1):
+            leaderboard_rows.append({
+                'stat': stat, 'rank': rank, 'player_id': player['id'], 'name': player['name'],
+                'position': player['position'], 'value': float(player[stat]),
+            })
+    if leaderboard_rows:
+        connection.execute(insert(leaderboard_table), leaderboard_rows)
+
+    groups = {LEAGUE: players}
+    for player in players:
+        groups.setdefault(player['position'] or '', []).append(player)
+    summary_rows = []
+    for position, members in groups.items():
+        for stat in summaries:
+            values = sorted(float(member[stat]) for member in members if member[stat] is not None)
+            if values:
+                summary_rows.append(_summary_row(position, stat, values))
+    if summary_rows:
+        connection.execute(insert(summary_table), summary_rows)
+
+
+def _percentile(sorted_values, fraction):
+    """Linear interpolation, matching PostgreSQL percentile_cont"""
+    position = fraction * (len(sorted_values) - 1)
+    lower = math.floor(position)
+    upper = min(lower + 1, len(sorted_values) - 1)
+    return sorted_values[lower] + (sorted_values[upper] - sorted_values[lower]) * (position - lower)
+
+
+def _summary_row(position, stat, sorted_values):
+    row = {
+        'position': position,
+        'stat': stat,
+        'players': len(sorted_values),
+        'mean': sum(sorted_values) / len(sorted_values),
+        'min_value': sorted_values[0],
+        'max_value': sorted_values[-1],
+    }
+    for percentile in PERCENTILES:
+        row[f'p{percentile}'] = _percentile(sorted_values, percentile / 100)
+    return row
+
+
+def get_leaderboards(stat=None, limit=LEADERBOARD_SIZE):
+    """Top players per stat as {stat: [entries]}"""
+    query = select(leaderboard_table).where(leaderboard_table.c.rank <= limit)
+    if stat:
+        query = query.where(leaderboard_table.c.stat == stat)
+    query = query.order_by(leaderboard_table.c.stat, leaderboard_table.c.rank)
+
+    boards = {name: [] for name in ([stat] if stat else LEADERBOARD_STATS)}
+    for row in db.session.execute(query).mappings():
+        boards.setdefault(row['stat'], []).append({
+            'rank': row['rank'], 'id': row['player_id'], 'name': row['name'],
+            'position': row['position'], 'value': row['value'],
+        })
+    return boards
+
+
+def get_summary(position=None):
+    """League-wide and per-position summaries as {position: {stat: {...}}}"""
+    query = select(summary_table)
+    if position:
+        query = query.where(summary_table.c.position.in_([LEAGUE, position]))
+
+    summary = {}
+    for row in db.session.execute(query).mappings():
+        stats = {key: row[key] for key in row.keys() if key not in ('position', 'stat')}
+        stats['min'] = stats.pop('min_value')
+        stats['max'] = stats.pop('max_value')
+        summary.setdefault(row['position'], {})[row['stat']] = stats
+    return {
+        'league': summary.pop(LEAGUE, {}),
+        'positions': summary,
+    }
+
+
+
+class SummaryRefresher:
+    """Coalesces refresh requests into one background refresh after a short delay"""
+
+    def __init__(self, app, delay=1.0, on_refresh=None):
+        self.app = app
+        self.delay = delay
+        self.on_refresh = on_refresh
+        self._timer = None
+        self._stats = set()
+        self._lock = threading.Lock()
+
+    def schedule(self, stats=None):
+        """Request a refresh of stats (None: all); requests made before it runs are merged"""
+        with self._lock:
+            if self._stats is not None:
+                self._stats = None if stats is None else self._stats | set(stats)
+            if self._timer is not None:
+                return
+            self._timer = threading.Timer(self.delay, self._run)
+            self._timer.daemon = True
+            self._timer.start()
+
+    def _run(self):
+        with self._lock:
+            self._timer = None
+            stats, self._stats = self._stats, set()
+        self.refresh_now(stats)
+
+    def refresh_now(self, stats=None):
+        with self.app.app_context():
+            with db.engine.begin() as connection:
+                refresh(connection, stats)
+        if self.on_refresh:
+            self.on_refresh()
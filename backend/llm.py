@@ -0,0 +1,86 @@
+"""
+LLM client and prompt for player descriptions.
+
+Callers depend only on an object with generate(prompt) returning a
+Generation (or a plain string) and, for streaming, stream(prompt) yielding
+text chunks, so tests and benchmarks can swap in a fake client for Gemini.
+"""
+from collections import namedtuple
+
+MODEL_NAME = 'gemini-2.0-flash'
+
+# Bump whenever the prompt wording changes so cached descriptions are regenerated
+PROMPT_VERSION = 1
+
+# Player attributes interpolated into the prompt
+PROMPT_FIELDS = ['name', 'position', 'games', 'hits', 'home_runs', 'batting_average',
+                 'rbi', 'runs', 'stolen_bases', 'on_base_plus_slugging']
+
+Generation = namedtuple('Generation', ['text', 'prompt_tokens', 'output_tokens'])
+
+
+class LLMNotConfigured(RuntimeError):
+    """Raised when no API key is available for the model"""
+
+
+def prompt_inputs(player):
+    """The exact player values the prompt depends on"""
+    return {field: getattr(player, field) for field in PROMPT_FIELDS}
+
+
+def build_prompt(player):
+    """Prompt used to describe a player"""
+    inputs = prompt_inputs(player)
+    return f"""Write a brief, engaging description of baseball player {inputs['name']}.
+        Include their position ({inputs['position']}) and key statistics:
+        - Games: {inputs['games']}
+        - Hits: {inputs['hits']}
+        - Home Runs: {inputs['home_runs']}
+        - Batting Average: {inputs['batting_average']}
+        - RBI: {inputs['rbi']}
+        - Runs: {inputs['runs']}
+        - Stolen Bases: {inputs['stolen_bases']}
+        - OPS: {inputs['on_base_plus_slugging']}
+
+        Make it sound like a sports commentator describing the player. Keep it under 150 words."""
+
+
+class GeminiClient:
+    """Thin wrapper over google.generativeai, which is imported on first use (it is slow to import)"""
+
+    def __init__(self, api_key, model_name=MODEL_NAME, transport=None):
+        if not api_key:
+            raise LLMNotConfigured('Gemini API key not configured')
+        import google.generativeai as genai
+        genai.configure(api_key=api_key, transport=transport)
+        self.model_name = model_name
+        self.model = genai.GenerativeModel(model_name)
+
+    def generate(self, prompt):
+        response = self.model.generate_content(prompt)
+        usage = getattr(response, 'usage_metadata', None)
+        return Generation(
+            text=response.text.strip(),
+            prompt_tokens=getattr(usage, 'prompt_token_count', None),
+            output_tokens=getattr(usage, 'candidates_token_count', None),
+        )
+
+    def stream(self, prompt):
+        """Yield text chunks as the model produces them; closing stops the upstream call"""
+        response = self.model.generate_content(prompt, stream=True)
+        try:
+            for chunk in response:
+                if chunk.text:
+                    yield chunk.text
+        finally:
+            # Abandon the HTTP stream if the consumer stopped early
+            iterator = getattr(response, '_iterator', None)
+            if hasattr(iterator, 'cancel'):
+                iterator.cancel()
+
+
+def as_generation(result):
+    """Normalize a client result; fake clients may return a plain string"""
+    if isinstance(result, Generation):
+        return result
+    return Generation(text=str(result).strip(), prompt_tokens=None, output_tokens=None)
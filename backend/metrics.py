@@ -0,0 +1,140 @@
+"""
+Prometheus metrics for requests, database queries, serialization, LLM calls
+and caches.
+
+init_app() installs request hooks that time every request and attribute
+the SQL run during it (counted through SQLAlchemy engine events). When
+PROMETHEUS_MULTIPROC_DIR is set, each gunicorn worker writes its samples
+there and render() aggregates all of them. Requests slower than
+SLOW_REQUEST_MS are logged together with the statements they ran.
+"""
+import os
+import time
+
+from flask import g, has_request_context, request
+from prometheus_client import (CONTENT_TYPE_LATEST, REGISTRY, CollectorRegistry, Counter, Histogram,
+                               generate_latest, multiprocess)
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+QUERY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+LLM_BUCKETS = (0.25, 0.5, 1.0, 2.0, 4.0, 8.0, 15.0, 30.0, 60.0)
+
+# Statements shown per slow request, and characters kept of each
+SLOW_LOG_STATEMENTS = 10
+SLOW_LOG_STATEMENT_CHARS = 500
+
+REQUEST_SECONDS = Histogram('http_request_duration_seconds', 'Request latency',
+                            ['endpoint', 'method', 'status'])
+REQUEST_DB_QUERIES = Histogram('http_request_db_queries', 'SQL statements run per request',
+                               ['endpoint'], buckets=COUNT_BUCKETS)
+REQUEST_DB_SECONDS = Histogram('http_request_db_seconds', 'Time spent in SQL per request',
+                               ['endpoint'], buckets=QUERY_BUCKETS)
+DB_QUERY_SECONDS = Histogram('db_query_duration_seconds', 'Latency of individual SQL statements',
+                             buckets=QUERY_BUCKETS)
+SERIALIZATION_SECONDS = Histogram('response_serialization_seconds', 'Time spent encoding response bodies',
+                                  ['format'], buckets=QUERY_BUCKETS)
+LLM_SECONDS = Histogram('llm_request_duration_seconds', 'Latency of model calls',
+                        ['operation', 'outcome'], buckets=LLM_BUCKETS)
+LLM_TOKENS = Counter('llm_tokens_total', 'Tokens reported by the model', ['kind'])
+LLM_ERRORS = Counter('llm_errors_total', 'Failed model calls', ['operation', 'error'])
+CACHE_REQUESTS = Counter('cache_requests_total', 'Cache lookups; hit ratio is hit / (hit + miss)',
+                         ['cache', 'result'])
+
+
+def record_cache(cache, hit):
+    CACHE_REQUESTS.labels(cache, 'hit' if hit else 'miss').inc()
+
+
+def observe_llm(operation, seconds, generation=None, error=None):
+    """Record one model call; generation carries token usage when the model reported it"""
+    LLM_SECONDS.labels(operation, 'error' if error else 'ok').observe(seconds)
+    if error is not None:
+        LLM_ERRORS.labels(operation, type(error).__name__).inc()
+    if generation is not None:
+        if generation.prompt_tokens:
+            LLM_TOKENS.labels('prompt').inc(generation.prompt_tokens)
+        if generation.output_tokens:
+            LLM_TOKENS.labels('output').inc(generation.output_tokens)
+
+
+def _tracking_request():
+    return has_request_context() and 'metrics_started' in g
+
+
+@event.listens_for(Engine, 'before_cursor_execute')
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault('query_started', []).append(time.perf_counter())
+
+
+@event.listens_for(Engine, 'after_cursor_execute')
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    elapsed = time.perf_counter() - conn.info['query_started'].pop()
+    DB_QUERY_SECONDS.observe(elapsed)
+    if _tracking_request():
+        g.metrics_db_queries += 1
+        g.metrics_db_seconds += elapsed
+        if g.metrics_statements is not None:
+            g.metrics_statements.append((elapsed, statement))
+
+
+@event.listens_for(Engine, 'handle_error')
+def _handle_error(exception_context):
+    # A statement that raised never reaches after_cursor_execute; drop its start time
+    conn = exception_context.connection
+    if conn is None or exception_context.statement is None:
+        return
+    started = conn.info.get('query_started')
+    if started:
+        started.pop()
+
+
+def init_app(app):
+    """Install the request timing hooks on a Flask app"""
+    slow_request_ms = app.config.get('SLOW_REQUEST_MS') or 0
+
+    @app.before_request
+    def start_timer():
+        g.metrics_started = time.perf_counter()
+        g.metrics_db_queries = 0
+        g.metrics_db_seconds = 0.0
+        # Statements are only kept when someone may log them
+        g.metrics_statements = [] if slow_request_ms else None
+
+    @app.after_request
+    def remember_status(response):
+        g.metrics_status = response.status_code
+        return response
+
+    # Runs after streamed bodies finish, so their full duration is counted
+    @app.teardown_request
+    def record_request(error=None):
+        if 'metrics_started' not in g:
+            return
+        elapsed = time.perf_counter() - g.pop('metrics_started')
+        endpoint = request.url_rule.rule if request.url_rule else '<unmatched>'
+        status = g.get('metrics_status', 500 if error else 200)
+        REQUEST_SECONDS.labels(endpoint, request.method, str(status)).observe(elapsed)
+        REQUEST_DB_QUERIES.labels(endpoint).observe(g.metrics_db_queries)
+        REQUEST_DB_SECONDS.labels(endpoint).observe(g.metrics_db_seconds)
+
+        if slow_request_ms and elapsed * 1000 >= slow_request_ms:
+            slowest = sorted(g.metrics_statements, key=lambda item: item[0], reverse=True)[:SLOW_LOG_STATEMENTS]
+            app.logger.warning(
+                'Slow request %s %s: %.0f ms, %d queries in %.0f ms%s',
+                request.method, request.full_path.rstrip('?'), elapsed * 1000,
+                g.metrics_db_queries, g.metrics_db_seconds * 1000,
+                ''.join(f'\n  {seconds * 1000:.1f} ms  {" ".join(statement.split())[:SLOW_LOG_STATEMENT_CHARS]}'
+                        for seconds, statement in slowest),
+            )
+
+
+def render():
+    """Current metrics in the Prometheus text format, as (body, content type)"""
+    if os.environ.get('PROMETHEUS_MULTIPROC_DIR'):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return generate_latest(registry), CONTENT_TYPE_LATEST
@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""
+Apply database migrations - run once per deploy, before the app starts
+
+    python migrate.py              # upgrade to the latest revision
+    python migrate.py --current    # print the database's revision
+
+Schema changes, including the leaderboard views or summary tables, are
+Alembic revisions in migrations/versions. After upgrading, empty summary
+tables are filled (see leaderboards.populate).
+"""
+import os
+import sys
+
+from alembic import command
+from alembic.config import Config as AlembicConfig
+from alembic.runtime.migration import MigrationContext
+from alembic.script import ScriptDirectory
+from sqlalchemy import create_engine, inspect
+
+import leaderboards
+from config import Config
+
+BACKEND_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+def alembic_config(connection=None):
+    config = AlembicConfig(os.path.join(BACKEND_DIR, 'alembic.ini'))
+    config.set_main_option('script_location', os.path.join(BACKEND_DIR, 'migrations'))
+    config.attributes['connection'] = connection
+    return config
+
+
+def current_revision(connection):
+    return MigrationContext.configure(connection).get_current_revision()
+
+
+def head_revision():
+    return ScriptDirectory.from_config(alembic_config()).get_current_head()
+
+
+def upgrade_database(engine, revision='head'):
+    """Migrate the schema to revision and fill the leaderboard storage if it is empty"""
+    with engine.begin() as connection:
+        command.upgrade(alembic_config(connection), revision)
+        # Absent when upgrading to a revision before 0006
+        if inspect(connection).has_table(leaderboards.summary_table.name):
+            leaderboards.populate(connection)
+
+
+def main():
+    engine = create_engine(Config.DATABASE_URL)
+    if '--current' in sys.argv[1:]:
+        with engine.connect() as connection:
+            print(f"Database revision: {current_revision(connection) or 'none'} (latest: {head_revision()})")
+        return
+
+    try:
+        print("Applying database migrations...")
+        upgrade_database(engine)
+        with engine.connect() as connection:
+            print(f"✅ Database schema at revision {current_revision(connection)}")
+    except Exception as e:
+        print(f"❌ Error applying migrations: {e}")
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
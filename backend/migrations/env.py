@@ -0,0 +1,74 @@
+"""
+Alembic environment.
+
+migrate.py passes its own connection in config.attributes['connection'];
+the alembic command line connects to DATABASE_URL.
+"""
+import warnings
+from logging.config import fileConfig
+
+from alembic import context
+from sqlalchemy import create_engine, pool
+from sqlalchemy.engine import make_url
+
+from config import Config
+from leaderboards import summary_metadata
+from models import db
+
+config = context.config
+if config.config_file_name is not None and config.attributes.get('connection') is None:
+    fileConfig(config.config_file_name)
+
+target_metadata = db.metadata
+
+# Generated column expressions never compare equal after reflection (SQLite
+# truncates them at the first ')', PostgreSQL rewrites them), and Alembic
+# cannot alter them anyway: changing one takes a hand-written revision
+warnings.filterwarnings('ignore', message=r'Computed default on \S+ cannot be modified')
+
+
+def object_filter(dialect_name):
+    """
+    Autogenerate filter: leaves out the leaderboard views/tables (materialized
+    views on PostgreSQL, created by hand in revision 0006) and indexes
+    declared for another dialect with ddl_if().
+    """
+    def include_object(obj, name, type_, reflected, compare_to):
+        if type_ == 'table' and name in summary_metadata.tables:
+            return False
+        ddl_if = getattr(obj, '_ddl_if', None)
+        return not (type_ == 'index' and ddl_if is not None and ddl_if.dialect not in (None, dialect_name))
+
+    return include_object
+
+
+def run_migrations_offline():
+    url = make_url(Config.DATABASE_URL)
+    context.configure(url=url, target_metadata=target_metadata,
+                      include_object=object_filter(url.get_backend_name()), literal_binds=True)
+    with context.begin_transaction():
+        context.run_migrations()
+
+
+def run_with(connection):
+    context.configure(connection=connection, target_metadata=target_metadata,
+                      include_object=object_filter(connection.dialect.name))
+    with context.begin_transaction():
+        context.run_migrations()
+
+
+def run_migrations_online():
+    connection = config.attributes.get('connection')
+    if connection is not None:
+        run_with(connection)
+        return
+
+    engine = create_engine(Config.DATABASE_URL, poolclass=pool.NullPool)
+    with engine.connect() as connection:
+        run_with(connection)
+
+
+if context.is_offline_mode():
+    run_migrations_offline()
+else:
+    run_migrations_online()
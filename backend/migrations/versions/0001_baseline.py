@@ -0,0 +1,121 @@
+"""Baseline schema
+
+Creates the players, description_jobs and description_cache tables as
+they were before migrations were introduced. Databases created earlier by
+db.create_all() are adopted: missing tables, columns and indexes are
+added and everything already present is left alone.
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-17
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = '0001'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def players_columns():
+    return [
+        sa.Column('id', sa.Integer, primary_key=True),
+        sa.Column('name', sa.String(100), nullable=False),
+        sa.Column('position', sa.String(20)),
+        *[sa.Column(name, sa.Integer) for name in (
+            'games', 'at_bat', 'runs', 'hits', 'double_2b', 'third_baseman', 'home_runs', 'rbi',
+            'walks', 'strikeouts', 'stolen_bases', 'caught_stealing')],
+        *[sa.Column(name, sa.Float) for name in (
+            'batting_average', 'on_base_percentage', 'slugging_percentage', 'on_base_plus_slugging',
+            'hits_per_game', 'isolated_power', 'strikeout_rate', 'walk_rate', 'stolen_base_pct')],
+        sa.Column('description', sa.Text),
+        sa.Column('description_hash', sa.String(64)),
+        sa.Column('source_key', sa.String(120)),
+        sa.Column('source_hash', sa.String(40)),
+        sa.Column('removed_at', sa.DateTime),
+        sa.Column('created_at', sa.DateTime),
+        sa.Column('updated_at', sa.DateTime),
+    ]
+
+
+def description_jobs_columns():
+    return [
+        sa.Column('id', sa.String(36), primary_key=True),
+        sa.Column('status', sa.String(20), nullable=False),
+        sa.Column('total', sa.Integer, nullable=False),
+        sa.Column('completed', sa.Integer, nullable=False),
+        sa.Column('failed', sa.Integer, nullable=False),
+        sa.Column('last_error', sa.Text),
+        sa.Column('created_at', sa.DateTime),
+        sa.Column('updated_at', sa.DateTime),
+    ]
+
+
+def description_cache_columns():
+    return [
+        sa.Column('key', sa.String(64), primary_key=True),
+        sa.Column('description', sa.Text, nullable=False),
+        sa.Column('model', sa.String(50)),
+        sa.Column('latency_ms', sa.Integer),
+        sa.Column('prompt_tokens', sa.Integer),
+        sa.Column('output_tokens', sa.Integer),
+        sa.Column('created_at', sa.DateTime),
+        sa.Column('last_used_at', sa.DateTime),
+    ]
+
+
+TABLES = {
+    'players': players_columns,
+    'description_jobs': description_jobs_columns,
+    'description_cache': description_cache_columns,
+}
+
+# (name, table, columns, unique)
+INDEXES = [
+    ('ix_players_position', 'players', ['position'], False),
+    ('ix_players_hits_per_game', 'players', ['hits_per_game'], False),
+    ('ix_players_isolated_power', 'players', ['isolated_power'], False),
+    ('ix_players_strikeout_rate', 'players', ['strikeout_rate'], False),
+    ('ix_players_walk_rate', 'players', ['walk_rate'], False),
+    ('ix_players_stolen_base_pct', 'players', ['stolen_base_pct'], False),
+    ('ix_players_source_key', 'players', ['source_key'], True),
+    ('ix_players_updated_at', 'players', ['updated_at'], False),
+    ('ix_description_cache_last_used_at', 'description_cache', ['last_used_at'], False),
+]
+
+
+def upgrade():
+    bind = op.get_bind()
+    # Offline (--sql) scripts are written for an empty database
+    inspector = None if op.get_context().as_sql else sa.inspect(bind)
+    existing_tables = set(inspector.get_table_names()) if inspector else set()
+
+    for table, columns in TABLES.items():
+        if table not in existing_tables:
+            op.create_table(table, *columns())
+            continue
+        # Adopt a table created by db.create_all(): add columns introduced since
+        existing_columns = {column['name'] for column in inspector.get_columns(table)}
+        for column in columns():
+            if column.name not in existing_columns:
+                op.add_column(table, column)
+
+    existing_indexes = {
+        index['name']
+        for table in TABLES if table in existing_tables
+        for index in inspector.get_indexes(table)
+    }
+    for name, table, columns, unique in INDEXES:
+        if name not in existing_indexes:
+            op.create_index(name, table, columns, unique=unique)
+
+    if bind.dialect.name == 'postgresql':
+        # Trigram index for ?q= name search
+        op.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+        op.execute('CREATE INDEX IF NOT EXISTS ix_players_name_trgm ON players USING gin (name gin_trgm_ops)')
+
+
+def downgrade():
+    for table in reversed(list(TABLES)):
+        op.drop_table(table)
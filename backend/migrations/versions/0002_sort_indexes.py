@@ -0,0 +1,62 @@
+"""Composite (sort key, id) indexes for the player list
+
+Every list query filters on removed_at IS NULL and orders by one sort
+column, NULLs last, then by id in the same direction. One partial index
+per sort column, in that order, lets the first page and every keyset page
+be read straight off the index instead of sorting the table. Stats are
+indexed descending (the default order) and name ascending; SQLite can walk
+each index either way. The composite indexes replace the single-column
+indexes on the derived rates.
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-17
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = '0002'
+down_revision = '0001'
+branch_labels = None
+depends_on = None
+
+# Sort column -> direction of its index
+SORT_INDEXES = {
+    'hits': 'desc',
+    'home_runs': 'desc',
+    'name': 'asc',
+    'batting_average': 'desc',
+    'hits_per_game': 'desc',
+    'isolated_power': 'desc',
+    'strikeout_rate': 'desc',
+    'walk_rate': 'desc',
+    'stolen_base_pct': 'desc',
+}
+
+REPLACED_INDEXES = ['hits_per_game', 'isolated_power', 'strikeout_rate', 'walk_rate', 'stolen_base_pct']
+
+
+def sort_index_columns(column, direction, dialect_name):
+    if direction == 'asc':
+        return [column, 'id']
+    # PostgreSQL needs NULLS LAST spelled out; SQLite sorts NULLs last when descending
+    if dialect_name == 'postgresql':
+        return [sa.text(f'{column} DESC NULLS LAST'), sa.text('id DESC')]
+    return [sa.text(f'{column} DESC'), sa.text('id DESC')]
+
+
+def upgrade():
+    dialect_name = op.get_bind().dialect.name
+    visible = sa.text('removed_at IS NULL')
+    for column in REPLACED_INDEXES:
+        op.drop_index(f'ix_players_{column}', table_name='players')
+    for column, direction in SORT_INDEXES.items():
+        op.create_index(f'ix_players_{column}_id', 'players', sort_index_columns(column, direction, dialect_name),
+                        postgresql_where=visible, sqlite_where=visible)
+
+
+def downgrade():
+    for column in SORT_INDEXES:
+        op.drop_index(f'ix_players_{column}_id', table_name='players')
+    for column in REPLACED_INDEXES:
+        op.create_index(f'ix_players_{column}', 'players', [column])
@@ -0,0 +1,52 @@
+"""Stat history snapshots
+
+Adds the append-only stat history written by every seed and sync (see
+history.py): stable history keys per source_key, one stat_snapshots row
+per snapshot indexed by snapshot date, and the packed column blocks.
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-17
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = '0003'
+down_revision = '0002'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        'stat_history_keys',
+        sa.Column('id', sa.Integer, primary_key=True),
+        sa.Column('source_key', sa.String(120), nullable=False, unique=True),
+    )
+    op.create_table(
+        'stat_snapshots',
+        sa.Column('id', sa.Integer, primary_key=True),
+        sa.Column('snapshot_date', sa.Date, nullable=False),
+        sa.Column('taken_at', sa.DateTime, nullable=False),
+        sa.Column('kind', sa.String(20), nullable=False),
+        sa.Column('players', sa.Integer, nullable=False),
+        sa.Column('keyframe_id', sa.Integer, sa.ForeignKey('stat_snapshots.id')),
+        sa.Column('stored_bytes', sa.Integer, nullable=False),
+    )
+    op.create_index('ix_stat_snapshots_snapshot_date', 'stat_snapshots', ['snapshot_date'])
+    op.create_table(
+        'stat_snapshot_blocks',
+        sa.Column('snapshot_id', sa.Integer, sa.ForeignKey('stat_snapshots.id'), primary_key=True),
+        sa.Column('block', sa.Integer, primary_key=True),
+        sa.Column('field', sa.String(40), primary_key=True),
+        sa.Column('width', sa.SmallInteger, nullable=False),
+        sa.Column('data', sa.LargeBinary, nullable=False),
+        sa.Column('nulls', sa.LargeBinary),
+    )
+
+
+def downgrade():
+    op.drop_table('stat_snapshot_blocks')
+    op.drop_index('ix_stat_snapshots_snapshot_date', table_name='stat_snapshots')
+    op.drop_table('stat_snapshots')
+    op.drop_table('stat_history_keys')
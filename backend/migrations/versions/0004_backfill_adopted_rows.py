@@ -0,0 +1,75 @@
+"""Backfill derived rates and source keys on adopted rows
+
+The baseline revision adds the derived rate and sync columns to tables
+created by db.create_all(), but leaves them NULL on the rows already
+there: derived sorts and leaderboards come out wrong, and incremental sync
+can neither match those rows nor soft-delete them. This revision computes
+the derived rates for every row (the formulas the app applied on write at
+the time; revision 0008 makes them generated columns) and gives rows without a source_key the natural key a
+seed would have assigned: the normalized name, with #2, #3, ... for
+namesakes in id order.
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-17
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = '0004'
+down_revision = '0003'
+branch_labels = None
+depends_on = None
+
+
+def rate(numerator, denominator):
+    return f'CASE WHEN {denominator} > 0 THEN ROUND(COALESCE({numerator}, 0) * 1.0 / ({denominator}), 3) END'
+
+
+DERIVED = {
+    'hits_per_game': 'CASE WHEN games > 0 THEN ROUND(COALESCE(hits, 0) * 1.0 / games, 3) ELSE 0.0 END',
+    'isolated_power': 'ROUND(CAST(slugging_percentage - batting_average AS NUMERIC), 3)',
+    'strikeout_rate': rate('strikeouts', 'COALESCE(at_bat, 0) + COALESCE(walks, 0)'),
+    'walk_rate': rate('walks', 'COALESCE(at_bat, 0) + COALESCE(walks, 0)'),
+    'stolen_base_pct': rate('stolen_bases', 'COALESCE(stolen_bases, 0) + COALESCE(caught_stealing, 0)'),
+}
+
+players = sa.table('players', sa.column('id', sa.Integer), sa.column('name', sa.String),
+                   sa.column('source_key', sa.String))
+
+
+def natural_key(name, occurrence):
+    # Frozen copy of ingest.natural_key
+    key = (name or '').strip().lower()
+    return key if occurrence == 1 else f'{key}#{occurrence}'
+
+
+def upgrade():
+    op.execute(f"UPDATE players SET {', '.join(f'{column} = {sql}' for column, sql in DERIVED.items())}")
+
+    # Offline (--sql) scripts are written for an empty database
+    if op.get_context().as_sql:
+        return
+    bind = op.get_bind()
+    rows = bind.execute(sa.select(players.c.id, players.c.name, players.c.source_key).order_by(players.c.id)).all()
+    taken = {row.source_key for row in rows if row.source_key is not None}
+    keys = []
+    for row in rows:
+        if row.source_key is not None:
+            continue
+        occurrence = 1
+        while natural_key(row.name, occurrence) in taken:
+            occurrence += 1
+        key = natural_key(row.name, occurrence)
+        taken.add(key)
+        keys.append({'row_id': row.id, 'key': key})
+    if keys:
+        bind.execute(
+            players.update().where(players.c.id == sa.bindparam('row_id')).values(source_key=sa.bindparam('key')),
+            keys,
+        )
+
+
+def downgrade():
+    # Data only: the computed values are valid at the previous revision too
+    pass
@@ -0,0 +1,45 @@
+"""Persisted description job items and shared rate limits
+
+Each queued generation becomes a description_job_items row that any
+worker can claim, so a job survives the process that accepted it. The
+model call rate limit moves to a rate_limits row shared by all workers.
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-17
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = '0005'
+down_revision = '0004'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        'description_job_items',
+        sa.Column('id', sa.Integer, primary_key=True),
+        sa.Column('job_id', sa.String(36), sa.ForeignKey('description_jobs.id'), nullable=False),
+        sa.Column('player_id', sa.Integer, nullable=False),
+        sa.Column('force', sa.Boolean, nullable=False),
+        sa.Column('status', sa.String(20), nullable=False),
+        sa.Column('claimed_by', sa.String(64)),
+        sa.Column('claimed_at', sa.DateTime),
+        sa.Column('attempts', sa.Integer, nullable=False),
+    )
+    op.create_index('ix_description_job_items_job_id', 'description_job_items', ['job_id'])
+    op.create_index('ix_description_job_items_status', 'description_job_items', ['status', 'id'])
+    op.create_table(
+        'rate_limits',
+        sa.Column('name', sa.String(40), primary_key=True),
+        sa.Column('next_slot', sa.Float, nullable=False),
+    )
+
+
+def downgrade():
+    op.drop_table('rate_limits')
+    op.drop_index('ix_description_job_items_status', table_name='description_job_items')
+    op.drop_index('ix_description_job_items_job_id', table_name='description_job_items')
+    op.drop_table('description_job_items')
@@ -0,0 +1,114 @@
+"""Leaderboard and summary storage
+
+On PostgreSQL player_leaderboards and player_stat_summary are materialized
+views (refreshed CONCURRENTLY by leaderboards.refresh); elsewhere they are
+plain tables that refresh rewrites. They used to be created outside Alembic
+with IF NOT EXISTS, so a changed definition never reached existing
+databases; whatever is there is dropped and rebuilt from the definitions
+frozen below.
+
+Changing either definition takes a new revision that drops and recreates
+the storage. On PostgreSQL the views also block ALTERs of the players
+columns they read, so such revisions must drop and recreate them too.
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-17
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = '0006'
+down_revision = '0005'
+branch_labels = None
+depends_on = None
+
+# (stat, players column is a rate that needs 100 at-bats to qualify)
+LEADERBOARD_STATS = [
+    ('hits', False), ('home_runs', False), ('rbi', False), ('runs', False),
+    ('stolen_bases', False), ('walks', False), ('batting_average', True),
+    ('on_base_percentage', True), ('slugging_percentage', True),
+    ('on_base_plus_slugging', True), ('hits_per_game', True), ('isolated_power', True),
+]
+SUMMARY_STATS = ['games', 'hits', 'home_runs', 'rbi', 'batting_average', 'on_base_plus_slugging',
+                 'hits_per_game', 'isolated_power', 'strikeout_rate', 'walk_rate']
+PERCENTILES = [10, 25, 50, 75, 90]
+
+LEADERBOARD_VIEW = """CREATE MATERIALIZED VIEW player_leaderboards AS
+SELECT stat, rank, player_id, name, position, value FROM (
+    SELECT s.stat,
+           row_number() OVER (PARTITION BY s.stat ORDER BY s.value DESC, p.id) AS rank,
+           p.id AS player_id, p.name, p.position, s.value
+    FROM players p
+    CROSS JOIN LATERAL (VALUES {values}) AS s(stat, value, qualified)
+    WHERE p.removed_at IS NULL AND s.value IS NOT NULL AND s.qualified
+) ranked
+WHERE rank <= 25""".format(values=', '.join(
+    f"('{stat}', p.{stat}::double precision, {'p.at_bat >= 100' if rate else 'TRUE'})"
+    for stat, rate in LEADERBOARD_STATS
+))
+
+SUMMARY_VIEW = """CREATE MATERIALIZED VIEW player_stat_summary AS
+SELECT CASE WHEN GROUPING(p.position) = 1 THEN 'ALL' ELSE COALESCE(p.position, '') END AS position,
+    s.stat,
+    count(*) AS players,
+    avg(s.value) AS mean,
+    min(s.value) AS min_value,
+    max(s.value) AS max_value,
+    {percentiles}
+FROM players p
+CROSS JOIN LATERAL (VALUES {values}) AS s(stat, value)
+WHERE p.removed_at IS NULL AND s.value IS NOT NULL
+GROUP BY GROUPING SETS ((s.stat), (s.stat, p.position))""".format(
+    percentiles=',\n    '.join(f'percentile_cont({percentile / 100}) WITHIN GROUP (ORDER BY s.value) AS p{percentile}'
+                               for percentile in PERCENTILES),
+    values=', '.join(f"('{stat}', p.{stat}::double precision)" for stat in SUMMARY_STATS),
+)
+
+
+def drop_storage():
+    if op.get_context().dialect.name == 'postgresql':
+        op.execute('DROP MATERIALIZED VIEW IF EXISTS player_leaderboards')
+        op.execute('DROP MATERIALIZED VIEW IF EXISTS player_stat_summary')
+    else:
+        op.execute('DROP TABLE IF EXISTS player_leaderboards')
+        op.execute('DROP TABLE IF EXISTS player_stat_summary')
+
+
+def create_storage():
+    if op.get_context().dialect.name == 'postgresql':
+        op.execute(LEADERBOARD_VIEW)
+        op.execute('CREATE UNIQUE INDEX ix_player_leaderboards_stat_rank ON player_leaderboards (stat, rank)')
+        op.execute(SUMMARY_VIEW)
+        op.execute('CREATE UNIQUE INDEX ix_player_stat_summary_position_stat ON player_stat_summary (position, stat)')
+        return
+
+    # Filled by leaderboards.refresh(); migrate.py runs one when they are empty
+    op.create_table(
+        'player_leaderboards',
+        sa.Column('stat', sa.String(40), primary_key=True),
+        sa.Column('rank', sa.Integer, primary_key=True),
+        sa.Column('player_id', sa.Integer),
+        sa.Column('name', sa.String(100)),
+        sa.Column('position', sa.String(20)),
+        sa.Column('value', sa.Float),
+    )
+    op.create_table(
+        'player_stat_summary',
+        sa.Column('position', sa.String(20), primary_key=True),
+        sa.Column('stat', sa.String(40), primary_key=True),
+        sa.Column('players', sa.Integer),
+        sa.Column('mean', sa.Float),
+        sa.Column('min_value', sa.Float),
+        sa.Column('max_value', sa.Float),
+        *[sa.Column(f'p{percentile}', sa.Float) for percentile in PERCENTILES],
+    )
+
+
+def upgrade():
+    drop_storage()
+    create_storage()
+
+
+def downgrade():
+    drop_storage()
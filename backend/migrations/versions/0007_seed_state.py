@@ -0,0 +1,31 @@
+"""Applied seed payload hash
+
+Moves the hash of the last applied source payload from the snapshot's
+meta file into seed_state, written in the same transaction as the seed or
+sync, so every server and the database agree on what was applied. The
+first sync after upgrading runs in full.
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2026-10-17
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = '0007'
+down_revision = '0006'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        'seed_state',
+        sa.Column('source', sa.String(40), primary_key=True),
+        sa.Column('applied_sha256', sa.String(64)),
+        sa.Column('applied_at', sa.DateTime),
+    )
+
+
+def downgrade():
+    op.drop_table('seed_state')
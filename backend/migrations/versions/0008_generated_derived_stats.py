@@ -0,0 +1,131 @@
+"""Derived rates as generated columns
+
+hits_per_game, isolated_power, strikeout_rate, walk_rate and
+stolen_base_pct were filled in by ORM hooks and by hand in the Core write
+paths, so any other write left them NULL or stale. They become stored
+generated columns that the database computes on every insert and update.
+
+PostgreSQL (12 or later) drops and re-adds each column; the leaderboard
+views read two of them, so they are dropped first and recreated from
+revision 0006 afterwards. SQLite cannot add a stored generated column to an
+existing table, so players is rebuilt and its data copied across. The
+composite sort indexes on the rates are recreated either way.
+
+Revision ID: 0008
+Revises: 0007
+Create Date: 2026-10-17
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = '0008'
+down_revision = '0007'
+branch_labels = None
+depends_on = None
+
+
+def rate(numerator, denominator):
+    return f'CASE WHEN {denominator} > 0 THEN ROUND(COALESCE({numerator}, 0) * 1.0 / ({denominator}), 3) END'
+
+
+PLATE_APPEARANCES = 'COALESCE(at_bat, 0) + COALESCE(walks, 0)'
+
+DERIVED = {
+    'hits_per_game': 'CASE WHEN games > 0 THEN ROUND(COALESCE(hits, 0) * 1.0 / games, 3) ELSE 0.0 END',
+    'isolated_power': 'ROUND(CAST(slugging_percentage - batting_average AS NUMERIC), 3)',
+    'strikeout_rate': rate('strikeouts', PLATE_APPEARANCES),
+    'walk_rate': rate('walks', PLATE_APPEARANCES),
+    'stolen_base_pct': rate('stolen_bases', 'COALESCE(stolen_bases, 0) + COALESCE(caught_stealing, 0)'),
+}
+
+# Sort column -> direction of its (column, id) index, as created by revision 0002
+SORT_INDEXES = {
+    'hits': 'desc',
+    'home_runs': 'desc',
+    'name': 'asc',
+    'batting_average': 'desc',
+    'hits_per_game': 'desc',
+    'isolated_power': 'desc',
+    'strikeout_rate': 'desc',
+    'walk_rate': 'desc',
+    'stolen_base_pct': 'desc',
+}
+
+
+def players_columns(generated):
+    """The players table at this revision, with the derived rates generated or plain"""
+    return [
+        sa.Column('id', sa.Integer, primary_key=True),
+        sa.Column('name', sa.String(100), nullable=False),
+        sa.Column('position', sa.String(20)),
+        *[sa.Column(name, sa.Integer) for name in (
+            'games', 'at_bat', 'runs', 'hits', 'double_2b', 'third_baseman', 'home_runs', 'rbi',
+            'walks', 'strikeouts', 'stolen_bases', 'caught_stealing')],
+        *[sa.Column(name, sa.Float) for name in (
+            'batting_average', 'on_base_percentage', 'slugging_percentage', 'on_base_plus_slugging')],
+        *[sa.Column(name, sa.Float, *([sa.Computed(expression, persisted=True)] if generated else []))
+          for name, expression in DERIVED.items()],
+        sa.Column('description', sa.Text),
+        sa.Column('description_hash', sa.String(64)),
+        sa.Column('source_key', sa.String(120)),
+        sa.Column('source_hash', sa.String(40)),
+        sa.Column('removed_at', sa.DateTime),
+        sa.Column('created_at', sa.DateTime),
+        sa.Column('updated_at', sa.DateTime),
+    ]
+
+
+def create_sort_index(column):
+    visible = sa.text('removed_at IS NULL')
+    if SORT_INDEXES[column] == 'asc':
+        columns = [column, 'id']
+    elif op.get_context().dialect.name == 'postgresql':
+        columns = [sa.text(f'{column} DESC NULLS LAST'), sa.text('id DESC')]
+    else:
+        columns = [sa.text(f'{column} DESC'), sa.text('id DESC')]
+    op.create_index(f'ix_players_{column}_id', 'players', columns, postgresql_where=visible, sqlite_where=visible)
+
+
+def rebuild_sqlite_players(generated):
+    """Recreate players with the derived rates generated or plain, keeping every row"""
+    op.create_table('players_rebuilt', *players_columns(generated))
+    copied = ', '.join(column.name for column in players_columns(generated=True) if column.computed is None)
+    if not generated:
+        copied += ', ' + ', '.join(DERIVED)
+    op.execute(f'INSERT INTO players_rebuilt ({copied}) SELECT {copied} FROM players')
+    op.drop_table('players')
+    op.rename_table('players_rebuilt', 'players')
+
+    op.create_index('ix_players_position', 'players', ['position'])
+    op.create_index('ix_players_source_key', 'players', ['source_key'], unique=True)
+    op.create_index('ix_players_updated_at', 'players', ['updated_at'])
+    for column in SORT_INDEXES:
+        create_sort_index(column)
+
+
+def leaderboard_storage():
+    return op.get_context().script.get_revision('0006').module
+
+
+def upgrade():
+    if op.get_context().dialect.name != 'postgresql':
+        rebuild_sqlite_players(generated=True)
+        return
+
+    leaderboard_storage().drop_storage()
+    for column, expression in DERIVED.items():
+        # Dropping the column drops its sort index too
+        op.drop_column('players', column)
+        op.add_column('players', sa.Column(column, sa.Float, sa.Computed(expression, persisted=True)))
+        create_sort_index(column)
+    leaderboard_storage().create_storage()
+
+
+def downgrade():
+    if op.get_context().dialect.name != 'postgresql':
+        rebuild_sqlite_players(generated=False)
+        return
+
+    # PostgreSQL 13+: keep the current values as plain columns
+    for column in DERIVED:
+        op.execute(f'ALTER TABLE players ALTER COLUMN {column} DROP EXPRESSION')
@@ -1,14 +1,58 @@
 from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy import DDL, event
 from datetime import datetime
 
-db = SQLAlchemy()
+from database import RoutingSession
+
+db = SQLAlchemy(session_options={'class_': RoutingSession})
+
+DERIVED_STAT_FIELDS = ['hits_per_game', 'isolated_power', 'strikeout_rate', 'walk_rate', 'stolen_base_pct']
+# Fields clients may change through the update endpoints
+EDITABLE_FIELDS = ['name', 'position', 'games', 'at_bat', 'runs', 'hits',
+                   'double_2b', 'third_baseman', 'home_runs', 'rbi', 'walks',
+                   'strikeouts', 'stolen_bases', 'caught_stealing', 'batting_average',
+                   'on_base_percentage', 'slugging_percentage', 'on_base_plus_slugging', 'description']
+SYNC_FIELDS = ['source_key', 'source_hash', 'removed_at']
+# Player list sort columns and the direction each one's (column, id) index is built in
+SORT_INDEX_DIRECTIONS = {
+    'hits': 'desc', 'home_runs': 'desc', 'name': 'asc', 'batting_average': 'desc',
+    'hits_per_game': 'desc', 'isolated_power': 'desc', 'strikeout_rate': 'desc',
+    'walk_rate': 'desc', 'stolen_base_pct': 'desc',
+}
+DERIVED_STAT_INPUTS = ['games', 'at_bat', 'hits', 'walks', 'strikeouts', 'stolen_bases',
+                       'caught_stealing', 'batting_average', 'slugging_percentage']
+
+def _rate_sql(numerator, denominator):
+    """SQL for a ratio rounded to 3 places, NULL when the denominator is empty"""
+    return f'CASE WHEN {denominator} > 0 THEN ROUND(COALESCE({numerator}, 0) * 1.0 / ({denominator}), 3) END'
+
+PLATE_APPEARANCES_SQL = 'COALESCE(at_bat, 0) + COALESCE(walks, 0)'
+STEAL_ATTEMPTS_SQL = 'COALESCE(stolen_bases, 0) + COALESCE(caught_stealing, 0)'
+
+# Generation expressions of the derived rate columns (PostgreSQL and SQLite
+# alike); kept in step with migrations/versions/0008_generated_derived_stats.py
+DERIVED_STAT_SQL = {
+    'hits_per_game': 'CASE WHEN games > 0 THEN ROUND(COALESCE(hits, 0) * 1.0 / games, 3) ELSE 0.0 END',
+    'isolated_power': 'ROUND(CAST(slugging_percentage - batting_average AS NUMERIC), 3)',
+    'strikeout_rate': _rate_sql('strikeouts', PLATE_APPEARANCES_SQL),
+    'walk_rate': _rate_sql('walks', PLATE_APPEARANCES_SQL),
+    'stolen_base_pct': _rate_sql('stolen_bases', STEAL_ATTEMPTS_SQL),
+}
+
+def _derived_stat(field):
+    return db.Column(db.Float, db.Computed(DERIVED_STAT_SQL[field], persisted=True))
 
 class Player(db.Model):
     __tablename__ = 'players'
+    __table_args__ = (
+        # Trigram index for ?q= name search (PostgreSQL only; SQLite falls back to LIKE)
+        db.Index('ix_players_name_trgm', 'name', postgresql_using='gin',
+                 postgresql_ops={'name': 'gin_trgm_ops'}).ddl_if(dialect='postgresql'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.String(100), nullable=False)
-    position = db.Column(db.String(20))
+    position = db.Column(db.String(20), index=True)
     games = db.Column(db.Integer, default=0)
     at_bat = db.Column(db.Integer, default=0)
     runs = db.Column(db.Integer, default=0)
@@ -25,14 +69,25 @@ class Player(db.Model):
     on_base_percentage = db.Column(db.Float)
     slugging_percentage = db.Column(db.Float)
     on_base_plus_slugging = db.Column(db.Float)
+    # Derived rates: stored generated columns computed by the database on
+    # every insert and update (ORM or Core), indexed so they sort in SQL
+    hits_per_game = _derived_stat('hits_per_game')
+    isolated_power = _derived_stat('isolated_power')
+    strikeout_rate = _derived_stat('strikeout_rate')
+    walk_rate = _derived_stat('walk_rate')
+    stolen_base_pct = _derived_stat('stolen_base_pct')
     description = db.Column(db.Text)
+    # Hash of the prompt inputs the description was generated from (see description_cache.py)
+    description_hash = db.Column(db.String(64))
+    # Incremental sync bookkeeping: stable natural key, hash of the last
+    # ingested source record, and soft-delete marker for vanished players
+    source_key = db.Column(db.String(120), unique=True, index=True)
+    source_hash = db.Column(db.String(40))
+    removed_at = db.Column(db.DateTime)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
-    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, index=True)
     
     def to_dict(self):
-        # Calculate HitsPerGame on the fly
-        hits_per_game = round(self.hits / self.games, 3) if self.games > 0 else 0.0
-        
         return {
             'id': self.id,
             'name': self.name,
@@ -53,7 +108,11 @@ class Player(db.Model):
             'on_base_percentage': self.on_base_percentage,
             'slugging_percentage': self.slugging_percentage,
             'on_base_plus_slugging': self.on_base_plus_slugging,
-            'hits_per_game': hits_per_game,
+            'hits_per_game': self.hits_per_game,
+            'isolated_power': self.isolated_power,
+            'strikeout_rate': self.strikeout_rate,
+            'walk_rate': self.walk_rate,
+            'stolen_base_pct': self.stolen_base_pct,
             'description': self.description,
             'created_at': self.created_at.isoformat() if self.created_at else None,
             'updated_at': self.updated_at.isoformat() if self.updated_at else None
@@ -61,3 +120,158 @@ class Player(db.Model):
     
     def __repr__(self):
         return f'<Player {self.name}>'
+
+def _sort_indexes():
+    """
+    Composite (sort column, id) indexes over visible players, matching the
+    list query's ORDER BY ... NULLS LAST, id so pages are read off the index.
+    
+    Descending indexes spell out NULLS LAST on PostgreSQL only; SQLite
+    rejects it in an index and already sorts NULLs last when descending.
+    Kept in step with migrations/versions/0002_sort_indexes.py.
+    """
+    visible = Player.removed_at.is_(None)
+    for field, direction in SORT_INDEX_DIRECTIONS.items():
+        column = getattr(Player, field)
+        name = f'ix_players_{field}_id'
+        if direction == 'asc':
+            db.Index(name, column, Player.id, postgresql_where=visible, sqlite_where=visible)
+            continue
+        db.Index(name, column.desc().nulls_last(), Player.id.desc(),
+                 postgresql_where=visible).ddl_if(dialect='postgresql')
+        db.Index(name, column.desc(), Player.id.desc(), sqlite_where=visible).ddl_if(dialect='sqlite')
+
+_sort_indexes()
+
+# pg_trgm must exist before the trigram index is created
+event.listen(
+    Player.__table__, 'before_create',
+    DDL('CREATE EXTENSION IF NOT EXISTS pg_trgm').execute_if(dialect='postgresql'),
+)
+
+class DescriptionJob(db.Model):
+    """Progress of a background description generation job"""
+    __tablename__ = 'description_jobs'
+    
+    id = db.Column(db.String(36), primary_key=True)
+    status = db.Column(db.String(20), nullable=False, default='queued')
+    total = db.Column(db.Integer, nullable=False, default=0)
+    completed = db.Column(db.Integer, nullable=False, default=0)
+    failed = db.Column(db.Integer, nullable=False, default=0)
+    last_error = db.Column(db.Text)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'status': self.status,
+            'total': self.total,
+            'completed': self.completed,
+            'failed': self.failed,
+            'last_error': self.last_error,
+            'created_at': self.created_at.isoformat() if self.created_at else None,
+            'updated_at': self.updated_at.isoformat() if self.updated_at else None
+        }
+    
+    def __repr__(self):
+        return f'<DescriptionJob {self.id} {self.status}>'
+
+class DescriptionJobItem(db.Model):
+    """One player's generation within a job, claimed by whichever worker picks it up"""
+    __tablename__ = 'description_job_items'
+    __table_args__ = (
+        db.Index('ix_description_job_items_status', 'status', 'id'),
+    )
+    
+    id = db.Column(db.Integer, primary_key=True)
+    job_id = db.Column(db.String(36), db.ForeignKey('description_jobs.id'), nullable=False, index=True)
+    player_id = db.Column(db.Integer, nullable=False)
+    force = db.Column(db.Boolean, nullable=False, default=False)
+    # queued -> claimed -> done or failed; stale claims go back to queued
+    status = db.Column(db.String(20), nullable=False, default='queued')
+    claimed_by = db.Column(db.String(64))
+    claimed_at = db.Column(db.DateTime)
+    attempts = db.Column(db.Integer, nullable=False, default=0)
+    
+    def __repr__(self):
+        return f'<DescriptionJobItem {self.job_id}/{self.player_id} {self.status}>'
+
+class RateLimit(db.Model):
+    """Next free start time (Unix seconds) of a rate limit shared by every worker"""
+    __tablename__ = 'rate_limits'
+    
+    name = db.Column(db.String(40), primary_key=True)
+    next_slot = db.Column(db.Float, nullable=False, default=0.0)
+    
+    def __repr__(self):
+        return f'<RateLimit {self.name}>'
+
+class SeedState(db.Model):
+    """Hash of the source payload the players table was last seeded or synced from"""
+    __tablename__ = 'seed_state'
+    
+    source = db.Column(db.String(40), primary_key=True)
+    applied_sha256 = db.Column(db.String(64))
+    applied_at = db.Column(db.DateTime)
+    
+    def __repr__(self):
+        return f'<SeedState {self.source}>'
+
+class DescriptionCacheEntry(db.Model):
+    """LLM output cached by a hash of the prompt version, model and prompt inputs"""
+    __tablename__ = 'description_cache'
+    
+    key = db.Column(db.String(64), primary_key=True)
+    description = db.Column(db.Text, nullable=False)
+    model = db.Column(db.String(50))
+    latency_ms = db.Column(db.Integer)
+    prompt_tokens = db.Column(db.Integer)
+    output_tokens = db.Column(db.Integer)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    last_used_at = db.Column(db.DateTime, default=datetime.utcnow, index=True)
+    
+    def __repr__(self):
+        return f'<DescriptionCacheEntry {self.key[:12]}>'
+
+class StatHistoryKey(db.Model):
+    """Stable integer key for a player's source_key; stat snapshots are stored by it"""
+    __tablename__ = 'stat_history_keys'
+    
+    id = db.Column(db.Integer, primary_key=True)
+    source_key = db.Column(db.String(120), nullable=False, unique=True)
+    
+    def __repr__(self):
+        return f'<StatHistoryKey {self.id} {self.source_key}>'
+
+class StatSnapshot(db.Model):
+    """The player stats as of one seed or sync; the values live in stat_snapshot_blocks"""
+    __tablename__ = 'stat_snapshots'
+    
+    id = db.Column(db.Integer, primary_key=True)
+    snapshot_date = db.Column(db.Date, nullable=False, index=True)
+    taken_at = db.Column(db.DateTime, nullable=False)
+    kind = db.Column(db.String(20), nullable=False)
+    players = db.Column(db.Integer, nullable=False)
+    # Snapshot this one's stats are stored as differences from; NULL for keyframes
+    keyframe_id = db.Column(db.Integer, db.ForeignKey('stat_snapshots.id'))
+    stored_bytes = db.Column(db.Integer, nullable=False)
+    
+    def __repr__(self):
+        return f'<StatSnapshot {self.id} {self.snapshot_date}>'
+
+class StatSnapshotBlock(db.Model):
+    """One packed column of one block of history keys within a snapshot"""
+    __tablename__ = 'stat_snapshot_blocks'
+    
+    snapshot_id = db.Column(db.Integer, db.ForeignKey('stat_snapshots.id'), primary_key=True)
+    block = db.Column(db.Integer, primary_key=True)
+    field = db.Column(db.String(40), primary_key=True)
+    # Bytes per packed integer (1, 2, 4 or 8) before compression
+    width = db.Column(db.SmallInteger, nullable=False)
+    data = db.Column(db.LargeBinary, nullable=False)
+    # Packed bitmap of NULL values, when the column has any
+    nulls = db.Column(db.LargeBinary)
+    
+    def __repr__(self):
+        return f'<StatSnapshotBlock {self.snapshot_id}/{self.block}/{self.field}>'
@@ -0,0 +1,91 @@
+"""
+Name normalization for player names and positions from the external API.
+
+Accented characters are folded to ASCII and '?' characters left by the
+API's broken encoding are repaired from known Spanish/Latin name patterns.
+Patterns are compiled once, a single alternation of all of them decides
+whether any needs applying at all, and results are memoized because the
+same names and positions recur on every reseed.
+"""
+import re
+import unicodedata
+from functools import lru_cache
+
+CACHE_SIZE = 65536
+
+# Characters that NFD decomposition does not reduce to ASCII
+SPECIAL_CASES = str.maketrans({
+    'ß': 'ss',  # German eszett
+    'æ': 'ae',  # Latin ligature
+    'œ': 'oe',  # Latin ligature
+    'ð': 'd',   # Icelandic eth
+    'þ': 'th',  # Icelandic thorn
+})
+
+# Common patterns for corrupted characters in baseball names
+# These are based on common Spanish/Latin names in baseball
+CORRUPTED_PATTERNS = [
+    (r'Beltr\?n+', 'Beltran'),
+    (r'Encarnaci\?n', 'Encarnacion'),
+    (r'B\?ez', 'Baez'),
+    (r'\?lvarez', 'Alvarez'),
+    (r'San\?', 'Sano'),
+    (r'Gonz\?lez', 'Gonzalez'),
+    (r'Rodr\?guez', 'Rodriguez'),
+    (r'Fern\?ndez', 'Fernandez'),
+    (r'Mart\?nez', 'Martinez'),
+    (r'Garc\?a', 'Garcia'),
+    (r'L\?pez', 'Lopez'),
+    (r'P\?rez', 'Perez'),
+    (r'Hern\?ndez', 'Hernandez'),
+    (r'Ram\?rez', 'Ramirez'),
+    (r'Jim\?nez', 'Jimenez'),
+    (r'V\?squez', 'Vasquez'),
+    (r'Castr\?', 'Castro'),
+    (r'Delg\?do', 'Delgado'),
+    (r'Vald\?z', 'Valdez'),
+    (r'Mor\?les', 'Morales'),
+]
+
+_COMPILED_PATTERNS = [(re.compile(pattern, flags=re.IGNORECASE), replacement)
+                      for pattern, replacement in CORRUPTED_PATTERNS]
+_ANY_CORRUPTED = re.compile('|'.join(pattern for pattern, _ in CORRUPTED_PATTERNS), flags=re.IGNORECASE)
+
+
+def fix_corrupted_characters(text):
+    """Intelligently fix corrupted characters (?) based on context"""
+    if '?' not in text:
+        return text
+
+    if _ANY_CORRUPTED.search(text):
+        # Patterns can overlap (e.g. 'San?' and '?lvarez'), so they are
+        # applied in order rather than as one combined substitution
+        for pattern, replacement in _COMPILED_PATTERNS:
+            text = pattern.sub(replacement, text)
+
+    # Fallback for patterns we haven't seen before: 'a' is the most common
+    # vowel in Spanish names
+    return text.replace('?', 'a')
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def _fix_accented(text):
+    if not text.isascii():
+        # NFD separates base characters from diacritics, which are then dropped
+        normalized = unicodedata.normalize('NFD', text)
+        text = ''.join(char for char in normalized if unicodedata.category(char) != 'Mn')
+        text = text.translate(SPECIAL_CASES)
+    return fix_corrupted_characters(text)
+
+
+def fix_accented_characters(text):
+    """Fix accented characters using Unicode normalization and intelligent character replacement"""
+    if not text:
+        return text
+    return _fix_accented(text)
+
+
+def normalize_names(values):
+    """Normalize a whole column of names or positions, computing each distinct value once"""
+    distinct = {value: fix_accented_characters(value) for value in set(values)}
+    return [distinct[value] for value in values]
@@ -0,0 +1,285 @@
+"""
+Query helpers for the player list endpoint: filtering, name search,
+sorting, keyset pagination and column projection, all pushed down into SQL.
+"""
+import base64
+import json
+
+from sqlalchemy import and_, or_, select, tuple_
+
+from models import SORT_INDEX_DIRECTIONS, SYNC_FIELDS, db, Player
+from serialize import RowSet
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 500
+MAX_BATCH_IDS = 1000
+
+# Rows fetched and encoded per chunk when streaming a full list
+STREAM_BATCH_SIZE = 1000
+
+
+class QueryError(ValueError):
+    """Raised for malformed list-query parameters (reported as HTTP 400)"""
+
+
+def sort_expressions():
+    """Map of sort_by values to the SQL expression they order by"""
+    return {field: getattr(Player, field) for field in SORT_INDEX_DIRECTIONS}
+
+
+def projectable_fields():
+    """Map of fields= names to the SQL expression that produces them"""
+    return {
+        column.name: getattr(Player, column.name)
+        for column in Player.__table__.columns
+        if column.name not in SYNC_FIELDS
+    }
+
+
+def numeric_fields():
+    """Map of numeric column names that accept range filters"""
+    return {
+        column.name: getattr(Player, column.name)
+        for column in Player.__table__.columns
+        if column.name != 'id' and isinstance(column.type, (db.Integer, db.Float))
+    }
+
+
+def parse_filters(args):
+    """
+    Parse filter query parameters into a canonical dict.
+
+    Supported parameters:
+    - position=SS or position=SS,2B
+    - min_<field>=N / max_<field>=N, also written <field>>=N / <field><=N
+    - q=text for a name search
+    - ids=1,2,3 for a batch read of specific players
+    """
+    filters = {}
+    numeric = numeric_fields()
+
+    ids = [value.strip() for value in ','.join(args.getlist('ids')).split(',') if value.strip()]
+    if ids:
+        try:
+            filters['ids'] = sorted({int(value) for value in ids})
+        except ValueError:
+            raise QueryError('ids must be a comma-separated list of integers')
+        if len(filters['ids']) > MAX_BATCH_IDS:
+            raise QueryError(f'At most {MAX_BATCH_IDS} ids per request')
+
+    positions = [value.strip() for value in ','.join(args.getlist('position')).split(',') if value.strip()]
+    if positions:
+        filters['position'] = sorted(set(positions))
+
+    q = (args.get('q') or '').strip()
+    if q:
+        filters['q'] = q
+
+    for key, value in args.items():
+        # "home_runs>=10" arrives as key "home_runs>" with value "10"
+        if key.startswith('min_') or key.endswith('>'):
+            bound, field = 'min', key[4:] if key.startswith('min_') else key[:-1]
+        elif key.startswith('max_') or key.endswith('<'):
+            bound, field = 'max', key[4:] if key.startswith('max_') else key[:-1]
+        else:
+            continue
+        if field not in numeric:
+            raise QueryError(f'Cannot filter on {field}')
+        try:
+            number = float(value)
+        except ValueError:
+            raise QueryError(f'{key} must be a number')
+        filters.setdefault(bound, {})[field] = number
+
+    return filters
+
+
+def escape_like(value):
+    """Escape LIKE wildcards in user input"""
+    return value.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+
+
+def filter_conditions(filters, dialect_name):
+    """Translate parsed filters into SQL WHERE conditions"""
+    conditions = []
+    numeric = numeric_fields()
+
+    if 'ids' in filters:
+        conditions.append(Player.id.in_(filters['ids']))
+    if 'position' in filters:
+        conditions.append(Player.position.in_(filters['position']))
+    for field, value in filters.get('min', {}).items():
+        conditions.append(numeric[field] >= value)
+    for field, value in filters.get('max', {}).items():
+        conditions.append(numeric[field] <= value)
+
+    if 'q' in filters:
+        pattern = f"%{escape_like(filters['q'])}%"
+        if dialect_name == 'postgresql':
+            # Substring and fuzzy (trigram similarity) matches, both served by the GIN index
+            conditions.append(or_(Player.name.ilike(pattern, escape='\\'), Player.name.op('%')(filters['q'])))
+        else:
+            conditions.append(Player.name.ilike(pattern, escape='\\'))
+
+    return conditions
+
+
+def encode_cursor(sort_value, player_id):
+    """Encode the sort key of the last row on a page as an opaque cursor"""
+    raw = json.dumps([sort_value, player_id], separators=(',', ':')).encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii').rstrip('=')
+
+
+def decode_cursor(cursor):
+    """Decode a cursor produced by encode_cursor into (sort_value, id)"""
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        sort_value, player_id = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+    except (ValueError, TypeError):
+        raise QueryError('Invalid cursor')
+    if not isinstance(player_id, int) or isinstance(sort_value, (list, dict)):
+        raise QueryError('Invalid cursor')
+    return sort_value, player_id
+
+
+def parse_fields(fields_param):
+    """Parse a comma separated fields= value, always keeping id first"""
+    if not fields_param:
+        return None
+    available = projectable_fields()
+    requested = [name.strip() for name in fields_param.split(',') if name.strip()]
+    unknown = [name for name in requested if name not in available]
+    if unknown:
+        raise QueryError(f"Unknown fields: {', '.join(unknown)}")
+    return ['id'] + [name for name in dict.fromkeys(requested) if name != 'id']
+
+
+def parse_limit(limit_param):
+    """Parse and clamp the limit= page size"""
+    if limit_param is None:
+        return DEFAULT_PAGE_SIZE
+    try:
+        limit = int(limit_param)
+    except ValueError:
+        raise QueryError('limit must be an integer')
+    if limit < 1:
+        raise QueryError('limit must be positive')
+    return min(limit, MAX_PAGE_SIZE)
+
+
+def keyset_condition(sort_column, order, sort_value, player_id):
+    """
+    WHERE clause selecting rows after (sort_value, player_id).
+
+    Rows are ordered by the sort key with NULLs last, then by id in the
+    same direction. A non-NULL cursor is a row-value comparison, which the
+    (sort column, id) index can seek to and which only matches non-NULL
+    sort keys; list_players reads the NULL tail separately once those run
+    out. A cursor already in the NULL tail continues it by id.
+    """
+    if sort_value is None:
+        return and_(sort_column.is_(None), Player.id < player_id if order == 'desc' else Player.id > player_id)
+
+    key, cursor = tuple_(sort_column, Player.id), tuple_(sort_value, player_id)
+    return key < cursor if order == 'desc' else key > cursor
+
+
+def serialize_value(value):
+    """Convert a projected column value into a JSON friendly value"""
+    if hasattr(value, 'isoformat'):
+        return value.isoformat()
+    return value
+
+
+def default_fields():
+    """Fields of the full player payload, in Player.to_dict() order"""
+    return [name for name in projectable_fields() if name != 'description_hash']
+
+
+def player_query(sort_by, order, fields=None, after=None, filters=None, null_tail=False):
+    """
+    Core SELECT for the player list, returning (statement, field names).
+
+    Rows carry the requested fields followed by a trailing _sort_key column
+    used to build the next cursor. null_tail selects only the rows whose
+    sort key is NULL, from the start.
+    """
+    sort_column = sort_expressions()[sort_by]
+    if order == 'desc':
+        ordering = [sort_column.desc().nulls_last(), Player.id.desc()]
+    else:
+        ordering = [sort_column.asc().nulls_last(), Player.id.asc()]
+
+    fields = fields or default_fields()
+    available = projectable_fields()
+    query = select(*[available[name].label(name) for name in fields], sort_column.label('_sort_key'))
+
+    # Players soft-deleted by an incremental sync are hidden from the list
+    query = query.where(Player.removed_at.is_(None))
+    if filters:
+        query = query.where(*filter_conditions(filters, db.session.get_bind().dialect.name))
+
+    if after is not None:
+        sort_value, player_id = decode_cursor(after)
+        query = query.where(keyset_condition(sort_column, order, sort_value, player_id))
+    elif null_tail:
+        query = query.where(sort_column.is_(None))
+
+    return query.order_by(*ordering), fields
+
+
+def list_players(sort_by, order, fields=None, limit=None, after=None, filters=None):
+    """
+    Run the player list query.
+
+    Returns (RowSet, next_cursor). Rows hold the full player payload, or
+    only the requested fields when a projection is given. When limit is
+    None every row is returned and next_cursor is always None.
+    """
+    query, fields = player_query(sort_by, order, fields, after, filters)
+    if limit is not None:
+        # Fetch one extra row to learn whether another page exists
+        query = query.limit(limit + 1)
+
+    results = db.session.execute(query).all()
+    if after is not None and decode_cursor(after)[0] is not None and (limit is None or len(results) <= limit):
+        # The non-NULL sort keys ran out before the page filled: continue into the NULL tail
+        tail, _ = player_query(sort_by, order, fields, filters=filters, null_tail=True)
+        if limit is not None:
+            tail = tail.limit(limit + 1 - len(results))
+        results += db.session.execute(tail).all()
+
+    next_cursor = None
+    if limit is not None and len(results) > limit:
+        results = results[:limit]
+        last = results[-1]
+        next_cursor = encode_cursor(serialize_value(last._sort_key), last.id)
+
+    return RowSet(fields, [row[:-1] for row in results]), next_cursor
+
+
+def stream_players(sort_by, order, fields=None, filters=None, batch_size=STREAM_BATCH_SIZE):
+    """
+    Run the unpaginated player list with a server-side cursor.
+
+    Returns (field names, iterator of row-tuple batches) so callers can
+    encode and send one batch at a time.
+    """
+    query, fields = player_query(sort_by, order, fields, filters=filters)
+    result = db.session.execute(query.execution_options(yield_per=batch_size))
+
+    def batches():
+        for partition in result.partitions():
+            yield [row[:-1] for row in partition]
+
+    return fields, batches()
+
+
+def get_player_row(player_id):
+    """Full payload for one player as a dict, or None if it does not exist"""
+    fields = default_fields()
+    available = projectable_fields()
+    row = db.session.execute(
+        select(*[available[name].label(name) for name in fields]).where(Player.id == player_id)
+    ).first()
+    return RowSet(fields, [row]).dicts()[0] if row is not None else None
@@ -2,9 +2,10 @@
 """
 Simple script to run the Flask application
 """
-from app import app
+from app import create_app
 
 if __name__ == '__main__':
+    app = create_app()
     print("Starting Baseball Stats API server...")
     print("API will be available at: http://localhost:5000")
     print("Health check: http://localhost:5000/api/health")
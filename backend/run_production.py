@@ -2,47 +2,129 @@
 """
 Production server runner for Baseball Stats App
 Uses Gunicorn WSGI server for production deployment
+
+The worker model is chosen with WORKER_CLASS:
+- gthread (default): each worker serves GUNICORN_THREADS requests at once
+- gevent: each worker serves WORKER_CONNECTIONS requests as greenlets;
+  sockets are monkey-patched so upstream and Gemini calls yield (requires gevent)
+- sync: one request per worker process
+Worker processes default to a multiple of the CPU count (WEB_CONCURRENCY overrides).
 """
 
+import multiprocessing
 import os
 import sys
-from app import app
+
+WORKER_CLASSES = ('sync', 'gthread', 'gevent')
+
+
+def server_settings(env=os.environ, cpu_count=None):
+    """Gunicorn worker settings derived from the CPU count and environment"""
+    cpu_count = cpu_count or multiprocessing.cpu_count()
+    worker_class = env.get('WORKER_CLASS', 'gthread').lower()
+    if worker_class not in WORKER_CLASSES:
+        raise SystemExit(f"❌ Unknown WORKER_CLASS '{worker_class}' (expected one of {', '.join(WORKER_CLASSES)})")
+
+    # Sync workers need extra processes to cover requests blocked on I/O;
+    # threaded and gevent workers overlap I/O within a process instead
+    default_workers = 2 * cpu_count + 1 if worker_class == 'sync' else cpu_count + 1
+    settings = {
+        'worker_class': worker_class,
+        'workers': int(env.get('WEB_CONCURRENCY', default_workers)),
+        'timeout': int(env.get('GUNICORN_TIMEOUT', 30)),
+    }
+    if worker_class == 'gthread':
+        settings['threads'] = int(env.get('GUNICORN_THREADS', 4))
+    elif worker_class == 'gevent':
+        settings['worker_connections'] = int(env.get('WORKER_CONNECTIONS', 100))
+    return settings
+
+
+def gunicorn_argv(host, port, settings):
+    """Command line for gunicorn.app.wsgiapp"""
+    argv = [
+        'gunicorn',
+        '--bind', f'{host}:{port}',
+        '--workers', str(settings['workers']),
+        '--worker-class', settings['worker_class'],
+    ]
+    if 'threads' in settings:
+        argv += ['--threads', str(settings['threads'])]
+    if 'worker_connections' in settings:
+        argv += ['--worker-connections', str(settings['worker_connections'])]
+    return argv + [
+        '--max-requests', '1000',
+        '--max-requests-jitter', '100',
+        '--timeout', str(settings['timeout']),
+        '--keep-alive', '2',
+        '--preload',
+        '--access-logfile', '-',
+        '--error-logfile', '-',
+        '--log-level', 'info',
+        'app:create_app()'
+    ]
+
+
+def make_cooperative():
+    """Patch blocking I/O for gevent; must run before the app and its clients are imported"""
+    from gevent import monkey
+    monkey.patch_all()
+    try:
+        from psycogreen.gevent import patch_psycopg
+        patch_psycopg()
+    except ImportError:
+        print("⚠️  psycogreen not installed; PostgreSQL queries will block gevent workers")
+    # Gemini's REST transport goes through requests, which the patched sockets make cooperative
+    os.environ.setdefault('GEMINI_TRANSPORT', 'rest')
+
+
+def prepare_metrics_dir():
+    """Start with an empty PROMETHEUS_MULTIPROC_DIR so samples from earlier runs are not aggregated"""
+    metrics_dir = os.environ.get('PROMETHEUS_MULTIPROC_DIR')
+    if not metrics_dir:
+        return
+    os.makedirs(metrics_dir, exist_ok=True)
+    for name in os.listdir(metrics_dir):
+        if name.endswith('.db'):
+            os.remove(os.path.join(metrics_dir, name))
+
 
 if __name__ == '__main__':
     # Production configuration
     port = int(os.environ.get('PORT', 5000))
     host = os.environ.get('HOST', '0.0.0.0')
     debug = os.environ.get('FLASK_DEBUG', 'False').lower() == 'true'
-    
+    use_gunicorn = not debug and os.environ.get('USE_GUNICORN', 'true').lower() == 'true'
+    settings = server_settings()
+
+    if use_gunicorn and settings['worker_class'] == 'gevent':
+        try:
+            make_cooperative()
+        except ImportError:
+            print("⚠️  gevent not available, falling back to gthread workers")
+            settings = server_settings({**os.environ, 'WORKER_CLASS': 'gthread'})
+
+    prepare_metrics_dir()
+
     print(f"🚀 Starting Baseball Stats API server in {'DEBUG' if debug else 'PRODUCTION'} mode...")
     print(f"📡 Server will be available at: http://{host}:{port}")
     print(f"🔍 Health check: http://{host}:{port}/api/health")
     print(f"🌱 To seed database: POST http://{host}:{port}/api/seed")
-    
+
     # For production, use Gunicorn (installed via requirements.txt)
-    if not debug and os.environ.get('USE_GUNICORN', 'true').lower() == 'true':
+    if use_gunicorn:
         try:
             import gunicorn.app.wsgiapp as wsgi
-            sys.argv = [
-                'gunicorn',
-                '--bind', f'{host}:{port}',
-                '--workers', '4',
-                '--worker-class', 'sync',
-                '--worker-connections', '1000',
-                '--max-requests', '1000',
-                '--max-requests-jitter', '100',
-                '--timeout', '30',
-                '--keep-alive', '2',
-                '--preload',
-                '--access-logfile', '-',
-                '--error-logfile', '-',
-                '--log-level', 'info',
-                'app:app'
-            ]
+            print(f"⚙️  {settings['workers']} {settings['worker_class']} workers"
+                  + (f" x {settings['threads']} threads" if 'threads' in settings else '')
+                  + (f" x {settings['worker_connections']} connections" if 'worker_connections' in settings else ''))
+            sys.argv = gunicorn_argv(host, port, settings)
             wsgi.run()
         except ImportError:
             print("⚠️  Gunicorn not available, falling back to Flask development server")
-            app.run(debug=debug, host=host, port=port)
+            from app import create_app
+            create_app().run(debug=debug, host=host, port=port, threaded=True)
     else:
         # Development server
-        app.run(debug=debug, host=host, port=port)
+        from app import create_app
+        create_app().run(debug=debug, host=host, port=port, threaded=True)
@@ -0,0 +1,129 @@
+"""
+Response encoding for player payloads.
+
+Rows come straight from Core queries as tuples and are encoded with orjson
+when it is installed (falling back to the stdlib encoder), so no ORM
+objects are hydrated just to be turned into JSON. Clients can ask for
+MessagePack or a column-oriented JSON layout with the Accept header, and
+large lists are encoded batch by batch so they can be streamed.
+"""
+import json
+import time
+from datetime import date
+
+try:
+    import orjson
+except ImportError:  # optional speedup
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:  # optional output format
+    msgpack = None
+
+JSON = 'json'
+COLUMNAR = 'columnar'
+MSGPACK = 'msgpack'
+
+MIMETYPES = {
+    JSON: 'application/json',
+    COLUMNAR: 'application/vnd.players.columnar+json',
+    MSGPACK: 'application/msgpack',
+}
+MSGPACK_ALIASES = ('application/msgpack', 'application/x-msgpack')
+
+
+def _default(value):
+    if isinstance(value, date):
+        return value.isoformat()
+    raise TypeError(f'{type(value).__name__} is not JSON serializable')
+
+
+def dumps(payload):
+    """Encode a payload as compact JSON bytes"""
+    if orjson is not None:
+        # Non-string keys are stringified, as the stdlib encoder does
+        return orjson.dumps(payload, default=_default, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(payload, separators=(',', ':'), default=_default).encode('utf-8')
+
+
+def negotiate(accept_mimetypes, columnar=False):
+    """
+    Pick the output format from a request's Accept header.
+
+    columnar says whether the endpoint can produce the column layout.
+    Plain JSON wins ties and is the default for */* or no header.
+    """
+    offered = [MIMETYPES[JSON]]
+    if columnar:
+        offered.append(MIMETYPES[COLUMNAR])
+    if msgpack is not None:
+        offered.extend(MSGPACK_ALIASES)
+
+    best = accept_mimetypes.best_match(offered, default=MIMETYPES[JSON])
+    if best in MSGPACK_ALIASES:
+        return MSGPACK
+    if best == MIMETYPES[COLUMNAR]:
+        return COLUMNAR
+    return JSON
+
+
+def encode(payload, fmt=JSON):
+    """Encode a JSON-shaped payload in the given format"""
+    if fmt == MSGPACK:
+        return msgpack.packb(payload, default=_default, use_bin_type=True)
+    return dumps(payload)
+
+
+class RowSet:
+    """
+    Query result as column names plus value tuples.
+
+    Datetimes are left as-is; every encoder above formats them as ISO 8601.
+    """
+
+    __slots__ = ('fields', 'rows')
+
+    def __init__(self, fields, rows):
+        self.fields = list(fields)
+        self.rows = rows
+
+    def dicts(self):
+        fields = self.fields
+        return [dict(zip(fields, row)) for row in self.rows]
+
+    def columns(self):
+        if not self.rows:
+            return {field: [] for field in self.fields}
+        return dict(zip(self.fields, map(list, zip(*self.rows))))
+
+
+def shape(rowset, fmt, next_cursor=None, paginated=False):
+    """Arrange a RowSet as the list endpoint's payload for a format"""
+    data = rowset.columns() if fmt == COLUMNAR else rowset.dicts()
+    if not paginated:
+        return data
+    return {'players': data, 'next_cursor': next_cursor}
+
+
+def iter_json_array(fields, batches, on_encode=None):
+    """
+    Encode batches of row tuples as one JSON array, yielding bytes per batch.
+
+    Only one batch is held in memory at a time, so the peak stays flat
+    however many rows the query returns. on_encode, if given, receives the
+    seconds spent encoding each batch.
+    """
+    yield b'['
+    first = True
+    for batch in batches:
+        if not batch:
+            continue
+        started = time.perf_counter()
+        body = dumps([dict(zip(fields, row)) for row in batch])
+        if on_encode is not None:
+            on_encode(time.perf_counter() - started)
+        # Splice the batch's array into the outer one without re-encoding
+        yield (b'' if first else b',') + body[1:-1]
+        first = False
+    yield b']'
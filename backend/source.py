@@ -0,0 +1,281 @@
+"""
+Fetch layer for the external seed source.
+
+Downloads go through one pooled requests.Session with explicit connect and
+read timeouts, and are retried with exponential backoff on connection
+errors, timeouts and 429/5xx responses. All attempts, backoff sleeps
+(Retry-After included) and the body download share one overall deadline
+kept below the gunicorn worker timeout, so a slow or throttling upstream
+makes POST /api/seed fall back to the snapshot instead of getting the
+worker killed. Every successful download is
+written gzip-compressed to an on-disk snapshot together with its ETag,
+Last-Modified and content hash. The next fetch sends If-None-Match /
+If-Modified-Since, so an unchanged upstream costs a 304 instead of the full
+payload. Records are always parsed from the snapshot through a memory map,
+which also makes offline reseeding possible. Callers pass the hash of the
+payload the database was last seeded from (kept in the seed_state table),
+and a snapshot with that hash is reported as unchanged.
+"""
+import gzip
+import hashlib
+import json
+import mmap
+import os
+import tempfile
+import threading
+import time
+from datetime import datetime
+
+from ingest import CHUNK_SIZE, iter_json_array
+
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+SNAPSHOT_FILE = 'source.json.gz'
+META_FILE = 'source.meta.json'
+
+
+class SourceUnavailable(Exception):
+    """Raised when the source cannot be fetched and no snapshot can stand in"""
+
+
+class FetchDeadlineExceeded(Exception):
+    """Raised when the overall fetch deadline passes before the download completes"""
+
+
+class RetryableStatus(Exception):
+    """Raised for an HTTP status worth retrying"""
+
+    def __init__(self, response):
+        super().__init__(f'{response.status_code} from {response.url}')
+        self.response = response
+
+
+class FetchResult:
+    """Outcome of a fetch: where the records came from and whether they are new"""
+
+    def __init__(self, fetcher, meta, status, changed, error=None):
+        self.fetcher = fetcher
+        self.meta = meta
+        # 'downloaded', 'not_modified', 'offline' or 'stale' (upstream failed, snapshot used)
+        self.status = status
+        self.changed = changed
+        self.error = error
+
+    def records(self):
+        """Parse the snapshot's records lazily from a memory map"""
+        return self.fetcher.snapshot_records()
+
+    @property
+    def sha256(self):
+        return self.meta['sha256']
+
+    def to_dict(self):
+        return {
+            'status': self.status,
+            'changed': self.changed,
+            'bytes': self.meta.get('bytes'),
+            'etag': self.meta.get('etag'),
+            'fetched_at': self.meta.get('fetched_at'),
+            'error': str(self.error) if self.error else None,
+        }
+
+
+class SourceFetcher:
+    """Conditional, retrying, snapshot-backed fetches of the seed source"""
+
+    def __init__(self, url, snapshot_dir, connect_timeout=5.0, read_timeout=20.0, retries=3,
+                 backoff_seconds=0.5, deadline_seconds=None, session=None):
+        self.url = url
+        self.snapshot_dir = snapshot_dir
+        self.timeout = (connect_timeout, read_timeout)
+        # Seconds the whole fetch may take, retries included (None: unbounded)
+        self.deadline_seconds = deadline_seconds
+        self.retries = retries
+        self.backoff_seconds = backoff_seconds
+        self._session = session
+
+    @classmethod
+    def from_config(cls, config, default_snapshot_dir):
+        return cls(
+            config['SEED_SOURCE_URL'],
+            config.get('SEED_SNAPSHOT_DIR') or default_snapshot_dir,
+            connect_timeout=config['SEED_CONNECT_TIMEOUT'],
+            read_timeout=config['SEED_READ_TIMEOUT'],
+            retries=config['SEED_RETRIES'],
+            deadline_seconds=config['SEED_FETCH_DEADLINE'] or None,
+        )
+
+    @property
+    def session(self):
+        """Pooled session, created (and requests imported) on the first fetch"""
+        if self._session is None:
+            self._session = self._make_session()
+        return self._session
+
+    @staticmethod
+    def _make_session():
+        import requests
+        from requests.adapters import HTTPAdapter
+
+        session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=4)
+        session.mount('http://', adapter)
+        session.mount('https://', adapter)
+        session.headers['Accept-Encoding'] = 'gzip, deflate'
+        return session
+
+    @property
+    def snapshot_path(self):
+        return os.path.join(self.snapshot_dir, SNAPSHOT_FILE)
+
+    @property
+    def meta_path(self):
+        return os.path.join(self.snapshot_dir, META_FILE)
+
+    def load_meta(self):
+        """Metadata of the current snapshot, or None if there is none"""
+        if not os.path.exists(self.snapshot_path) or not os.path.exists(self.meta_path):
+            return None
+        with open(self.meta_path) as f:
+            return json.load(f)
+
+    def _write_atomic(self, path, data):
+        os.makedirs(self.snapshot_dir, exist_ok=True)
+        fd, temp_path = tempfile.mkstemp(dir=self.snapshot_dir)
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+        os.replace(temp_path, path)
+
+    def fetch(self, offline=False, applied_sha256=None):
+        """
+        Bring the snapshot up to date and return a FetchResult.
+
+        The result is changed unless the snapshot's hash is applied_sha256,
+        the payload the database already reflects. offline uses the snapshot without contacting the source. If the
+        source fails after all retries, or the fetch deadline passes first,
+        an existing snapshot is used and the result's status is 'stale';
+        without one SourceUnavailable is raised.
+        """
+        import requests
+
+        meta = self.load_meta()
+        if offline:
+            if meta is None:
+                raise SourceUnavailable(f'No snapshot in {self.snapshot_dir} for an offline seed')
+            return self._result(meta, 'offline', applied_sha256)
+
+        try:
+            meta, status = self._download_with_retry(meta)
+        except (requests.RequestException, RetryableStatus, FetchDeadlineExceeded) as e:
+            if meta is None:
+                raise SourceUnavailable(f'Failed to fetch {self.url}: {e}') from e
+            return self._result(meta, 'stale', applied_sha256, error=e)
+        return self._result(meta, status, applied_sha256)
+
+    def _result(self, meta, status, applied_sha256, error=None):
+        return FetchResult(self, meta, status, changed=meta['sha256'] != applied_sha256, error=error)
+
+    def _download_with_retry(self, meta):
+        import requests
+
+        deadline = time.monotonic() + self.deadline_seconds if self.deadline_seconds else None
+        for attempt in range(self.retries + 1):
+            try:
+                return self._download(meta, deadline)
+            except (requests.ConnectionError, requests.Timeout, requests.exceptions.ChunkedEncodingError,
+                    RetryableStatus) as e:
+                if attempt == self.retries:
+                    raise
+                delay = self.backoff_seconds * (2 ** attempt)
+                response = getattr(e, 'response', None)
+                retry_after = response.headers.get('Retry-After') if response is not None else None
+                if retry_after and retry_after.isdigit():
+                    delay = max(delay, int(retry_after))
+                # Give up rather than sleep past the deadline; the snapshot stands in
+                if deadline is not None and time.monotonic() + delay >= deadline:
+                    raise
+                time.sleep(delay)
+
+    def _attempt_timeout(self, deadline):
+        """(connect, read) timeouts for one attempt, shortened to the time left before the deadline"""
+        if deadline is None:
+            return self.timeout
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            raise FetchDeadlineExceeded(f'Fetching {self.url} took longer than {self.deadline_seconds}s')
+        return tuple(min(timeout, remaining) for timeout in self.timeout)
+
+    def _download(self, meta, deadline=None):
+        """One conditional GET; returns (meta, 'downloaded' or 'not_modified')"""
+        headers = {}
+        if meta is not None:
+            if meta.get('etag'):
+                headers['If-None-Match'] = meta['etag']
+            if meta.get('last_modified'):
+                headers['If-Modified-Since'] = meta['last_modified']
+
+        timeout = self._attempt_timeout(deadline)
+        with self.session.get(self.url, headers=headers, timeout=timeout, stream=True) as response:
+            if response.status_code == 304 and meta is not None:
+                return meta, 'not_modified'
+            if response.status_code in RETRY_STATUSES:
+                raise RetryableStatus(response)
+            response.raise_for_status()
+
+            # The read timeout restarts with every packet, so a server trickling
+            # the body is cut off by unblocking the socket at the deadline
+            watchdog = None
+            if deadline is not None:
+                abort = getattr(response.raw, 'shutdown', response.close)
+                watchdog = threading.Timer(max(deadline - time.monotonic(), 0), abort)
+                watchdog.daemon = True
+                watchdog.start()
+
+            # Compress to a temporary file while hashing, then swap it in
+            os.makedirs(self.snapshot_dir, exist_ok=True)
+            digest = hashlib.sha256()
+            size = 0
+            fd, temp_path = tempfile.mkstemp(dir=self.snapshot_dir, suffix='.gz')
+            try:
+                with os.fdopen(fd, 'wb') as raw, gzip.GzipFile(fileobj=raw, mode='wb', compresslevel=6) as out:
+                    try:
+                        for chunk in response.iter_content(chunk_size=CHUNK_SIZE):
+                            digest.update(chunk)
+                            size += len(chunk)
+                            out.write(chunk)
+                    except Exception:
+                        # A read broken off by the watchdog is a missed deadline
+                        self._attempt_timeout(deadline)
+                        raise
+                    # A body the watchdog truncated must not become the snapshot
+                    self._attempt_timeout(deadline)
+                os.replace(temp_path, self.snapshot_path)
+            except BaseException:
+                os.unlink(temp_path)
+                raise
+            finally:
+                if watchdog is not None:
+                    watchdog.cancel()
+
+            new_meta = {
+                'url': self.url,
+                'etag': response.headers.get('ETag'),
+                'last_modified': response.headers.get('Last-Modified'),
+                'sha256': digest.hexdigest(),
+                'bytes': size,
+                'fetched_at': datetime.utcnow().isoformat(),
+            }
+        self._write_atomic(self.meta_path, json.dumps(new_meta, indent=2).encode('utf-8'))
+        return new_meta, 'downloaded'
+
+    def snapshot_chunks(self, chunk_size=CHUNK_SIZE):
+        """Decompressed snapshot bytes, read through a memory map"""
+        with open(self.snapshot_path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            with gzip.GzipFile(fileobj=mapped, mode='rb') as snapshot:
+                while True:
+                    chunk = snapshot.read(chunk_size)
+                    if not chunk:
+                        return
+                    yield chunk
+
+    def snapshot_records(self):
+        return iter_json_array(self.snapshot_chunks())
@@ -0,0 +1,127 @@
+"""
+Bulk player updates: validate a list of partial updates, then apply them
+all with one executemany UPDATE inside the caller's transaction.
+
+The derived rate columns are generated by the database; the description
+hash is computed here from the merged row values.
+"""
+from datetime import datetime
+from types import SimpleNamespace
+
+from sqlalchemy import select, update
+
+import description_cache
+from models import EDITABLE_FIELDS, Player, db
+
+MAX_BATCH_SIZE = 1000
+
+INTEGER_FIELDS = {column.name for column in Player.__table__.columns
+                  if isinstance(column.type, db.Integer)} & set(EDITABLE_FIELDS)
+FLOAT_FIELDS = {column.name for column in Player.__table__.columns
+                if isinstance(column.type, db.Float)} & set(EDITABLE_FIELDS)
+
+
+class BulkUpdateError(ValueError):
+    """Raised when a bulk update has invalid items; carries per-item errors"""
+
+    def __init__(self, errors):
+        super().__init__('Invalid updates')
+        self.errors = errors
+
+
+def validate_item(item):
+    """Return an error message for one partial update, or None if it is valid"""
+    if not isinstance(item, dict):
+        return 'Update must be an object'
+    player_id = item.get('id')
+    if not isinstance(player_id, int) or isinstance(player_id, bool):
+        return 'id must be an integer'
+
+    unknown = sorted(set(item) - set(EDITABLE_FIELDS) - {'id'})
+    if unknown:
+        return f"Unknown fields: {', '.join(unknown)}"
+
+    for field, value in item.items():
+        if field in INTEGER_FIELDS:
+            if value is not None and (not isinstance(value, int) or isinstance(value, bool) or value < 0):
+                return f'{field} must be a non-negative integer'
+        elif field in FLOAT_FIELDS:
+            if value is not None and (not isinstance(value, (int, float)) or isinstance(value, bool)):
+                return f'{field} must be a number'
+        elif field == 'name':
+            if not isinstance(value, str) or not value.strip():
+                return 'name must be a non-empty string'
+        elif field in ('position', 'description'):
+            if value is not None and not isinstance(value, str):
+                return f'{field} must be a string'
+    return None
+
+
+def bulk_update_players(items):
+    """
+    Apply a list of partial updates ({'id': ..., <field>: ...}) atomically.
+
+    Raises BulkUpdateError with [{'index', 'id', 'error'}] when any item is
+    invalid or refers to a missing player; nothing is written in that case.
+    Returns the updated player ids. The caller commits.
+    """
+    if not isinstance(items, list) or not items:
+        raise BulkUpdateError([{'index': None, 'id': None, 'error': 'Body must be a non-empty list'}])
+    if len(items) > MAX_BATCH_SIZE:
+        raise BulkUpdateError([{'index': None, 'id': None,
+                                'error': f'At most {MAX_BATCH_SIZE} updates per request'}])
+
+    errors = []
+    seen = set()
+    for index, item in enumerate(items):
+        error = validate_item(item)
+        if error is None and item['id'] in seen:
+            error = 'Duplicate id'
+        if error:
+            errors.append({'index': index, 'id': item.get('id') if isinstance(item, dict) else None,
+                           'error': error})
+        else:
+            seen.add(item['id'])
+    if errors:
+        raise BulkUpdateError(errors)
+
+    # Lock the current rows so the merged values cannot race a concurrent edit
+    columns = [Player.id] + [getattr(Player, field) for field in EDITABLE_FIELDS]
+    current = {
+        row.id: row._asdict()
+        for row in db.session.execute(
+            select(*columns).where(Player.id.in_(seen)).with_for_update()
+        )
+    }
+    missing = [{'index': index, 'id': item['id'], 'error': 'Player not found'}
+               for index, item in enumerate(items) if item['id'] not in current]
+    if missing:
+        raise BulkUpdateError(missing)
+
+    now = datetime.utcnow()
+    rows = []
+    for item in items:
+        row = dict(current[item['id']])
+        row.update(item)
+        row['updated_at'] = now
+        if 'description' in item:
+            row['description_hash'] = description_cache.cache_key(SimpleNamespace(**row))
+        rows.append(row)
+
+    # Identical key sets let SQLAlchemy send every row through one executemany
+    description_rows = [row for row in rows if 'description_hash' in row]
+    other_rows = [row for row in rows if 'description_hash' not in row]
+    for batch in (other_rows, description_rows):
+        if batch:
+            db.session.execute(update(Player), batch)
+    return [row['id'] for row in rows]
+
+
+def changed_fields(items):
+    """Union of the fields touched by a list of updates"""
+    fields = set()
+    for item in items:
+        fields.update(item)
+    fields.discard('id')
+    return fields
+
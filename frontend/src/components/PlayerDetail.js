@@ -34,7 +34,7 @@ const PlayerDetail = ({ player, onClose, onPlayerUpdate }) => {
     
     try {
       setLoadingDescription(true);
-      const response = await playerService.generateDescription(currentPlayer.id);
+      const response = await playerService.generateDescription(currentPlayer.id, forceRegenerate);
       setDescription(response.data.description);
       setDescriptionChanged(false); // Reset changed flag since it's auto-saved
     } catch (err) {
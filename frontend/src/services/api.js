@@ -10,9 +10,10 @@ const api = axios.create({
 });
 
 export const playerService = {
-  // Get all players with optional sorting
-  getPlayers: (sortBy = 'hits', order = 'desc') => {
-    return api.get(`/players?sort_by=${sortBy}&order=${order}`);
+  // Get all players with optional sorting and server-side filters
+  // (e.g. { position: 'SS', min_games: 100, q: 'gonz' })
+  getPlayers: (sortBy = 'hits', order = 'desc', filters = {}) => {
+    return api.get('/players', { params: { sort_by: sortBy, order, ...filters } });
   },
 
   // Get a specific player
@@ -20,19 +21,58 @@ export const playerService = {
     return api.get(`/players/${id}`);
   },
 
+  // Get several players in one request
+  getPlayersByIds: (ids) => {
+    return api.get('/players', { params: { ids: ids.join(',') } });
+  },
+
   // Update a player
   updatePlayer: (id, data) => {
     return api.put(`/players/${id}`, data);
   },
 
+  // Apply a list of partial updates ([{ id, ...fields }]) atomically
+  updatePlayers: (updates) => {
+    return api.patch('/players', updates);
+  },
+
   // Get player description
   getDescription: (id) => {
     return api.get(`/players/${id}/description`);
   },
 
-  // Generate player description
-  generateDescription: (id) => {
-    return api.post(`/players/${id}/description`);
+  // Generate player description: served from cache (200) or queued as a job (202),
+  // which is polled before fetching the result
+  generateDescription: async (id, force = false) => {
+    const response = await api.post(`/players/${id}/description${force ? '?force=true' : ''}`);
+    if (response.status === 200) {
+      return response;
+    }
+    const job = response.data;
+    let status = job;
+    while (status.status === 'running' || status.status === 'queued') {
+      await new Promise((resolve) => setTimeout(resolve, 1000));
+      ({ data: status } = await api.get(`/descriptions/jobs/${job.job_id}`));
+    }
+    if (status.status === 'failed') {
+      throw new Error(status.last_error || 'Description generation failed');
+    }
+    return api.get(`/players/${id}/description`);
+  },
+
+  // Stream a description as Server-Sent Events (text chunks, then a `done` event)
+  streamDescription: (id, force = false) => {
+    return new EventSource(`${API_BASE_URL}/players/${id}/description/stream${force ? '?force=true' : ''}`);
+  },
+
+  // Queue descriptions for every player that lacks one
+  generateMissingDescriptions: () => {
+    return api.post('/descriptions/jobs');
+  },
+
+  // Get description job progress
+  getDescriptionJob: (jobId) => {
+    return api.get(`/descriptions/jobs/${jobId}`);
   },
 
   // Save player description